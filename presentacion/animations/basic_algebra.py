@@ -1,6 +1,8 @@
 # basic_algebra.py
 from manim import *
 
+from comun.dialogo import Dialogo
+
 class BasicAlgebraEnhanced(Scene):
     def construct(self):
         # Definir una paleta de colores en tonos de azul, negro, gris y blanco
@@ -28,11 +30,12 @@ class BasicAlgebraEnhanced(Scene):
         self.wait(1)
 
         # Cuadro de diálogo inicial con contexto sobre ecuaciones e igualdades
-        dialog = self.create_dialog(r"Una ecuación es una igualdad entre dos expresiones matemáticas.", animate=True)
+        dialog = Dialogo(r"Una ecuación es una igualdad entre dos expresiones matemáticas.", color=self.colors["accent"], color_texto=self.colors["text"])
+        self.play(dialog.aparecer())
         self.wait(2)
 
         # Actualizar diálogo para introducir la ecuación
-        self.update_dialog(dialog, r"Resolveremos la ecuación $x + 3 = 7$ para encontrar el valor de $x$.")
+        self.play(dialog.decir(r"Resolveremos la ecuación $x + 3 = 7$ para encontrar el valor de $x$."))
         self.wait(2)
 
         # Mostrar la ecuación principal centrada
@@ -50,7 +53,7 @@ class BasicAlgebraEnhanced(Scene):
         self.wait(2)
 
         # Actualizar diálogo
-        self.update_dialog(dialog, "Representemos gráficamente cada término.")
+        self.play(dialog.decir("Representemos gráficamente cada término."))
         self.wait(2)
 
         # Crear y posicionar los elementos gráficos
@@ -97,7 +100,7 @@ class BasicAlgebraEnhanced(Scene):
         self.wait(2)
 
         # Actualizar diálogo
-        self.update_dialog(dialog, "Restamos 3 de ambos lados para despejar $x$.")
+        self.play(dialog.decir("Restamos 3 de ambos lados para despejar $x$."))
         self.wait(2)
 
         # Animación de resta y eliminación del signo '+'
@@ -133,7 +136,7 @@ class BasicAlgebraEnhanced(Scene):
         self.wait(2)
 
         # Actualizar diálogo
-        self.update_dialog(dialog, "¡Hemos encontrado que $x = 4$!")
+        self.play(dialog.decir("¡Hemos encontrado que $x = 4$!"))
         self.wait(2)
 
         # Destacar la solución
@@ -150,51 +153,3 @@ class BasicAlgebraEnhanced(Scene):
             run_time=3
         )
         self.wait(1)
-
-    def create_dialog(self, message, animate=False):
-        # Cuadro de diálogo centrado en la parte inferior
-        bubble_base = RoundedRectangle(
-            corner_radius=0.2,
-            width=12,  # Ancho del cuadro de diálogo
-            height=2,  # Altura del cuadro de diálogo
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-
-        # Definir la cola del cuadro de diálogo
-        tail = Polygon(
-            bubble_base.get_bottom() + DOWN * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + LEFT * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + RIGHT * 0.5,
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-
-        bubble = VGroup(bubble_base, tail)
-        bubble.to_edge(DOWN, buff=0.1)  # Posicionar en la parte inferior
-
-        # Texto centrado en el cuadro de diálogo
-        dialog_text = Tex(
-            message,
-            font_size=30,
-            color=self.colors["text"],
-            # font="Arial",  # Eliminamos este argumento
-        ).move_to(bubble_base.get_center())
-
-        if animate:
-            self.play(FadeIn(bubble), Write(dialog_text))
-        else:
-            self.add(bubble, dialog_text)
-        return VGroup(bubble, dialog_text)
-
-    def update_dialog(self, dialog, new_message):
-        dialog_text = dialog[1]
-        new_dialog_text = Tex(
-            new_message,
-            font_size=30,
-            color=self.colors["text"],
-            # font="Arial",  # Eliminamos este argumento
-        ).move_to(dialog_text.get_center())
-        self.play(Transform(dialog_text, new_dialog_text))
\ No newline at end of file
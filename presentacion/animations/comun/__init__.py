@@ -0,0 +1,6 @@
+"""
+Piezas compartidas por las escenas de animations/.
+
+Manim agrega la carpeta de la escena a sys.path, así que desde cualquier
+escena basta con ``from comun.kmeans import ...``.
+"""
@@ -0,0 +1,234 @@
+"""
+Cuadro de diálogo compartido por las escenas narradas.
+
+El mensaje no se compone como un solo Tex: se parte en palabras (una
+fórmula entre $...$ cuenta como una palabra) y cada palabra se compone una
+vez y se guarda en una caché del proceso. Al cambiar de mensaje se comparan
+las dos listas de palabras: las que se repiten se reutilizan y solo se
+desplazan si cambia su lugar, y solo las palabras nuevas aparecen. Así una
+escena con decenas de mensajes no vuelve a componer ni a transformar el
+bloque completo en cada línea.
+
+Uso en una escena:
+
+    dialog = Dialogo("Primer mensaje.", color=..., color_texto=...)
+    self.play(dialog.aparecer())
+    self.play(dialog.decir("Segundo mensaje."))
+    self.play(dialog.mostrar(MathTex(...)))
+"""
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+from manim import (
+    DOWN, LEFT, RIGHT, AnimationGroup, FadeIn, Polygon, RoundedRectangle, Tex,
+    VGroup, Wait, Write,
+)
+
+# Una palabra es cualquier tramo sin espacios; lo que está entre $...$ va
+# junto aunque tenga espacios. herramientas/lote_tex.py parte los mensajes
+# con palabras() para precompilar las mismas fórmulas.
+PALABRA = re.compile(r"(?:\$[^$]*\$|[^\s$])+")
+
+# Letra de referencia que se compone junto a cada palabra para conocer la
+# línea base (la I no tiene trazos bajo la línea)
+ANCLA = "I"
+
+# Distancia entre líneas en múltiplos de la altura de la letra de referencia
+INTERLINEADO = 1.75
+
+# (palabra, tamaño) -> (mobject, desplazamiento de su centro respecto del
+# punto izquierdo de su línea base)
+_palabras = {}
+
+# tamaño -> (espacio entre palabras, altura de la letra de referencia)
+_metricas = {}
+
+
+def palabras(mensaje):
+    return PALABRA.findall(mensaje)
+
+
+def _compuesta(texto, font_size):
+    """
+    Palabra compuesta (sin copiar) y su desplazamiento respecto de la línea base.
+    """
+    clave = (texto, font_size)
+    if clave not in _palabras:
+        tex = Tex(ANCLA, texto, arg_separator=" ", font_size=font_size)
+        ancla, palabra = tex[0], tex[1]
+        origen = np.array([palabra.get_left()[0], ancla.get_bottom()[1], 0.0])
+        _palabras[clave] = (palabra, palabra.get_center() - origen)
+    return _palabras[clave]
+
+
+def _palabra(texto, font_size):
+    palabra, desplazamiento = _compuesta(texto, font_size)
+    return palabra.copy(), desplazamiento
+
+
+def _metricas_de(font_size):
+    if font_size not in _metricas:
+        tex = Tex(ANCLA, ANCLA, arg_separator=" ", font_size=font_size)
+        _metricas[font_size] = (tex[1].get_left()[0] - tex[0].get_right()[0], tex[0].height)
+    return _metricas[font_size]
+
+
+class Dialogo(VGroup):
+    """
+    Burbuja con cola en la parte inferior de la pantalla y el texto del
+    mensaje actual. ``dialog[0]`` es la burbuja, ``dialog[1]`` el texto y
+    ``dialog[2]`` las palabras que se están desvaneciendo, que siguen en el
+    diálogo hasta el siguiente cambio para que la escena las dibuje.
+    """
+
+    def __init__(self, mensaje, color, color_texto, font_size=30, width=12, height=2, buff=0.1, **kwargs):
+        bubble_base = RoundedRectangle(
+            corner_radius=0.2,
+            width=width,
+            height=height,
+            color=color,
+            fill_color=color,
+            fill_opacity=0.1
+        )
+        tail = Polygon(
+            bubble_base.get_bottom() + DOWN * 0.5,
+            bubble_base.get_bottom() + DOWN * 0.7 + LEFT * 0.5,
+            bubble_base.get_bottom() + DOWN * 0.7 + RIGHT * 0.5,
+            color=color,
+            fill_color=color,
+            fill_opacity=0.1
+        )
+        bubble = VGroup(bubble_base, tail).to_edge(DOWN, buff=buff)
+        super().__init__(bubble, VGroup(), VGroup(), **kwargs)
+        self.bubble_base = bubble_base
+        self.color_texto = color_texto
+        self.font_size = font_size
+        self.palabras = []
+        # El mensaje inicial se compone sin animar; aparecer() lo muestra
+        self.decir(mensaje)
+
+    @property
+    def texto(self):
+        return self.submobjects[1]
+
+    @property
+    def saliendo(self):
+        return self.submobjects[2]
+
+    def _animacion(self, animaciones, salientes, run_time):
+        """
+        Las animaciones en paralelo, con las palabras salientes
+        desvaneciéndose, o una espera si no hay nada que animar, para que
+        cada cambio de mensaje dure lo mismo.
+        """
+        self.saliendo.submobjects = list(salientes)
+        # Se desvanecen sin FadeOut, que al terminar las quitaría de la
+        # escena y les devolvería la opacidad dentro del diálogo
+        animaciones = list(animaciones) + [p.animate.set_opacity(0) for p in salientes]
+        if not animaciones:
+            return Wait(run_time)
+        # El grupo es el diálogo completo, para que la escena lo siga tratando como uno
+        return AnimationGroup(*animaciones, group=self, run_time=run_time)
+
+    def _componer(self, lista):
+        """
+        Palabras nuevas ubicadas en líneas centradas dentro de la burbuja.
+        """
+        espacio, altura = _metricas_de(self.font_size)
+        ancho_maximo = self.bubble_base.width - 2 * altura
+        compuestas = [_palabra(p, self.font_size) for p in lista]
+
+        lineas = [[]]
+        ancho_linea = 0.0
+        for indice, (palabra, _) in enumerate(compuestas):
+            agregado = palabra.width + (espacio if lineas[-1] else 0.0)
+            if lineas[-1] and ancho_linea + agregado > ancho_maximo:
+                lineas.append([])
+                ancho_linea, agregado = 0.0, palabra.width
+            lineas[-1].append(indice)
+            ancho_linea += agregado
+
+        centro = self.bubble_base.get_center()
+        salto = INTERLINEADO * altura
+        for numero, linea in enumerate(lineas):
+            ancho = sum(compuestas[i][0].width for i in linea) + espacio * (len(linea) - 1)
+            x = centro[0] - ancho / 2
+            base = centro[1] + ((len(lineas) - 1) / 2 - numero) * salto - altura / 2
+            for i in linea:
+                palabra, desplazamiento = compuestas[i]
+                palabra.move_to(np.array([x, base, 0.0]) + desplazamiento)
+                palabra.set_color(self.color_texto)
+                x += palabra.width + espacio
+        return [palabra for palabra, _ in compuestas]
+
+    def precompilar(self, mensajes):
+        """
+        Compone de antemano todas las palabras de una lista de mensajes, por
+        ejemplo las de un guion, para que los cambios de mensaje no compongan nada.
+        """
+        for mensaje in mensajes:
+            for palabra in palabras(mensaje):
+                _compuesta(palabra, self.font_size)
+        return self
+
+    def aparecer(self):
+        """
+        Animación de entrada de la burbuja con el mensaje actual.
+        """
+        return AnimationGroup(FadeIn(self[0]), Write(self.texto), group=self)
+
+    def decir(self, mensaje, run_time=1):
+        """
+        Cambia el mensaje. Las palabras que siguen en el mensaje nuevo se
+        conservan; solo se compone y se anima lo que cambió. Devuelve la
+        animación para pasarla a ``self.play``.
+        """
+        nuevas = palabras(mensaje)
+        ubicadas = self._componer(nuevas)
+        anteriores = list(self.texto.submobjects)
+        if self.palabras is None:
+            # El diálogo muestra una expresión: se reemplaza completa
+            bloques = []
+        else:
+            bloques = SequenceMatcher(None, self.palabras, nuevas, autojunk=False).get_matching_blocks()
+
+        finales = list(ubicadas)
+        conservadas = {}
+        animaciones = []
+        for inicio_anterior, inicio_nuevo, largo in bloques:
+            for k in range(largo):
+                palabra = anteriores[inicio_anterior + k]
+                destino = ubicadas[inicio_nuevo + k]
+                conservadas[inicio_anterior + k] = inicio_nuevo + k
+                finales[inicio_nuevo + k] = palabra
+                if not np.allclose(palabra.get_center(), destino.get_center()):
+                    animaciones.append(palabra.animate.move_to(destino))
+
+        salientes = [p for i, p in enumerate(anteriores) if i not in conservadas]
+        reutilizadas = set(conservadas.values())
+        entrantes = [p for i, p in enumerate(finales) if i not in reutilizadas]
+        self.texto.submobjects = finales
+        self.palabras = nuevas
+
+        return self._animacion(animaciones + [FadeIn(p) for p in entrantes], salientes, run_time)
+
+    def mostrar(self, expresion, run_time=1):
+        """
+        Reemplaza el mensaje por una expresión (por ejemplo un MathTex)
+        centrada en la burbuja.
+        """
+        expresion.move_to(self.bubble_base.get_center())
+        salientes = list(self.texto.submobjects)
+        self.texto.submobjects = [expresion]
+        self.palabras = None
+        return self._animacion([FadeIn(expresion)], salientes, run_time)
+
+    def limpiar(self, run_time=1):
+        """
+        Quita el texto y deja la burbuja vacía.
+        """
+        salientes = list(self.texto.submobjects)
+        self.texto.submobjects = []
+        self.palabras = []
+        return self._animacion([], salientes, run_time)
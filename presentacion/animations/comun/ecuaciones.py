@@ -0,0 +1,199 @@
+"""
+Ecuaciones de SymPy convertidas a MathTex con partes con nombre.
+
+Una ecuación se define con SymPy (MatrixSymbol, HadamardProduct, ...), que
+además comprueba que las dimensiones de la topología sean compatibles. Se
+recorre el árbol de la expresión y se obtiene una lista de fichas
+``(nombre, latex)``: cada símbolo es una ficha con su nombre (``"a_1"``,
+``"delta_0"``) y los operadores y paréntesis son fichas sin nombre.
+EcuacionTex pasa cada ficha a MathTex como una cadena aparte, así que cada
+término es un submobject y se resalta con ``ecuacion.parte("a_1")``.
+
+Las fichas se guardan en memoria y en disco (``~/.cache/talleria/ecuaciones``
+o TALLERIA_CACHE_ECUACIONES), con una clave que incluye el código de la
+función que arma la ecuación. Con la caché al día, un render no importa
+SymPy.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+from manim import MathTex
+
+DIRECTORIO_CACHE = Path(
+    os.environ.get("TALLERIA_CACHE_ECUACIONES", Path.home() / ".cache" / "talleria" / "ecuaciones")
+)
+
+# Cambia si cambia la forma de generar las fichas
+VERSION = 1
+
+
+class Ecuacion:
+    """
+    Fichas ``(nombre, latex)`` de una ecuación; ``nombre`` es None en los
+    operadores.
+    """
+
+    def __init__(self, fichas):
+        self.fichas = [tuple(ficha) for ficha in fichas]
+        self._indices = {}
+        for indice, (nombre, _) in enumerate(self.fichas):
+            if nombre is not None:
+                self._indices.setdefault(nombre, indice)
+
+    @property
+    def latex(self):
+        return " ".join(latex for _, latex in self.fichas)
+
+    @property
+    def nombres(self):
+        return list(self._indices)
+
+    def indice(self, nombre):
+        """
+        Posición de la primera ficha con ese nombre.
+        """
+        try:
+            return self._indices[nombre]
+        except KeyError:
+            raise KeyError(f"La ecuación no tiene el término {nombre!r}; tiene {self.nombres}") from None
+
+    def __repr__(self):
+        return f"Ecuacion({self.latex!r})"
+
+
+def _agrupadas(expr):
+    import sympy
+
+    fichas = _fichas(expr)
+    if isinstance(expr, (sympy.Add, sympy.MatAdd, sympy.HadamardProduct)):
+        return [(None, "(")] + fichas + [(None, ")")]
+    return fichas
+
+
+def _unidas(args, operador):
+    fichas = []
+    for numero, arg in enumerate(args):
+        if numero:
+            fichas.append((None, operador))
+        fichas.extend(_agrupadas(arg))
+    return fichas
+
+
+def _aplicada(nombre, argumento):
+    import sympy
+
+    return [(None, sympy.latex(sympy.Symbol(nombre))), (None, "(")] + _fichas(argumento) + [(None, ")")]
+
+
+def _fichas(expr):
+    """
+    Recorre la expresión en el orden en que se escribe. Cada ficha es LaTeX
+    balanceado, porque MathTex compila cada cadena por separado para contar
+    sus glifos.
+    """
+    import sympy
+    from sympy.core.function import AppliedUndef
+    from sympy.matrices.expressions.applyfunc import ElementwiseApplyFunction
+
+    if isinstance(expr, sympy.Equality):
+        return _fichas(expr.lhs) + [(None, "=")] + _fichas(expr.rhs)
+    if isinstance(expr, (sympy.MatrixSymbol, sympy.Symbol)):
+        return [(expr.name, sympy.latex(expr))]
+    if isinstance(expr, sympy.Transpose):
+        return _agrupadas(expr.arg) + [(None, "^{T}")]
+    if isinstance(expr, (sympy.Add, sympy.MatAdd)):
+        return _unidas(expr.args, "+")
+    if isinstance(expr, (sympy.Mul, sympy.MatMul)):
+        fichas = []
+        for arg in expr.args:
+            fichas.extend(_agrupadas(arg))
+        return fichas
+    if isinstance(expr, sympy.HadamardProduct):
+        return _unidas(expr.args, r"\odot")
+    if isinstance(expr, ElementwiseApplyFunction):
+        return _aplicada(expr.function.expr.func.__name__, expr.expr)
+    if isinstance(expr, AppliedUndef):
+        return _aplicada(expr.func.__name__, expr.args[0])
+    if expr.is_Atom:
+        return [(None, sympy.latex(expr))]
+    raise TypeError(f"No se sabe separar en fichas una expresión {type(expr).__name__}")
+
+
+def memorizada(funcion):
+    """
+    Decorador para funciones que arman una ecuación de SymPy a partir de
+    argumentos simples (números, tuplas, cadenas). Devuelve la Ecuacion ya
+    separada en fichas, desde la memoria o el disco si ya se calculó.
+    """
+    codigo = inspect.getsource(funcion)
+
+    @functools.lru_cache(maxsize=None)
+    @functools.wraps(funcion)
+    def envoltura(*args):
+        datos = json.dumps([VERSION, funcion.__module__, funcion.__qualname__, codigo, args])
+        ruta = DIRECTORIO_CACHE / f"{hashlib.sha256(datos.encode()).hexdigest()}.json"
+        try:
+            return Ecuacion(json.loads(ruta.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            pass
+        ecuacion = Ecuacion(_fichas(funcion(*args)))
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_suffix(f".{os.getpid()}.tmp")
+            temporal.write_text(json.dumps(ecuacion.fichas), encoding="utf-8")
+            os.replace(temporal, ruta)
+        except OSError:
+            # Sin disco la caché en memoria sigue funcionando
+            pass
+        return ecuacion
+
+    return envoltura
+
+
+@memorizada
+def propagacion(tamanos, capa=0):
+    """
+    a_{l+1} = f(W_l a_l + b_l)
+    """
+    from sympy import Eq, Function, MatrixSymbol
+
+    entradas, salidas = tamanos[capa], tamanos[capa + 1]
+    pesos = MatrixSymbol(f"W_{capa}", salidas, entradas)
+    activacion = MatrixSymbol(f"a_{capa}", entradas, 1)
+    sesgo = MatrixSymbol(f"b_{capa}", salidas, 1)
+    siguiente = MatrixSymbol(f"a_{capa + 1}", salidas, 1)
+    return Eq(siguiente, (pesos * activacion + sesgo).applyfunc(Function("f")), evaluate=False)
+
+
+@memorizada
+def retropropagacion(tamanos, capa=0):
+    """
+    delta_l = W_lᵀ (delta_{l+1} ⊙ f'(z_l))
+    """
+    from sympy import Eq, Function, HadamardProduct, MatMul, MatrixSymbol
+
+    entradas, salidas = tamanos[capa], tamanos[capa + 1]
+    pesos = MatrixSymbol(f"W_{capa}", salidas, entradas)
+    z = MatrixSymbol(f"z_{capa}", salidas, 1)
+    delta = MatrixSymbol(f"delta_{capa}", entradas, 1)
+    delta_siguiente = MatrixSymbol(f"delta_{capa + 1}", salidas, 1)
+    producto = HadamardProduct(delta_siguiente, z.applyfunc(Function("f'")))
+    # evaluate=False conserva el orden delta ⊙ f'; MatMul igual verifica las dimensiones
+    return Eq(delta, MatMul(pesos.T, producto, evaluate=False), evaluate=False)
+
+
+class EcuacionTex(MathTex):
+    """
+    MathTex con una cadena por ficha, para ubicar cada término por nombre.
+    """
+
+    def __init__(self, ecuacion, **kwargs):
+        self.ecuacion = ecuacion
+        super().__init__(*(latex for _, latex in ecuacion.fichas), **kwargs)
+
+    def parte(self, nombre):
+        return self.submobjects[self.ecuacion.indice(nombre)]
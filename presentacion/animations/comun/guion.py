@@ -0,0 +1,144 @@
+"""
+Guiones de narración de las escenas.
+
+Los mensajes del cuadro de diálogo y las pausas de cada escena viven en
+``animations/guiones/<modulo>.json`` (o ``.yaml`` si PyYAML está instalado),
+no en el código. Quien traduce o corrige el texto, o ajusta cuánto dura cada
+pausa, edita solo ese archivo. El guion forma parte de la huella de la
+escena, así que cualquier cambio la vuelve a renderizar. Manim reutiliza de
+su caché las animaciones anteriores a la línea cambiada, pero el hash de
+cada animación incluye todos los mobjects en pantalla: un texto nuevo queda
+visible en el cuadro de diálogo y vuelve a renderizar todo desde esa línea
+en adelante. Cambiar solo una espera renderiza de nuevo solo esa espera.
+
+Formato:
+
+    {
+      "lineas": [
+        {"id": "funcion", "texto": "Una función es ...", "espera": 4},
+        {"id": "pausa_grafica", "espera": 4}
+      ]
+    }
+
+``id`` es la clave con la que la escena pide la línea, ``texto`` el mensaje
+(opcional: una línea sin texto es solo una pausa) y ``espera`` los segundos
+que se mantiene la imagen después del paso que acompaña a la línea.
+"""
+import json
+from pathlib import Path
+
+DIRECTORIO_GUIONES = Path(__file__).resolve().parent.parent / "guiones"
+EXTENSIONES = (".json", ".yaml", ".yml")
+
+# Lo que tarda el diálogo en cambiar de mensaje (Dialogo.decir)
+DURACION_CAMBIO = 1.0
+
+
+class ErrorDeGuion(Exception):
+    pass
+
+
+def ruta_guion(modulo, directorio=DIRECTORIO_GUIONES):
+    """
+    Archivo de guion de un módulo de escena, o None si no tiene.
+    """
+    for extension in EXTENSIONES:
+        ruta = Path(directorio) / f"{modulo}{extension}"
+        if ruta.exists():
+            return ruta
+    return None
+
+
+def _leer(ruta):
+    texto = ruta.read_text(encoding="utf-8")
+    if ruta.suffix == ".json":
+        return json.loads(texto)
+    try:
+        import yaml
+    except ImportError as error:
+        raise ErrorDeGuion(f"{ruta.name}: leer guiones YAML requiere PyYAML") from error
+    return yaml.safe_load(texto)
+
+
+class Linea:
+    def __init__(self, clave, texto, espera):
+        self.id = clave
+        self.texto = texto
+        self.espera = espera
+
+    def __repr__(self):
+        return f"Linea({self.id!r}, espera={self.espera})"
+
+
+class Guion:
+    """
+    Líneas de narración de una escena, en orden y accesibles por id.
+    """
+
+    def __init__(self, lineas, ruta=None):
+        self.lineas = lineas
+        self.ruta = ruta
+        self._por_id = {linea.id: linea for linea in lineas}
+
+    @classmethod
+    def cargar(cls, modulo, directorio=DIRECTORIO_GUIONES):
+        """
+        Lee y valida el guion de un módulo de escena (por ejemplo "derivada1").
+        """
+        ruta = ruta_guion(modulo, directorio)
+        if ruta is None:
+            raise ErrorDeGuion(f"No hay guion para {modulo} en {directorio}")
+        return cls.desde_datos(_leer(ruta), ruta)
+
+    @classmethod
+    def desde_datos(cls, datos, ruta=None):
+        nombre = ruta.name if ruta else "guion"
+        lineas = []
+        vistos = set()
+        for numero, entrada in enumerate(datos.get("lineas", []), start=1):
+            clave = entrada.get("id")
+            texto = entrada.get("texto")
+            espera = entrada.get("espera", 0)
+            if not isinstance(clave, str) or not clave:
+                raise ErrorDeGuion(f"{nombre}, línea {numero}: falta el id")
+            if clave in vistos:
+                raise ErrorDeGuion(f"{nombre}: el id {clave!r} está repetido")
+            if texto is not None and not isinstance(texto, str):
+                raise ErrorDeGuion(f"{nombre}, {clave}: el texto debe ser una cadena")
+            if not isinstance(espera, (int, float)) or espera < 0:
+                raise ErrorDeGuion(f"{nombre}, {clave}: la espera debe ser un número no negativo")
+            vistos.add(clave)
+            lineas.append(Linea(clave, texto, float(espera)))
+        return cls(lineas, ruta)
+
+    def __getitem__(self, clave):
+        try:
+            return self._por_id[clave]
+        except KeyError:
+            raise ErrorDeGuion(f"El guion no tiene la línea {clave!r}") from None
+
+    def texto(self, clave):
+        return self[clave].texto
+
+    def espera(self, clave):
+        return self[clave].espera
+
+    def textos(self):
+        """
+        Todos los mensajes del guion, en orden.
+        """
+        return [linea.texto for linea in self.lineas if linea.texto is not None]
+
+    def linea_de_tiempo(self, duracion_cambio=DURACION_CAMBIO):
+        """
+        Lista de (id, inicio, duración) con el tiempo de narración de cada
+        línea: el cambio de mensaje más su espera. No incluye las animaciones
+        propias de la escena, que dependen del código.
+        """
+        tiempo = 0.0
+        segmentos = []
+        for linea in self.lineas:
+            duracion = (duracion_cambio if linea.texto is not None else 0.0) + linea.espera
+            segmentos.append((linea.id, tiempo, duracion))
+            tiempo += duracion
+        return segmentos
@@ -0,0 +1,136 @@
+"""
+Motor de K-Means vectorizado con NumPy.
+
+La escena KMeansExplained lo usa como fuente de datos: las distancias se
+calculan como una matriz completa (puntos x centroides), la asignación es un
+argmin por filas y los centroides nuevos salen de sumas con bincount, sin
+bucles de Python sobre los puntos. Funciona igual con 50 puntos que con un
+millón.
+"""
+import numpy as np
+
+# Filas por bloque al calcular distancias: acota la memoria de la matriz
+# (puntos x centroides) cuando hay millones de puntos
+TAMANO_BLOQUE = 262_144
+
+
+def distancias_cuadradas(puntos, centroides):
+    """
+    Matriz (n, k) de distancias euclidianas al cuadrado, usando
+    ||x - c||² = ||x||² - 2 x·c + ||c||².
+    """
+    normas_puntos = np.einsum("ij,ij->i", puntos, puntos)[:, None]
+    normas_centroides = np.einsum("ij,ij->i", centroides, centroides)[None, :]
+    distancias = normas_puntos - 2.0 * (puntos @ centroides.T) + normas_centroides
+    # El redondeo puede dejar valores ligeramente negativos
+    return np.maximum(distancias, 0.0, out=distancias)
+
+
+def asignar(puntos, centroides, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Índice del centroide más cercano a cada punto.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    centroides = np.asarray(centroides, dtype=float)
+    etiquetas = np.empty(len(puntos), dtype=np.intp)
+    for inicio in range(0, len(puntos), tamano_bloque):
+        bloque = slice(inicio, inicio + tamano_bloque)
+        etiquetas[bloque] = distancias_cuadradas(puntos[bloque], centroides).argmin(axis=1)
+    return etiquetas
+
+
+def actualizar_centroides(puntos, etiquetas, centroides, rng=None):
+    """
+    Media de los puntos asignados a cada centroide. Un cluster vacío se
+    reinicia en un punto elegido al azar, como en la versión original de la
+    escena; sin ``rng`` se usa uno con semilla fija para que el render sea
+    determinista.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    k, dimension = np.shape(centroides)
+    conteos = np.bincount(etiquetas, minlength=k)
+    sumas = np.stack(
+        [np.bincount(etiquetas, weights=puntos[:, j], minlength=k) for j in range(dimension)],
+        axis=1,
+    )
+    nuevos = np.empty((k, dimension))
+    llenos = conteos > 0
+    nuevos[llenos] = sumas[llenos] / conteos[llenos, None]
+
+    vacios = np.flatnonzero(~llenos)
+    if len(vacios):
+        rng = rng if rng is not None else np.random.default_rng(0)
+        nuevos[vacios] = puntos[rng.integers(len(puntos), size=len(vacios))]
+    return nuevos
+
+
+def inercia(puntos, etiquetas, centroides):
+    """
+    Suma de distancias al cuadrado de cada punto a su centroide.
+    """
+    diferencias = np.asarray(puntos, dtype=float) - np.asarray(centroides)[etiquetas]
+    return float(np.einsum("ij,ij->", diferencias, diferencias))
+
+
+class LineaDeTiempoKMeans:
+    """
+    Historial completo de una ejecución de K-Means, calculado antes de animar.
+
+    - ``etiquetas``: arreglo (iteraciones, puntos) con la asignación de cada
+      iteración, en el entero sin signo más pequeño que alcance para k.
+    - ``centroides``: arreglo (iteraciones + 1, k, dimensión); la fila 0 son
+      los centroides iniciales y la fila i + 1 los que resultan de la
+      iteración i.
+    """
+
+    def __init__(self, etiquetas, centroides, convergio):
+        self.etiquetas = etiquetas
+        self.centroides = centroides
+        self.convergio = convergio
+
+    @property
+    def iteraciones(self):
+        return len(self.etiquetas)
+
+    def cambios(self, iteracion):
+        """
+        Índices de los puntos que cambiaron de cluster en esa iteración
+        (en la primera, todos).
+        """
+        if iteracion == 0:
+            return np.arange(self.etiquetas.shape[1])
+        return np.flatnonzero(self.etiquetas[iteracion] != self.etiquetas[iteracion - 1])
+
+    def clusters_afectados(self, iteracion):
+        """
+        Clusters que ganaron o perdieron puntos en esa iteración.
+        """
+        cambios = self.cambios(iteracion)
+        if iteracion == 0:
+            return np.unique(self.etiquetas[0])
+        return np.union1d(self.etiquetas[iteracion][cambios], self.etiquetas[iteracion - 1][cambios])
+
+
+def resolver_kmeans(puntos, centroides_iniciales, tolerancia=1e-4, max_iteraciones=100, rng=None):
+    """
+    Itera asignación y actualización hasta que ningún centroide se mueva más
+    de ``tolerancia`` (o hasta ``max_iteraciones``) y devuelve la línea de
+    tiempo completa.
+    """
+    puntos = np.asarray(puntos, dtype=float)
+    # Un solo generador para toda la línea de tiempo, con semilla fija por defecto
+    rng = rng if rng is not None else np.random.default_rng(0)
+    centroides = [np.asarray(centroides_iniciales, dtype=float)]
+    tipo = np.min_scalar_type(len(centroides[0]) - 1)
+    etiquetas = []
+    convergio = False
+    for _ in range(max_iteraciones):
+        actuales = asignar(puntos, centroides[-1])
+        nuevos = actualizar_centroides(puntos, actuales, centroides[-1], rng=rng)
+        etiquetas.append(actuales.astype(tipo))
+        desplazamiento = np.linalg.norm(nuevos - centroides[-1], axis=1).max()
+        centroides.append(nuevos)
+        if desplazamiento <= tolerancia:
+            convergio = True
+            break
+    return LineaDeTiempoKMeans(np.array(etiquetas), np.array(centroides), convergio)
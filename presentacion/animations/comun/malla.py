@@ -0,0 +1,141 @@
+"""
+Malla de conexiones entre dos capas respaldada por arreglos.
+
+Todas las aristas de un par de capas viven en un solo mobject: sus extremos,
+colores (RGBA) y grosores son arreglos de NumPy con una fila por arista.
+Para dibujar, las aristas con el mismo estilo se agrupan en un VMobject por
+estilo, con cada arista como un subcamino, así que Cairo traza unos pocos
+caminos en lugar de uno por arista. Cambiar el estilo de miles de aristas es
+una sola animación (TransicionMalla) que interpola los arreglos.
+"""
+import numpy as np
+from manim import Animation, VGroup, VMobject, color_to_rgba, interpolate, rgb_to_color
+
+# Resolución con la que se agrupan los estilos: colores en pasos de 1/64 y
+# grosores en pasos de 1/8
+PASOS_COLOR = 64
+PASOS_GROSOR = 8
+
+
+def _segmentos(inicios, finales):
+    """
+    Puntos de control de una curva recta por arista (cuatro por arista).
+    """
+    return np.linspace(inicios, finales, 4, axis=1).reshape(-1, 3)
+
+
+class MallaDeConexiones(VGroup):
+    """
+    Aristas rectas con estilo por arista. Los submobjects son los trazos por
+    estilo y se reutilizan entre redibujados, para que la escena siga
+    dibujando los mismos objetos durante una animación.
+    """
+
+    def __init__(self, inicios, finales, color, stroke_width=1.0, stroke_opacity=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.inicios = np.array(inicios, dtype=float)
+        self.finales = np.array(finales, dtype=float)
+        self.colores = np.tile(color_to_rgba(color, stroke_opacity), (len(self.inicios), 1))
+        self.grosores = np.full(len(self.inicios), float(stroke_width))
+        self.indices_origen = None
+        self.indices_destino = None
+        self.redibujar()
+
+    @classmethod
+    def entre(cls, origenes, destinos, pares=None, **kwargs):
+        """
+        Conecta los puntos ``origenes`` con los ``destinos``. ``pares`` son
+        dos arreglos de índices (origen, destino), uno por arista; por
+        defecto se conectan todos con todos y la arista i * len(destinos) + j
+        va del origen i al destino j. Los índices quedan en
+        ``indices_origen`` e ``indices_destino``.
+        """
+        origenes = np.asarray(origenes, dtype=float)
+        destinos = np.asarray(destinos, dtype=float)
+        if pares is None:
+            pares = np.divmod(np.arange(len(origenes) * len(destinos)), len(destinos))
+        indices_origen, indices_destino = (np.asarray(p) for p in pares)
+        malla = cls(origenes[indices_origen], destinos[indices_destino], **kwargs)
+        malla.indices_origen = indices_origen
+        malla.indices_destino = indices_destino
+        return malla
+
+    @property
+    def num_aristas(self):
+        return len(self.inicios)
+
+    def centro_arista(self, indice):
+        return (self.inicios[indice] + self.finales[indice]) / 2
+
+    def redibujar(self):
+        """
+        Reparte las aristas visibles en un trazo por estilo a partir de los arreglos.
+        """
+        visibles = np.flatnonzero((self.colores[:, 3] > 0) & (self.grosores > 0))
+        grupos = []
+        if len(visibles):
+            claves = np.column_stack((
+                np.round(self.colores[visibles] * PASOS_COLOR),
+                np.round(self.grosores[visibles] * PASOS_GROSOR),
+            ))
+            _, inversa = np.unique(claves, axis=0, return_inverse=True)
+            inversa = inversa.reshape(-1)
+            orden = np.argsort(inversa, kind="stable")
+            cortes = np.cumsum(np.bincount(inversa))[:-1]
+            grupos = np.split(visibles[orden], cortes)
+
+        while len(self.submobjects) < len(grupos):
+            self.add(VMobject(fill_opacity=0))
+        for trazo, grupo in zip(self.submobjects, grupos):
+            trazo.set_points(_segmentos(self.inicios[grupo], self.finales[grupo]))
+            rgba = self.colores[grupo[0]]
+            trazo.set_stroke(rgb_to_color(rgba[:3]), width=self.grosores[grupo[0]], opacity=rgba[3])
+        for trazo in self.submobjects[len(grupos):]:
+            trazo.set_points(np.zeros((0, 3)))
+        return self
+
+    def estilo_destino(self, indices=None, color=None, opacidad=None, grosor=None):
+        """
+        Copias de los arreglos de colores y grosores con el estilo indicado
+        aplicado a ``indices`` (todas las aristas si es None). ``grosor`` y
+        ``opacidad`` pueden ser un valor o un arreglo con uno por arista.
+        """
+        colores = self.colores.copy()
+        grosores = self.grosores.copy()
+        seleccion = slice(None) if indices is None else np.asarray(indices)
+        if color is not None:
+            colores[seleccion, :3] = color_to_rgba(color)[:3]
+        if opacidad is not None:
+            colores[seleccion, 3] = opacidad
+        if grosor is not None:
+            grosores[seleccion] = grosor
+        return colores, grosores
+
+    def animar(self, indices=None, color=None, opacidad=None, grosor=None, **kwargs):
+        """
+        Animación que lleva las aristas al estilo indicado, en una sola TransicionMalla.
+        """
+        colores, grosores = self.estilo_destino(indices, color, opacidad, grosor)
+        return TransicionMalla(self, colores, grosores, **kwargs)
+
+
+class TransicionMalla(Animation):
+    """
+    Interpola los colores y grosores de todas las aristas de una malla.
+    """
+
+    def __init__(self, malla, colores, grosores, **kwargs):
+        self.colores_destino = np.asarray(colores, dtype=float)
+        self.grosores_destino = np.asarray(grosores, dtype=float)
+        super().__init__(malla, **kwargs)
+
+    def begin(self):
+        self.colores_inicio = self.mobject.colores.copy()
+        self.grosores_inicio = self.mobject.grosores.copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        t = self.rate_func(alpha)
+        self.mobject.colores = interpolate(self.colores_inicio, self.colores_destino, t)
+        self.mobject.grosores = interpolate(self.grosores_inicio, self.grosores_destino, t)
+        self.mobject.redibujar()
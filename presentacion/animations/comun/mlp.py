@@ -0,0 +1,128 @@
+"""
+Perceptrón multicapa en NumPy, vectorizado por minibatch.
+
+La escena DetailedNeuralNetwork lo usa para que la propagación y la
+retropropagación muestren valores calculados y no solo colores. Una pasada
+procesa el minibatch completo con una multiplicación de matrices por capa y
+guarda todas las activaciones, deltas y gradientes. La escena solo lee esos
+arreglos para fijar la opacidad de las neuronas y el grosor de las aristas,
+así que no se recalcula nada mientras se anima.
+
+La notación sigue la de show_equations, con las filas como ejemplos del
+minibatch:
+
+    z_l = W_l a_l + b_l,    a_{l+1} = f(z_l)
+    delta_l = W_lᵀ (delta_{l+1} ⊙ f'(z_l))
+
+donde delta_l es la derivada de la pérdida respecto de a_l.
+"""
+import numpy as np
+
+
+def sigmoide(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def escalar(valores, minimo, maximo):
+    """
+    Lleva magnitudes a [minimo, maximo], con el mayor valor absoluto en
+    ``maximo``. Sirve para convertir activaciones o gradientes en
+    opacidades o grosores.
+    """
+    valores = np.abs(np.asarray(valores, dtype=float))
+    tope = valores.max() if valores.size else 0.0
+    if tope == 0:
+        return np.full(valores.shape, float(minimo))
+    return minimo + (maximo - minimo) * valores / tope
+
+
+class PasadaMLP:
+    """
+    Resultado de una pasada hacia adelante y hacia atrás sobre un minibatch.
+
+    - ``activaciones[l]``: (ejemplos, tamanos[l]); la 0 es la entrada.
+    - ``deltas[l]``: derivada de la pérdida respecto de ``activaciones[l]``.
+    - ``gradientes_pesos[l]`` y ``gradientes_sesgos[l]``: promedios del
+      minibatch para W_l (tamanos[l + 1], tamanos[l]) y b_l.
+    """
+
+    def __init__(self, pesos, activaciones, deltas, gradientes_pesos, gradientes_sesgos, perdida):
+        self.pesos = pesos
+        self.activaciones = activaciones
+        self.deltas = deltas
+        self.gradientes_pesos = gradientes_pesos
+        self.gradientes_sesgos = gradientes_sesgos
+        self.perdida = perdida
+
+    def activacion_media(self, capa):
+        """
+        Activación promedio de cada neurona de la capa en el minibatch.
+        """
+        return self.activaciones[capa].mean(axis=0)
+
+    def delta_medio(self, capa):
+        """
+        Magnitud promedio del delta de cada neurona de la capa.
+        """
+        return np.abs(self.deltas[capa]).mean(axis=0)
+
+    def contribuciones(self, capa):
+        """
+        |W_l| por la activación promedio de la neurona de origen: cuánto
+        aporta cada arista a z_l. Forma (tamanos[l + 1], tamanos[l]).
+        """
+        return np.abs(self.pesos[capa]) * self.activacion_media(capa)[None, :]
+
+
+class MLP:
+    """
+    Red densa con activación sigmoide en todas las capas y pérdida
+    cuadrática media.
+    """
+
+    def __init__(self, tamanos, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        self.tamanos = list(tamanos)
+        # Inicialización de LeCun: varianza 1 / entradas de la capa
+        self.pesos = [
+            rng.normal(0.0, 1.0 / np.sqrt(entradas), size=(salidas, entradas))
+            for entradas, salidas in zip(self.tamanos[:-1], self.tamanos[1:])
+        ]
+        self.sesgos = [np.zeros(salidas) for salidas in self.tamanos[1:]]
+
+    def propagar(self, entradas):
+        """
+        Activaciones de todas las capas para un minibatch (ejemplos, tamanos[0]).
+        """
+        activaciones = [np.asarray(entradas, dtype=float)]
+        for pesos, sesgos in zip(self.pesos, self.sesgos):
+            activaciones.append(sigmoide(activaciones[-1] @ pesos.T + sesgos))
+        return activaciones
+
+    def retropropagar(self, activaciones, objetivos):
+        """
+        Deltas de todas las capas y gradientes promedio de pesos y sesgos.
+        """
+        ejemplos = len(objetivos)
+        delta = activaciones[-1] - np.asarray(objetivos, dtype=float)
+        deltas = [delta]
+        gradientes_pesos = []
+        gradientes_sesgos = []
+        for capa in reversed(range(len(self.pesos))):
+            salida = activaciones[capa + 1]
+            # delta_{l+1} ⊙ f'(z_l), con f'(z) = f(z) (1 - f(z))
+            error = delta * salida * (1.0 - salida)
+            gradientes_pesos.append(error.T @ activaciones[capa] / ejemplos)
+            gradientes_sesgos.append(error.mean(axis=0))
+            delta = error @ self.pesos[capa]
+            deltas.append(delta)
+        return deltas[::-1], gradientes_pesos[::-1], gradientes_sesgos[::-1]
+
+    def pasada(self, entradas, objetivos):
+        """
+        Propaga y retropropaga un minibatch completo.
+        """
+        activaciones = self.propagar(entradas)
+        deltas, gradientes_pesos, gradientes_sesgos = self.retropropagar(activaciones, objetivos)
+        perdida = 0.5 * float(np.mean(np.sum((activaciones[-1] - objetivos) ** 2, axis=1)))
+        return PasadaMLP(self.pesos, activaciones, deltas, gradientes_pesos, gradientes_sesgos, perdida)
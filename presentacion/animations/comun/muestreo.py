@@ -0,0 +1,153 @@
+"""
+Muestreo compartido de funciones para gráficas, áreas y rectángulos.
+
+``axes.plot`` y ``axes.get_area`` evalúan la función de Python punto por
+punto cada vez que se llaman. Aquí la función se evalúa con NumPy sobre
+arreglos y el resultado se memoriza por función, intervalo y tolerancia, así
+que la gráfica, el área sombreada y los rectángulos de Riemann de una escena
+usan los mismos arreglos.
+
+Dos lambdas con el mismo código, las mismas variables capturadas y los
+mismos valores en las globales que usan cuentan como la misma función, de
+modo que ``lambda x: x**2`` escrita en dos lugares comparte la caché. Los
+arreglos devueltos son de solo lectura.
+
+Uso:
+
+    muestra = muestrear(lambda x: x**2, 0, 5)
+    graph = curva(axes, muestra, color=BLUE)
+    shaded_area = area(axes, muestra, color=BLUE, opacity=0.3)
+"""
+import numpy as np
+from manim import VMobject
+
+# Puntos iniciales y máximo de pasadas de refinamiento de muestrear
+BASE = 64
+PASADAS = 12
+
+# Particiones de nodos que se guardan a la vez
+MAXIMO_NODOS = 1024
+
+_MUESTRAS = {}
+_NODOS = {}
+
+
+def _clave(funcion):
+    """
+    Identifica la función por su código, sus valores capturados y los
+    valores actuales de las globales que nombra; si no se puede (ufuncs,
+    valores no hashables), por la función misma.
+    """
+    codigo = getattr(funcion, "__code__", None)
+    if codigo is None:
+        return funcion
+    celdas = tuple(celda.cell_contents for celda in funcion.__closure__ or ())
+    globales = tuple(funcion.__globals__.get(nombre) for nombre in codigo.co_names)
+    clave = (codigo.co_code, codigo.co_consts, codigo.co_names, funcion.__defaults__, celdas, globales)
+    try:
+        hash(clave)
+    except TypeError:
+        return funcion
+    return clave
+
+
+def _solo_lectura(arreglo):
+    arreglo = np.asarray(arreglo, dtype=float)
+    arreglo.setflags(write=False)
+    return arreglo
+
+
+class Muestra:
+    """
+    Puntos (xs, ys) de una función en [a, b], más densos donde la curva se
+    aparta de la recta entre muestras vecinas.
+    """
+
+    def __init__(self, funcion, xs, ys):
+        self.funcion = funcion
+        self.xs = _solo_lectura(xs)
+        self.ys = _solo_lectura(ys)
+
+    def tramo(self, a, b):
+        """
+        Puntos dentro de [a, b], con los extremos evaluados si no estaban.
+        """
+        dentro = (self.xs > a) & (self.xs < b)
+        extremos = np.asarray(self.funcion(np.array([a, b], dtype=float)), dtype=float)
+        xs = np.concatenate(([a], self.xs[dentro], [b]))
+        ys = np.concatenate(([extremos[0]], self.ys[dentro], [extremos[1]]))
+        return xs, ys
+
+
+def muestrear(funcion, a, b, tolerancia=1e-3):
+    """
+    Muestra de ``funcion`` (que debe aceptar arreglos) en [a, b]. Parte de
+    una malla uniforme y agrega el punto medio de cada intervalo donde la
+    recta entre sus extremos se aparta más de ``tolerancia`` (en unidades
+    del eje y) de la función. Se memoriza.
+    """
+    clave = (_clave(funcion), float(a), float(b), tolerancia)
+    if clave in _MUESTRAS:
+        return _MUESTRAS[clave]
+
+    xs = np.linspace(a, b, BASE + 1)
+    ys = np.asarray(funcion(xs), dtype=float)
+    for _ in range(PASADAS):
+        medios = (xs[:-1] + xs[1:]) / 2
+        valores = np.asarray(funcion(medios), dtype=float)
+        malos = np.flatnonzero(np.abs(valores - (ys[:-1] + ys[1:]) / 2) > tolerancia)
+        if not len(malos):
+            break
+        xs = np.insert(xs, malos + 1, medios[malos])
+        ys = np.insert(ys, malos + 1, valores[malos])
+
+    muestra = _MUESTRAS[clave] = Muestra(funcion, xs, ys)
+    return muestra
+
+
+def nodos(funcion, a, b, n):
+    """
+    f(x_0), ..., f(x_n) en la partición uniforme de [a, b] en n partes. Se
+    memorizan las últimas MAXIMO_NODOS particiones; los puntos medios de la
+    partición en n son los nodos impares de la partición en 2n.
+    """
+    clave = (_clave(funcion), float(a), float(b), int(n))
+    if clave not in _NODOS:
+        if len(_NODOS) >= MAXIMO_NODOS:
+            del _NODOS[next(iter(_NODOS))]
+        _NODOS[clave] = _solo_lectura(funcion(np.linspace(a, b, int(n) + 1)))
+    return _NODOS[clave]
+
+
+def a_escena(axes, xs, ys):
+    """
+    Coordenadas de la escena de los puntos (xs, ys) de unos ejes lineales,
+    para arreglos de cualquier forma.
+    """
+    origen = np.array(axes.c2p(0, 0))
+    eje_x = np.array(axes.c2p(1, 0)) - origen
+    eje_y = np.array(axes.c2p(0, 1)) - origen
+    return origen + np.asarray(xs)[..., None] * eje_x + np.asarray(ys)[..., None] * eje_y
+
+
+def curva(axes, muestra, x_range=None, **kwargs):
+    """
+    Gráfica de la muestra (o de su tramo en ``x_range``) como una poligonal,
+    en lugar de ``axes.plot``.
+    """
+    xs, ys = muestra.tramo(*x_range[:2]) if x_range else (muestra.xs, muestra.ys)
+    return VMobject(**kwargs).set_points_as_corners(a_escena(axes, xs, ys))
+
+
+def area(axes, muestra, x_range=None, color="#90CAF9", opacity=0.3, **kwargs):
+    """
+    Región entre la muestra y el eje x, en lugar de ``axes.get_area``.
+    """
+    xs, ys = muestra.tramo(*x_range[:2]) if x_range else (muestra.xs, muestra.ys)
+    contorno = a_escena(
+        axes,
+        np.concatenate(([xs[0]], xs, [xs[-1], xs[0]])),
+        np.concatenate(([0], ys, [0, 0])),
+    )
+    region = VMobject(stroke_width=0, **kwargs).set_points_as_corners(contorno)
+    return region.set_fill(color, opacity=opacity)
@@ -0,0 +1,46 @@
+"""
+Nube de puntos en un solo mobject, respaldada por arreglos de NumPy.
+
+En lugar de un Dot (y un VMobject con sus curvas) por cada punto de datos,
+todos los puntos viven en ``points`` y sus colores en ``rgbas`` de un único
+PMobject. Colorear por cluster es una indexación de la paleta con el vector
+de etiquetas, sin crear objetos de Python por punto.
+"""
+import numpy as np
+from manim import PMobject, WHITE, color_to_rgba, config, interpolate
+
+
+class NubeDePuntos(PMobject):
+    """
+    Puntos de datos dibujados como una nube. ``radio`` está en unidades de
+    la escena, igual que el radio de un Dot, y se convierte a píxeles según
+    la resolución del render y el ancho del marco de la cámara
+    (``ancho_marco``; por defecto el de la configuración, que no ve los
+    cambios que la escena hace en ``self.camera.frame_width``).
+    """
+
+    def __init__(self, puntos, radio=0.02, color=WHITE, color_fondo=WHITE, ancho_marco=None, **kwargs):
+        ancho_marco = ancho_marco or config.frame_width
+        grosor = max(1, round(2 * radio * config.pixel_width / ancho_marco))
+        super().__init__(stroke_width=grosor, **kwargs)
+        self.color_fondo = color_fondo
+        puntos = np.asarray(puntos, dtype=float)
+        if puntos.shape[1] == 2:
+            puntos = np.hstack((puntos, np.zeros((len(puntos), 1))))
+        self.add_points(puntos, color=color)
+
+    def colorear_por(self, etiquetas, paleta):
+        """
+        Asigna a cada punto el color de su etiqueta, escribiendo sobre el
+        mismo arreglo de colores.
+        """
+        tabla = np.array([color_to_rgba(color) for color in paleta])
+        self.rgbas[:] = tabla[np.asarray(etiquetas)]
+        return self
+
+    def fade(self, darkness=0.5, family=True):
+        # La cámara escribe los píxeles de la nube sin mezclar el canal alfa,
+        # así que desvanecer es acercar los colores al fondo
+        fondo = color_to_rgba(self.color_fondo)
+        self.rgbas[:, :3] = interpolate(self.rgbas[:, :3], fondo[:3], darkness)
+        return super().fade(darkness, family)
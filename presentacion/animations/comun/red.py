@@ -0,0 +1,61 @@
+"""
+Topología de una red neuronal densa para dibujarla: posición de cada neurona
+y qué aristas se muestran.
+
+Todo sale de la lista de tamaños de capa, así que la misma escena sirve para
+una red de juguete o para un MLP con cientos de neuronas por capa. Cuando un
+par de capas tiene más aristas de las que se pueden distinguir en pantalla,
+se dibuja una muestra uniforme de ellas.
+"""
+import numpy as np
+
+# Aristas por par de capas a partir de las cuales se dibuja una muestra
+MAXIMO_ARISTAS = 400
+
+
+class Disposicion:
+    """
+    Centros de las neuronas de cada capa (``centros[i]`` es un arreglo
+    (tamanos[i], 3)) y el radio común de las neuronas.
+    """
+
+    def __init__(self, centros, radio):
+        self.centros = centros
+        self.radio = radio
+
+
+def disponer_capas(tamanos, ancho=12.0, alto=7.2, radio_maximo=0.3, separacion_maxima=1.2):
+    """
+    Reparte las capas a lo ancho y las neuronas de cada capa a lo alto,
+    centradas en el origen. La separación entre neuronas se reduce para que
+    la capa más grande quepa en ``alto`` y el radio se escala con ella.
+    Con los valores por defecto, una capa de 7 neuronas queda como en la
+    escena original (radio 0.3, centros a 1.2 de distancia).
+    """
+    if not tamanos or min(tamanos) < 1:
+        raise ValueError("Cada capa necesita al menos una neurona.")
+    xs = np.linspace(-ancho / 2, ancho / 2, len(tamanos)) if len(tamanos) > 1 else np.zeros(1)
+    separacion = min(separacion_maxima, alto / max(max(tamanos) - 1, 1))
+    radio = min(radio_maximo, separacion / 4)
+
+    centros = []
+    for x, tamano in zip(xs, tamanos):
+        ys = (np.arange(tamano) - (tamano - 1) / 2) * -separacion
+        centros.append(np.column_stack((np.full(tamano, x), ys, np.zeros(tamano))))
+    return Disposicion(centros, radio)
+
+
+def muestrear_aristas(n_origen, n_destino, maximo=MAXIMO_ARISTAS, rng=None):
+    """
+    Índices (origen, destino) de las aristas que se dibujan entre dos capas,
+    ordenados por origen. Si hay más de ``maximo`` se toma una muestra
+    uniforme sin reemplazo (con semilla fija si no se pasa ``rng``, para que
+    el render sea determinista); con ``maximo=None`` se dibujan todas.
+    """
+    total = n_origen * n_destino
+    if maximo is None or total <= maximo:
+        planos = np.arange(total)
+    else:
+        rng = rng if rng is not None else np.random.default_rng(0)
+        planos = np.sort(rng.choice(total, size=maximo, replace=False))
+    return np.divmod(planos, n_destino)
@@ -0,0 +1,107 @@
+"""
+Sumas de Riemann vectorizadas y rectángulos respaldados por arreglos.
+
+``sumas_de_riemann`` calcula las sumas por la izquierda, por la derecha, por
+el punto medio y la regla del trapecio para una secuencia completa de valores
+de n en una sola pasada: los nodos de todas las particiones se concatenan en
+un arreglo, la función se evalúa una vez sobre él y cada suma sale de
+``np.add.reduceat``.
+
+``RectangulosDeRiemann`` dibuja los n rectángulos como un solo VMobject, con
+cada rectángulo como un subcamino, igual que MallaDeConexiones con las
+aristas. Cambiar n recalcula los puntos con NumPy y los reemplaza en el
+mismo mobject, así que animar n de 10 a 10 000 no crea ningún Rectangle.
+"""
+import numpy as np
+from manim import VMobject
+
+from .muestreo import a_escena, nodos
+
+METODOS = ("izquierda", "derecha", "medio", "trapecio")
+
+
+def _particiones(ns, puntos):
+    """
+    Índice local (0, 1, ...) de cada punto de las particiones concatenadas
+    y la posición donde empieza cada partición.
+    """
+    inicios = np.concatenate(([0], np.cumsum(puntos)[:-1]))
+    return np.arange(puntos.sum()) - np.repeat(inicios, puntos), inicios
+
+
+def sumas_de_riemann(funcion, a, b, ns):
+    """
+    Sumas de Riemann de ``funcion`` (que debe aceptar arreglos) en [a, b]
+    para cada n de ``ns``. Devuelve {método: arreglo con una suma por n}.
+    """
+    ns = np.asarray(ns, dtype=int)
+    dx = (b - a) / ns
+
+    # Nodos x_0, ..., x_n de cada partición
+    indices, inicios = _particiones(ns, ns + 1)
+    valores = funcion(a + indices * np.repeat(dx, ns + 1))
+    total = np.add.reduceat(valores, inicios)
+    izquierda = (total - valores[inicios + ns]) * dx
+    derecha = (total - valores[inicios]) * dx
+
+    # Puntos medios de cada subintervalo
+    indices, inicios = _particiones(ns, ns)
+    medio = np.add.reduceat(funcion(a + (indices + 0.5) * np.repeat(dx, ns)), inicios) * dx
+
+    return {
+        "izquierda": izquierda,
+        "derecha": derecha,
+        "medio": medio,
+        "trapecio": (izquierda + derecha) / 2,
+    }
+
+
+class RectangulosDeRiemann(VMobject):
+    """
+    Los n rectángulos de una suma de Riemann sobre unos ejes lineales. La
+    altura de cada uno es la función evaluada en su punto de muestra
+    (``metodo``: "izquierda", "derecha" o "medio").
+    """
+
+    def __init__(self, axes, funcion, a, b, n=10, metodo="izquierda", stroke_width=0.5, **kwargs):
+        super().__init__(stroke_width=stroke_width, **kwargs)
+        if metodo not in ("izquierda", "derecha", "medio"):
+            raise ValueError(f"Método de muestra desconocido: {metodo}")
+        self.axes = axes
+        self.funcion = funcion
+        self.a = a
+        self.b = b
+        self.metodo = metodo
+        self.grosor = stroke_width
+        self.n = None
+        self.actualizar(n)
+
+    def actualizar(self, n):
+        """
+        Reemplaza los puntos por los de n rectángulos. Las alturas salen de
+        los nodos memorizados de muestreo.py; el borde se adelgaza a medida
+        que los rectángulos se estrechan.
+        """
+        n = int(n)
+        if n == self.n:
+            return self
+        self.n = n
+        bordes = np.linspace(self.a, self.b, n + 1)
+        if self.metodo == "medio":
+            alturas = nodos(self.funcion, self.a, self.b, 2 * n)[1::2]
+        elif self.metodo == "izquierda":
+            alturas = nodos(self.funcion, self.a, self.b, n)[:-1]
+        else:
+            alturas = nodos(self.funcion, self.a, self.b, n)[1:]
+
+        # Esquinas en el orden del contorno, volviendo a la primera
+        xs = np.stack([bordes[:-1], bordes[1:], bordes[1:], bordes[:-1], bordes[:-1]], axis=1)
+        ys = np.stack([np.zeros(n), np.zeros(n), alturas, alturas, np.zeros(n)], axis=1)
+        esquinas = a_escena(self.axes, xs, ys)
+
+        # Cada lado es una curva recta de cuatro puntos de control
+        t = np.linspace(0, 1, 4)[None, None, :, None]
+        inicio, fin = esquinas[:, :-1, None, :], esquinas[:, 1:, None, :]
+        self.set_points((inicio + t * (fin - inicio)).reshape(-1, 3))
+        self.set_stroke(width=self.grosor * min(1.0, 20 / n))
+        return self
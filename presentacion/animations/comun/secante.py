@@ -0,0 +1,81 @@
+"""
+Secante que tiende a la tangente, controlada por un solo ValueTracker h.
+
+La función se evalúa una sola vez, con NumPy, sobre una malla de valores de
+h; con eso quedan precalculados los puntos (x0 + h, f(x0 + h)), las
+pendientes y los extremos de la secante en coordenadas de la escena. En cada
+cuadro el updater solo interpola esos arreglos en el valor actual de h y
+mueve la secante, los catetos Δx y Δy y la lectura de la pendiente: no se
+llama a la función de Python.
+"""
+import numpy as np
+from manim import DOWN, RIGHT, DecimalNumber, Dot, Line, MathTex, ValueTracker, VGroup
+
+from .muestreo import a_escena
+
+
+class LimiteSecante(VGroup):
+    """
+    Secante de ``funcion`` (que debe aceptar arreglos) entre x0 y x0 + h, con
+    sus catetos y etiquetas. ``lectura`` muestra la pendiente y se ubica
+    aparte; ``h`` es el ValueTracker que lo mueve todo.
+    """
+
+    def __init__(self, axes, funcion, x0, h_inicial=2, h_final=0.01, muestras=600, extension=1,
+                 color="#1565C0", color_catetos="#757575", color_texto="#000000", **kwargs):
+        super().__init__(**kwargs)
+        self.h = ValueTracker(h_inicial)
+
+        # Malla creciente de h (fina cerca de 0) y la función evaluada una vez
+        self.hs = np.geomspace(min(h_inicial, h_final), max(h_inicial, h_final), muestras)
+        x = np.concatenate(([x0], x0 + self.hs))
+        y = np.asarray(funcion(x), dtype=float)
+        y0, yh = y[0], y[1:]
+        self.pendientes = (yh - y0) / self.hs
+
+        inicio_x = np.full(muestras, x0 - extension)
+        fin_x = x0 + self.hs + extension
+        self.puntos = a_escena(axes, x0 + self.hs, yh)
+        self.esquinas = a_escena(axes, x0 + self.hs, np.full(muestras, y0))
+        self.inicios = a_escena(axes, inicio_x, y0 + self.pendientes * (inicio_x - x0))
+        self.fines = a_escena(axes, fin_x, y0 + self.pendientes * (fin_x - x0))
+        self.base = a_escena(axes, x0, y0)
+
+        self.secante = Line(self.inicios[-1], self.fines[-1], color=color)
+        self.delta_x = Line(self.base, self.esquinas[-1], color=color_catetos)
+        self.delta_y = Line(self.esquinas[-1], self.puntos[-1], color=color_catetos)
+        self.punto = Dot(self.puntos[-1], color=color)
+        self.etiqueta_x = MathTex("\\Delta x", color=color_texto).scale(0.6)
+        self.etiqueta_y = MathTex("\\Delta y", color=color_texto).scale(0.6)
+        self.add(self.secante, self.delta_x, self.delta_y, self.punto, self.etiqueta_x, self.etiqueta_y)
+
+        self.valor = DecimalNumber(self.pendientes[-1], num_decimal_places=3, color=color_texto).scale(0.7)
+        self.lectura = VGroup(
+            MathTex("\\frac{\\Delta y}{\\Delta x} =", color=color_texto).scale(0.7),
+            self.valor,
+        ).arrange(RIGHT, buff=0.15)
+
+        self.actualizar()
+        self.add_updater(lambda m: m.actualizar())
+
+    def _interpolar(self, arreglo):
+        """
+        Fila de ``arreglo`` en el valor actual de h, interpolando entre las
+        dos muestras vecinas.
+        """
+        h = np.clip(self.h.get_value(), self.hs[0], self.hs[-1])
+        i = min(max(np.searchsorted(self.hs, h), 1), len(self.hs) - 1)
+        t = (h - self.hs[i - 1]) / (self.hs[i] - self.hs[i - 1])
+        return arreglo[i - 1] + t * (arreglo[i] - arreglo[i - 1])
+
+    def actualizar(self):
+        punto = self._interpolar(self.puntos)
+        esquina = self._interpolar(self.esquinas)
+        self.secante.put_start_and_end_on(self._interpolar(self.inicios), self._interpolar(self.fines))
+        self.delta_x.put_start_and_end_on(self.base, esquina)
+        self.delta_y.put_start_and_end_on(esquina, punto)
+        self.punto.move_to(punto)
+        self.etiqueta_x.next_to(self.delta_x, DOWN, buff=0.1)
+        self.etiqueta_y.next_to(self.delta_y, RIGHT, buff=0.1)
+        self.valor.set_value(self._interpolar(self.pendientes))
+        return self
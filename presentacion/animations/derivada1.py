@@ -1,8 +1,14 @@
 from manim import *
 
+from comun.dialogo import Dialogo
+from comun.guion import Guion
+from comun.muestreo import curva, muestrear
+from comun.secante import LimiteSecante
+
 class derivada1(Scene):
     def construct(self):
-        # Configuración de la cámara para resolución 1080p
+        # Marco de 16 x 9 unidades; la resolución y los fps los fija el perfil
+        # de render (herramientas/entregas.py: borrador 480p15, maestro 1080p60)
         self.camera.frame_width = 16  # Relación de aspecto 16:9
         self.camera.frame_height = 9
 
@@ -27,61 +33,65 @@ class derivada1(Scene):
         self.wait(2)
         self.play(FadeOut(title), FadeOut(underline))
 
-        # Crear cuadro de diálogo fijo
-        dialog = self.create_dialog("Una función es una relación entre \"x\" y \"f(x)\", donde cada \"x\" tiene un único \"f(x)\".", animate=True)
-        self.wait(4)
+        # Crear cuadro de diálogo fijo; los mensajes y las pausas vienen del
+        # guion (guiones/derivada1.json) y se componen todos antes de empezar
+        guion = Guion.cargar("derivada1")
+        dialog = Dialogo(guion.texto("funcion"), color=self.colors["accent"], color_texto=self.colors["text"])
+        dialog.precompilar(guion.textos())
+        self.play(dialog.aparecer())
+        self.wait(guion.espera("funcion"))
 
         # Paso 1: Explicar qué es una función y mostrar la gráfica
-        self.update_dialog(dialog, "Por ejemplo, aquí está la función $f(x) = x^2$.")
+        self.play(dialog.decir(guion.texto("ejemplo_funcion")))
         axes = Axes(
             x_range=[-2, 6, 1],
             y_range=[-1, 10, 1],
             axis_config={"color": self.colors["text"]}
         ).scale(0.8).shift(UP * 1.5)
-        graph = axes.plot(lambda x: x**2, x_range=[-2, 5], color=self.colors["primary"], stroke_width=3)
+        graph = curva(axes, muestrear(lambda x: x**2, -2, 5), color=self.colors["primary"], stroke_width=3)
         graph_label = MathTex("f(x) = x^2", color=self.colors["text"]).scale(0.7).next_to(graph, RIGHT, buff=0.5)
         self.play(Create(axes), Create(graph), Write(graph_label))
-        self.wait(4)
+        self.wait(guion.espera("ejemplo_funcion"))
 
         # Paso 2: Explicar el cambio (Δ)
-        self.update_dialog(dialog, "$\\Delta$ representa un cambio en una cantidad.")
-        self.wait(4)
-        self.update_dialog(dialog, "Por ejemplo, $\\Delta x$ es un cambio en \"x\".")
+        self.play(dialog.decir(guion.texto("delta")))
+        self.wait(guion.espera("delta"))
+        self.play(dialog.decir(guion.texto("delta_x")))
         delta_x_arrow = Arrow(
             start=axes.coords_to_point(1, 1),
             end=axes.coords_to_point(2, 4),
             color=self.colors["highlight"]
         )
         self.play(Create(delta_x_arrow))
-        self.wait(4)
+        self.wait(guion.espera("delta_x"))
 
         # Explicación de Δy en la gráfica
-        self.update_dialog(dialog, "$\\Delta y$ es el cambio en el valor de la función.")
+        self.play(dialog.decir(guion.texto("delta_y")))
         delta_y_line = Line(
             start=axes.coords_to_point(2, 0),
             end=axes.coords_to_point(2, 4),
             color=self.colors["secondary"]
         )
         self.play(Create(delta_y_line))
-        self.wait(4)
+        self.wait(guion.espera("delta_y"))
 
         # Mostrar un punto en la gráfica
-        self.update_dialog(dialog, "Marquemos un punto en la curva para visualizar estos cambios.")
+        self.play(dialog.decir(guion.texto("punto")))
         point = Dot(axes.coords_to_point(1, 1), color=self.colors["secondary"])
         self.play(FadeIn(point))
-        self.wait(4)
+        self.wait(guion.espera("punto"))
 
         # Paso 3: Explicar qué es una pendiente
-        self.update_dialog(dialog, "La pendiente se define como:")
+        self.play(dialog.decir(guion.texto("pendiente")))
         slope_eq = MathTex("\\text{Pendiente} = \\frac{\\Delta y}{\\Delta x}", color=self.colors["text"]).next_to(axes, DOWN)
         self.play(Write(slope_eq))
-        self.wait(4)
+        self.wait(guion.espera("pendiente"))
         self.play(FadeOut(slope_eq))
-        self.update_dialog(dialog, "Nos dice qué tan inclinada está una línea.")
-        self.wait(4)
+        self.play(dialog.decir(guion.texto("inclinacion")))
+        self.wait(guion.espera("inclinacion"))
 
         # Paso 4: Explicar qué es una línea tangente
-        self.update_dialog(dialog, "Una línea tangente toca la curva en un solo punto.")
+        self.play(dialog.decir(guion.texto("tangente")))
         
         # Calcular la pendiente de la tangente manualmente
         x0 = 1
@@ -92,81 +102,96 @@ class derivada1(Scene):
             color=self.colors["accent"]
         )
         self.play(Create(tangent_line))
-        self.wait(4)
-        self.update_dialog(dialog, "Tiene la misma pendiente que la curva en ese punto.")
-        self.wait(4)
+        self.wait(guion.espera("tangente"))
+        self.play(dialog.decir(guion.texto("misma_pendiente")))
+        self.wait(guion.espera("misma_pendiente"))
 
         # Explicación de la pendiente de la tangente
-        self.update_dialog(dialog, "La pendiente de la tangente nos muestra la tasa de cambio instantánea en ese punto.")
-        self.wait(4)
+        self.play(dialog.decir(guion.texto("tasa_de_cambio")))
+        self.wait(guion.espera("tasa_de_cambio"))
 
         # Paso 5: Introducir la idea de la derivada
-        self.update_dialog(dialog, "La derivada es la pendiente de la tangente en un punto.")
+        self.play(dialog.decir(guion.texto("derivada")))
         deriv_eq = MathTex(
             "f'(x) = \\lim_{h \\to 0} \\frac{f(x + h) - f(x)}{h}", 
             color=self.colors["text"]
         ).next_to(axes, DOWN)
         self.play(Write(deriv_eq))
-        self.wait(4)
+        self.wait(guion.espera("derivada"))
         self.play(FadeOut(deriv_eq))
-        self.update_dialog(dialog, "Esta fórmula nos da la pendiente de la tangente en un punto.")
-        self.wait(4)
+        self.play(dialog.decir(guion.texto("formula")))
+        self.wait(guion.espera("formula"))
 
         # Explicación de los términos en la fórmula de la derivada
-        self.update_dialog(dialog, "Desglosemos la fórmula.")
+        self.play(dialog.decir(guion.texto("desglose")))
         term1 = MathTex("f(x + h)", color=self.colors["text"]).next_to(axes, UP, buff=1)
         self.play(Write(term1))
-        self.wait(4)
-        self.update_dialog(dialog, "$f(x + h)$ es el valor de la función cuando \"x\" aumenta por un pequeño valor \"h\".")
-        self.wait(4)
+        self.wait(guion.espera("desglose"))
+        self.play(dialog.decir(guion.texto("termino_fxh")))
+        self.wait(guion.espera("termino_fxh"))
         self.play(FadeOut(term1))
 
         term2 = MathTex("f(x)", color=self.colors["text"]).next_to(axes, UP, buff=1)
         self.play(Write(term2))
-        self.wait(4)
-        self.update_dialog(dialog, "$f(x)$ es el valor original de la función en \"x\".")
-        self.wait(4)
+        self.wait(guion.espera("pausa_termino_fx"))
+        self.play(dialog.decir(guion.texto("termino_fx")))
+        self.wait(guion.espera("termino_fx"))
         self.play(FadeOut(term2))
 
         # Mostrar la expansión de $f(x + h)$
-        self.update_dialog(dialog, "Expresamos $f(x + h)$:")
+        self.play(dialog.decir(guion.texto("expansion")))
         func_expansion = MathTex("f(x + h) = (x + h)^2 = x^2 + 2xh + h^2", color=self.colors["text"]).next_to(axes, UP, buff=1)
         self.play(Write(func_expansion))
-        self.wait(4)
+        self.wait(guion.espera("expansion"))
         self.play(FadeOut(func_expansion))
 
         # Mostrar cómo se simplifica el numerador
-        self.update_dialog(dialog, "Restamos $f(x)$ de $f(x + h)$:")
+        self.play(dialog.decir(guion.texto("resta")))
         simplification_eq = MathTex(
             "\\frac{f(x + h) - f(x)}{h} = \\frac{2xh + h^2}{h} = 2x + h", 
             color=self.colors["text"]
         ).next_to(axes, UP, buff=1)
         self.play(Write(simplification_eq))
-        self.wait(4)
+        self.wait(guion.espera("resta"))
         self.play(FadeOut(simplification_eq))
 
         # Explicación de cómo se simplifica con el límite
-        self.update_dialog(dialog, "Cuando $h \\to 0$, encontramos la pendiente exacta.")
+        self.play(dialog.decir(guion.texto("limite")))
         limit_eq = MathTex("f'(x) = \\lim_{h \\to 0} (2x + h) = 2x", color=self.colors["text"]).next_to(axes, UP, buff=1)
         self.play(Write(limit_eq))
-        self.wait(4)
-        self.play(FadeOut(limit_eq))
+
+        # La secante por x=1 y x=1+h tiende a la tangente mientras h se achica;
+        # todo sale de arreglos precalculados y del tracker h
+        secant = LimiteSecante(
+            axes,
+            lambda x: x**2,
+            1,
+            h_inicial=2,
+            h_final=0.01,
+            color=self.colors["secondary"],
+            color_catetos=self.colors["highlight"],
+            color_texto=self.colors["text"]
+        )
+        secant.lectura.next_to(axes, RIGHT, buff=0.5)
+        self.play(FadeIn(secant), FadeIn(secant.lectura))
+        self.play(secant.h.animate.set_value(0.01), run_time=guion.espera("limite"), rate_func=smooth)
+        self.play(FadeOut(limit_eq), FadeOut(secant), FadeOut(secant.lectura))
 
         # Mostrar la derivada en un punto específico
-        self.update_dialog(dialog, "La derivada en $x=1$ es la pendiente de la tangente.")
+        self.play(dialog.decir(guion.texto("derivada_en_1")))
         tangent_value = MathTex("f'(1) = 2", color=self.colors["highlight"], font_size=48).next_to(axes, RIGHT, buff=0.5)
         self.play(Write(tangent_value))
         self.play(Indicate(tangent_value, color=self.colors["highlight"], scale_factor=1.2))
-        self.wait(4)
+        self.wait(guion.espera("derivada_en_1"))
         self.play(FadeOut(tangent_value))
 
         # Conectar el concepto con integrales
-        self.update_dialog(dialog, "Las derivadas nos indican cómo cambia una función en un punto.")
-        self.wait(4)
-        self.update_dialog(dialog, "Para encontrar áreas bajo una curva, usamos integrales.")
-        self.wait(4)
-        self.update_dialog(dialog, "Exploraremos esto en un siguiente video.")
-        self.wait(4)
+        self.play(dialog.decir(guion.texto("resumen")))
+        self.wait(guion.espera("resumen"))
+        self.play(dialog.decir(guion.texto("integrales")))
+        self.wait(guion.espera("integrales"))
+        self.play(dialog.decir(guion.texto("despedida")))
+        self.wait(guion.espera("despedida"))
 
         # Finalizar la animación
         self.play(
@@ -180,44 +205,3 @@ class derivada1(Scene):
             run_time=3
         )
         self.wait(1)
-
-    # Método para crear el cuadro de diálogo
-    def create_dialog(self, message, animate=False):
-        bubble_base = RoundedRectangle(
-            corner_radius=0.2,
-            width=12,
-            height=2,
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-        tail = Polygon(
-            bubble_base.get_bottom() + DOWN * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + LEFT * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + RIGHT * 0.5,
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-        bubble = VGroup(bubble_base, tail).to_edge(DOWN, buff=0.1)
-        dialog_text = Tex(
-            message,
-            font_size=30,
-            color=self.colors["text"]
-        ).move_to(bubble_base.get_center())
-
-        if animate:
-            self.play(FadeIn(bubble), Write(dialog_text))
-        else:
-            self.add(bubble, dialog_text)
-        return VGroup(bubble, dialog_text)
-
-    # Método para actualizar el cuadro de diálogo
-    def update_dialog(self, dialog, new_message):
-        dialog_text = dialog[1]
-        new_dialog_text = Tex(
-            new_message,
-            font_size=30,
-            color=self.colors["text"]
-        ).move_to(dialog_text.get_center())
-        self.play(Transform(dialog_text, new_dialog_text))
\ No newline at end of file
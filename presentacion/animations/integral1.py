@@ -1,8 +1,14 @@
 from manim import *
 
+from comun.dialogo import Dialogo
+from comun.guion import Guion
+from comun.muestreo import area, curva, muestrear
+from comun.riemann import RectangulosDeRiemann, sumas_de_riemann
+
 class integral1(Scene):
     def construct(self):
-        # Configuración de la cámara para resolución 1080p
+        # Marco de 16 x 9 unidades; la resolución y los fps los fija el perfil
+        # de render (herramientas/entregas.py: borrador 480p15, maestro 1080p60)
         self.camera.frame_width = 16  # Relación de aspecto 16:9
         self.camera.frame_height = 9
 
@@ -27,125 +33,165 @@ class integral1(Scene):
         self.wait(3)
         self.play(FadeOut(title), FadeOut(underline))
 
-        # Crear cuadro de diálogo fijo
-        dialog = self.create_dialog("Las integrales nos ayudan a encontrar el área bajo una curva.", animate=True)
-        self.wait(4)
+        # Crear cuadro de diálogo fijo; los mensajes y las pausas vienen del
+        # guion (guiones/integral1.json) y se componen todos antes de empezar
+        guion = Guion.cargar("integral1")
+        dialog = Dialogo(guion.texto("integrales"), color=self.colors["accent"], color_texto=self.colors["text"])
+        dialog.precompilar(guion.textos())
+        self.play(dialog.aparecer())
+        self.wait(guion.espera("integrales"))
 
         # Mostrar la gráfica de la función
-        self.update_dialog(dialog, "Aquí está la función $f(x) = x^2$.")
+        self.play(dialog.decir(guion.texto("funcion")))
         axes = Axes(
             x_range=[-1, 6, 1],
             y_range=[-1, 30, 5],
             axis_config={"color": self.colors["text"]}
         ).scale(0.8).shift(UP)
-        graph = axes.plot(lambda x: x**2, x_range=[0, 5], color=self.colors["primary"], stroke_width=3)
+        # La gráfica, el área y los rectángulos comparten la muestra de x^2
+        sample = muestrear(lambda x: x**2, 0, 5)
+        graph = curva(axes, sample, color=self.colors["primary"], stroke_width=3)
         graph_label = MathTex("f(x) = x^2", color=self.colors["text"]).scale(0.7).next_to(graph, RIGHT, buff=0.5)
         self.play(Create(axes), Create(graph), Write(graph_label))
-        self.wait(4)
+        self.wait(guion.espera("funcion"))
 
         # Explicación de los límites de integración
-        self.update_dialog(dialog, "Vamos a encontrar el área bajo la curva desde $x = 0$ hasta $x = 5$.")
+        self.play(dialog.decir(guion.texto("area")))
         point_a = Dot(axes.coords_to_point(0, 0), color=self.colors["secondary"])
         point_b = Dot(axes.coords_to_point(5, 25), color=self.colors["secondary"])
         label_a = MathTex("0", color=self.colors["text"]).next_to(point_a, DOWN)
         label_b = MathTex("5", color=self.colors["text"]).next_to(point_b, DOWN)
         self.play(FadeIn(point_a, point_b), Write(label_a), Write(label_b))
-        self.wait(6)
+        self.wait(guion.espera("area"))
 
         # Sombrear la región bajo la curva y explicar su significado
-        shaded_area = axes.get_area(graph, x_range=[0, 5], color=self.colors["accent"], opacity=0.3)
+        shaded_area = area(axes, sample, color=self.colors["accent"], opacity=0.3)
         self.play(Create(shaded_area))
-        self.update_dialog(dialog, "El área bajo la curva representa la integral definida de $0$ a $5$.")
-        self.wait(6)
+        self.play(dialog.decir(guion.texto("integral_definida")))
+        self.wait(guion.espera("integral_definida"))
 
         # Explicar el significado del área
-        self.update_dialog(dialog, "Esta área se mide en unidades cuadradas.")
-        self.wait(6)
+        self.play(dialog.decir(guion.texto("unidades")))
+        self.wait(guion.espera("unidades"))
 
         # Paso 2: Explicar la suma de áreas pequeñas
-        self.update_dialog(dialog, "Dividimos el área en pequeños rectángulos para aproximar el área total.")
-        rects = axes.get_riemann_rectangles(
-            graph,
-            x_range=[0, 5],
-            dx=0.5,
+        self.play(dialog.decir(guion.texto("rectangulos")))
+        # Un solo VMobject con todos los rectángulos (suma por la izquierda, como
+        # get_riemann_rectangles); n = 10 equivale a dx = 0.5
+        rects = RectangulosDeRiemann(
+            axes,
+            lambda x: x**2,
+            0,
+            5,
+            n=10,
             color=self.colors["accent"],
+            stroke_color=self.colors["text"],
             stroke_width=0.5,
             fill_opacity=0.5
         )
         self.play(Create(rects))
-        self.wait(6)
+        self.wait(guion.espera("rectangulos"))
 
         # Explicación de la suma de las áreas de los rectángulos
-        self.update_dialog(dialog, "La suma de sus áreas nos da una aproximación del área.")
-        self.clear_dialog(dialog)
+        self.play(dialog.decir(guion.texto("suma")))
+        self.play(dialog.limpiar())
         sum_eq = MathTex(
             "\\text{Área} \\approx \\sum_{i=1}^{n} f(x_i) \\Delta x",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.play(Transform(dialog[1], sum_eq))
-        self.wait(8)
+        )
+        self.play(dialog.mostrar(sum_eq))
+        self.wait(guion.espera("suma"))
 
         # Explicación del límite de la suma
-        self.update_dialog(dialog, "Cuando el número de rectángulos tiende a infinito, obtenemos el área exacta.")
+        self.play(dialog.decir(guion.texto("limite")))
         integral_eq = MathTex(
             "\\int_{0}^{5} x^2\\,dx",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.play(Transform(dialog[1], integral_eq))
-        self.wait(8)
+        )
+        self.play(dialog.mostrar(integral_eq))
+
+        # n crece de 10 a 10 000 en escala logarítmica durante la narración; las
+        # sumas de todos los n se calculan antes en una sola pasada
+        ns = np.unique(np.round(np.logspace(1, 4, 400)).astype(int))
+        sumas = sumas_de_riemann(lambda x: x**2, 0, 5, ns)["izquierda"]
+        exponente = ValueTracker(1)
+        n_label = MathTex("n =", color=self.colors["text"]).scale(0.7)
+        n_value = Integer(ns[0], color=self.colors["text"]).scale(0.7)
+        sum_label = MathTex("S_n =", color=self.colors["text"]).scale(0.7)
+        sum_value = DecimalNumber(sumas[0], num_decimal_places=3, color=self.colors["text"]).scale(0.7)
+        counter = VGroup(
+            VGroup(n_label, n_value).arrange(RIGHT, buff=0.15),
+            VGroup(sum_label, sum_value).arrange(RIGHT, buff=0.15),
+        ).arrange(DOWN, aligned_edge=LEFT).move_to(axes.c2p(1.5, 24))
+
+        def current_index():
+            return min(np.searchsorted(ns, round(10 ** exponente.get_value())), len(ns) - 1)
+
+        def update_sums(mob):
+            n_value.set_value(ns[current_index()])
+            sum_value.set_value(sumas[current_index()])
+
+        # Los rectángulos llevan su propio updater: manim solo redibuja en cada
+        # cuadro los mobjects con updaters o animados
+        rects.add_updater(lambda m: m.actualizar(ns[current_index()]))
+        counter.add_updater(update_sums)
+        self.play(FadeIn(counter))
+        self.play(exponente.animate.set_value(4), run_time=guion.espera("limite"), rate_func=smooth)
+        rects.clear_updaters()
+        counter.clear_updaters()
 
         # Explicar el proceso de la antiderivada
-        self.update_dialog(dialog, "La antiderivada de $f(x) = x^2$ es $\\frac{x^3}{3} + C$.")
+        self.play(dialog.decir(guion.texto("antiderivada")))
         antiderivative_eq = MathTex(
             "F(x) = \\frac{x^3}{3} + C",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.play(Transform(dialog[1], antiderivative_eq))
-        self.wait(8)
+        )
+        self.play(dialog.mostrar(antiderivative_eq))
+        self.wait(guion.espera("antiderivada"))
 
         # Explicación de la constante C
-        self.update_dialog(dialog, "$C$ es la constante de integración.")
-        self.wait(6)
+        self.play(dialog.decir(guion.texto("constante")))
+        self.wait(guion.espera("constante"))
 
         # Evaluar la antiderivada en los límites
-        self.update_dialog(dialog, "Evaluamos la integral en los límites $0$ y $5$.")
+        self.play(dialog.decir(guion.texto("evaluacion")))
         eval_eq = MathTex(
             "\\int_{0}^{5} x^2\\,dx = \\left[\\frac{x^3}{3}\\right]_{0}^{5}",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.play(Transform(dialog[1], eval_eq))
-        self.wait(8)
+        )
+        self.play(dialog.mostrar(eval_eq))
+        self.wait(guion.espera("evaluacion"))
 
         # Evaluación paso a paso
-        self.update_dialog(dialog, "Sustituimos $5$ y $0$ en la antiderivada.")
+        self.play(dialog.decir(guion.texto("sustitucion")))
         eval_steps = MathTex(
             "\\left[\\frac{5^3}{3}\\right] - \\left[\\frac{0^3}{3}\\right]",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.play(Transform(dialog[1], eval_steps))
-        self.wait(8)
+        )
+        self.play(dialog.mostrar(eval_steps))
+        self.wait(guion.espera("sustitucion"))
 
         # Mostrar el resultado de la evaluación
         eval_result = MathTex(
             "\\frac{125}{3}",
             color=self.colors["text"]
-        ).move_to(dialog[0].get_center())
-        self.update_dialog(dialog, "El área bajo la curva es $\\frac{125}{3}$ unidades cuadradas.")
-        self.play(Transform(dialog[1], eval_result))
-        self.wait(8)
+        )
+        self.play(dialog.decir(guion.texto("resultado")))
+        self.play(dialog.mostrar(eval_result))
+        self.wait(guion.espera("resultado"))
 
         # Explicar el resultado en decimales y unidades
-        self.update_dialog(dialog, "$\\frac{125}{3} \\approx 41.67$ unidades cuadradas.")
-        self.wait(8)
-        self.update_dialog(dialog, "Este valor representa el área total bajo la curva entre $0$ y $5$.")
-        self.wait(8)
+        self.play(dialog.decir(guion.texto("decimales")))
+        self.wait(guion.espera("decimales"))
+        self.play(dialog.decir(guion.texto("area_total")))
+        self.wait(guion.espera("area_total"))
 
         # Conclusión y resumen final en el cuadro de diálogo
-        self.update_dialog(dialog, "Las integrales y derivadas están conectadas. El siguiente paso es entender las ecuaciones diferenciales.")
-        self.wait(8)
+        self.play(dialog.decir(guion.texto("conexion")))
+        self.wait(guion.espera("conexion"))
 
         # Desvanecer todo y mostrar resumen de ecuaciones
-        self.play(FadeOut(axes), FadeOut(graph), FadeOut(graph_label), FadeOut(rects), FadeOut(shaded_area), FadeOut(point_a), FadeOut(point_b), FadeOut(label_a), FadeOut(label_b), run_time=3)
+        self.play(FadeOut(axes), FadeOut(graph), FadeOut(graph_label), FadeOut(rects), FadeOut(counter), FadeOut(shaded_area), FadeOut(point_a), FadeOut(point_b), FadeOut(label_a), FadeOut(label_b), run_time=3)
         self.wait(1)
 
         # Mostrar todas las ecuaciones en orden sin el cuadro de diálogo
@@ -159,54 +205,8 @@ class integral1(Scene):
             MathTex("\\frac{125}{3} \\approx 41.67", color=self.colors["text"])
         ).arrange(DOWN, buff=0.5).scale(0.8).to_edge(UP)
         self.play(Create(final_explanation))
-        self.wait(12)
+        self.wait(guion.espera("pausa_resumen"))
 
         # Desvanecer las ecuaciones y finalizar la animación
         self.play(FadeOut(final_explanation), run_time=3)
         self.wait(1)
-
-    # Método para crear el cuadro de diálogo
-    def create_dialog(self, message, animate=False):
-        bubble_base = RoundedRectangle(
-            corner_radius=0.2,
-            width=12,
-            height=2,
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-        tail = Polygon(
-            bubble_base.get_bottom() + DOWN * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + LEFT * 0.5,
-            bubble_base.get_bottom() + DOWN * 0.7 + RIGHT * 0.5,
-            color=self.colors["accent"],
-            fill_color=self.colors["accent"],
-            fill_opacity=0.1
-        )
-        bubble = VGroup(bubble_base, tail).to_edge(DOWN, buff=0.1)
-        dialog_text = Tex(
-            message,
-            font_size=30,
-            color=self.colors["text"]
-        ).move_to(bubble_base.get_center())
-
-        if animate:
-            self.play(FadeIn(bubble), Write(dialog_text))
-        else:
-            self.add(bubble, dialog_text)
-        return VGroup(bubble, dialog_text)
-
-    # Método para actualizar el cuadro de diálogo
-    def update_dialog(self, dialog, new_message):
-        dialog_text = dialog[1]
-        new_dialog_text = Tex(
-            new_message,
-            font_size=30,
-            color=self.colors["text"]
-        ).move_to(dialog_text.get_center())
-        self.play(Transform(dialog_text, new_dialog_text))
-
-    # Método para limpiar el cuadro de diálogo
-    def clear_dialog(self, dialog):
-        dialog_text = dialog[1]
-        self.play(FadeOut(dialog_text))
\ No newline at end of file
@@ -1,8 +1,22 @@
 from manim import *
-import sympy as sp
-from sympy import MatrixSymbol, HadamardProduct, Function, Eq, pretty
+
+from comun.ecuaciones import EcuacionTex, propagacion, retropropagacion
+from comun.malla import MallaDeConexiones
+from comun.mlp import MLP, escalar
+from comun.red import MAXIMO_ARISTAS, disponer_capas, muestrear_aristas
 
 class DetailedNeuralNetwork(Scene):
+    # Topología de la red: neuronas por capa (la primera es la de entrada y
+    # la última la de salida). Admite cualquier profundidad y cientos de
+    # neuronas por capa.
+    layer_sizes = [5, 7, 7, 5, 3]
+
+    # Aristas por par de capas a partir de las cuales se dibuja una muestra
+    max_connections = MAXIMO_ARISTAS
+
+    # Ejemplos del minibatch con el que se calculan activaciones y gradientes
+    batch_size = 32
+
     def construct(self):
         # Configuración inicial de la escena
         self.setup_scene()
@@ -25,7 +39,9 @@ class DetailedNeuralNetwork(Scene):
         # Paso 6: Explicación de la propagación hacia adelante
         self.explain_forward_propagation()
 
-        # Paso 7: Animar la propagación hacia adelante a través de la red
+        # Paso 7: Calcular una pasada real sobre un minibatch y animar la
+        # propagación hacia adelante a través de la red con sus valores
+        self.compute_training_pass()
         self.animate_forward_propagation(layers, connections)
 
         # Paso 8: Simular retropropagación
@@ -119,61 +135,58 @@ class DetailedNeuralNetwork(Scene):
 
     def create_network_layers(self):
         """
-        Crea las capas de la red neuronal con neuronas visualizadas como círculos.
+        Crea las capas de la red neuronal según layer_sizes, con neuronas visualizadas como círculos.
         """
-        # Definir número de neuronas por capa
-        self.layer_sizes = [5, 7, 7, 5, 3]  # Ejemplo: 5 entradas, tres capas ocultas de 7, 5 y 3 salidas
-
-        # Posiciones horizontales para cada capa
-        layer_positions = [LEFT * 6, LEFT * 3, ORIGIN, RIGHT * 3, RIGHT * 6]
-
-        # Definir tipos de capas
-        layer_types = ['input', 'hidden', 'hidden', 'hidden', 'output']
+        # Posiciones de las neuronas y radio, calculados para que quepa la capa más grande
+        layout = disponer_capas(self.layer_sizes)
 
         layers = []
 
-        for i, (size, position, layer_type) in enumerate(zip(self.layer_sizes, layer_positions, layer_types)):
-            if layer_type == 'input':
+        for i, centers in enumerate(layout.centros):
+            if i == 0:
                 label_text = "Entrada"
                 neuron_color = self.colors["input"]
-            elif layer_type == 'output':
+            elif i == len(self.layer_sizes) - 1:
                 label_text = "Salida"
                 neuron_color = self.colors["output"]
             else:
                 label_text = f"Capa Oculta {i}"  # Numeración de capas ocultas
                 neuron_color = self.colors["hidden"]
 
-            layer = self.create_layer(size, position, label_text, neuron_color)
+            layer = self.create_layer(centers, layout.radio, label_text, neuron_color)
             layers.append(layer)
 
+        # Animación de creación de todas las capas: una sola animación con
+        # desfase entre neuronas, en lugar de un LaggedStart por capa
+        neurons = VGroup(*[layer["neurons"] for layer in layers])
+        circles = neurons.family_members_with_points()
+        neurons.generate_target()
+        for neuron in circles:
+            neuron.scale(0)
+        self.play(
+            MoveToTarget(neurons, lag_ratio=2 / max(len(circles) - 1, 1)),
+            *[FadeIn(layer["label"], shift=UP) for layer in layers],
+            run_time=len(layers)
+        )
+
         self.layers = layers  # Guardar las capas para uso posterior
         return layers
 
-    def create_layer(self, n_neurons, position, label_text, neuron_color):
+    def create_layer(self, centers, radius, label_text, neuron_color):
         """
-        Crea una capa de neuronas en una posición específica.
+        Crea una capa de neuronas en las posiciones indicadas.
         """
-        neurons = VGroup()
-        for _ in range(n_neurons):
-            neuron = Circle(
-                radius=0.3,
-                color=self.colors["neuron"],
-                fill_opacity=1
-            )
-            neuron.set_fill(neuron_color, opacity=0.9)
-            neurons.add(neuron)
-
-        neurons.arrange(DOWN, buff=0.6).move_to(position)
+        template = Circle(
+            radius=radius,
+            color=self.colors["neuron"],
+            fill_opacity=1
+        )
+        template.set_fill(neuron_color, opacity=0.9)
+        neurons = VGroup(*[template.copy().move_to(center) for center in centers])
 
         # Añadir etiqueta a la capa
         label = Text(label_text, font_size=24, color=self.colors["text"], font="Arial").next_to(neurons, UP, buff=0.5)
 
-        # Animación de creación de la capa
-        self.play(
-            LaggedStart(*[GrowFromCenter(neuron) for neuron in neurons], lag_ratio=0.1),
-            FadeIn(label, shift=UP)
-        )
-
         return {"neurons": neurons, "label": label, "color": neuron_color}
 
     def connect_network_layers(self, layers):
@@ -181,31 +194,33 @@ class DetailedNeuralNetwork(Scene):
         Conecta las capas de la red neuronal usando líneas que representan las conexiones.
         """
         connections = []
+        # Semilla fija: la muestra de aristas es la misma en cada render, y
+        # en cada tramo cuando la escena se renderiza por partes
+        rng = np.random.default_rng(0)
 
         for i in range(len(layers) - 1):
             layer1 = layers[i]
             layer2 = layers[i + 1]
-            conn = self.connect_layers(layer1, layer2)
+            conn = self.connect_layers(layer1, layer2, rng)
             connections.append(conn)
 
         self.connections = connections  # Guardar conexiones para uso posterior
         return connections
 
-    def connect_layers(self, layer1, layer2):
+    def connect_layers(self, layer1, layer2, rng=None):
         """
-        Conecta dos capas de la red neuronal dibujando líneas entre las neuronas.
+        Conecta dos capas de la red neuronal con una malla que dibuja todas las aristas entre sus neuronas.
         """
-        connections = VGroup()
-        for neuron1 in layer1["neurons"]:
-            for neuron2 in layer2["neurons"]:
-                line = Line(
-                    neuron1.get_right(),
-                    neuron2.get_left(),
-                    stroke_width=1.0,
-                    color=self.colors["connection"],
-                    stroke_opacity=0.6  # Reemplazar 'opacity' con 'stroke_opacity'
-                )
-                connections.add(line)
+        # Por encima de max_connections aristas se dibuja una muestra
+        pairs = muestrear_aristas(len(layer1["neurons"]), len(layer2["neurons"]), self.max_connections, rng)
+        connections = MallaDeConexiones.entre(
+            [neuron.get_right() for neuron in layer1["neurons"]],
+            [neuron.get_left() for neuron in layer2["neurons"]],
+            pairs=pairs,
+            color=self.colors["connection"],
+            stroke_width=1.0,
+            stroke_opacity=0.6
+        )
 
         # Animación de conexiones
         self.play(Create(connections), run_time=1.5)
@@ -213,6 +228,20 @@ class DetailedNeuralNetwork(Scene):
         layer2["connections_in"] = connections
         return connections
 
+    def highlight_neurons(self, neurons, color, opacity, scale_factor):
+        """
+        Una sola animación para todas las neuronas de una capa: cambian de color y se escalan sobre su propio centro.
+        La opacidad puede ser un valor para toda la capa o uno por neurona.
+        """
+        opacities = np.broadcast_to(opacity, len(neurons))
+
+        def highlight(group):
+            for neuron, neuron_opacity in zip(group, opacities):
+                neuron.set_fill(color, opacity=neuron_opacity).scale(scale_factor)
+            return group
+
+        return ApplyFunction(highlight, neurons)
+
     def explain_elements(self, layers, connections):
         """
         Explicación detallada de las neuronas y conexiones.
@@ -262,17 +291,17 @@ class DetailedNeuralNetwork(Scene):
         self.play(FadeIn(connection_explanation, shift=UP))
         self.wait(3)
 
-        # Resaltar una conexión
-        sample_connection = connections[0][0]  # Primera conexión de la primera capa
+        # Resaltar una conexión: la primera arista de la primera malla
+        sample_connection = 0
         self.play(
-            sample_connection.animate.set_color(self.colors["highlight"]).set_stroke(width=2)
+            connections[0].animar([sample_connection], color=self.colors["highlight"], grosor=2)
         )
         self.wait(1)
 
         # Añadir una flecha apuntando a la conexión resaltada
         arrow_conn = Arrow(
             start=LEFT * 5,
-            end=sample_connection.get_center(),
+            end=connections[0].centro_arista(sample_connection),
             buff=0.1,
             color=self.colors["highlight"]
         )
@@ -280,7 +309,11 @@ class DetailedNeuralNetwork(Scene):
         self.wait(2)
 
         # Finalizar explicaciones
-        self.play(FadeOut(connection_explanation), FadeOut(arrow_conn), FadeOut(sample_connection))
+        self.play(
+            FadeOut(connection_explanation),
+            FadeOut(arrow_conn),
+            connections[0].animar([sample_connection], opacidad=0)
+        )
 
     def explain_forward_propagation(self):
         """
@@ -299,6 +332,24 @@ class DetailedNeuralNetwork(Scene):
         self.wait(3)
         self.play(FadeOut(explanation_text, shift=DOWN))
 
+    def compute_training_pass(self):
+        """
+        Propaga y retropropaga un minibatch aleatorio por un MLP con la topología de la escena.
+        Todas las activaciones y gradientes se calculan aquí, una sola vez, antes de animar.
+        """
+        rng = np.random.default_rng(0)
+        self.mlp = MLP(self.layer_sizes, rng=rng)
+        inputs = rng.random((self.batch_size, self.layer_sizes[0]))
+        targets = rng.random((self.batch_size, self.layer_sizes[-1]))
+        self.training_pass = self.mlp.pasada(inputs, targets)
+        return self.training_pass
+
+    def edge_values(self, connections, matrix):
+        """
+        Valor de cada arista dibujada en la malla, tomado de una matriz (destino, origen) como W_l.
+        """
+        return matrix[connections.indices_destino, connections.indices_origen]
+
     def animate_forward_propagation(self, layers, connections):
         """
         Simula el proceso de propagación hacia adelante.
@@ -313,42 +364,49 @@ class DetailedNeuralNetwork(Scene):
         self.play(FadeIn(propagation_text, shift=DOWN))
         self.wait(1)
 
+        training = self.training_pass
+
         for i in range(len(layers) - 1):
             current_layer = layers[i]
             next_layer = layers[i + 1]
             current_connections = connections[i]
 
-            # Resaltar neuronas de la capa actual
-            self.play(*[
-                neuron.animate.set_fill(self.colors["active"], opacity=1).scale(1.2)
-                for neuron in current_layer["neurons"]
-            ], run_time=0.5)
+            # Resaltar neuronas de la capa actual, con opacidad según su activación media
+            self.play(
+                self.highlight_neurons(
+                    current_layer["neurons"], self.colors["active"],
+                    escalar(training.activacion_media(i), 0.2, 1), 1.2
+                ),
+                run_time=0.5
+            )
 
-            # Resaltar conexiones
-            self.play(*[
-                conn.animate.set_color(self.colors["active"]).set_stroke(width=2)
-                for conn in current_connections
-            ], run_time=1)
+            # Resaltar conexiones, con grosor según su aporte |W| · a a la capa siguiente
+            self.play(
+                current_connections.animar(
+                    color=self.colors["active"],
+                    grosor=escalar(self.edge_values(current_connections, training.contribuciones(i)), 0.5, 4)
+                ),
+                run_time=1
+            )
 
             # Resaltar neuronas de la siguiente capa
-            self.play(*[
-                neuron.animate.set_fill(self.colors["active"], opacity=1).scale(1.2)
-                for neuron in next_layer["neurons"]
-            ], run_time=0.5)
+            self.play(
+                self.highlight_neurons(
+                    next_layer["neurons"], self.colors["active"],
+                    escalar(training.activacion_media(i + 1), 0.2, 1), 1.2
+                ),
+                run_time=0.5
+            )
 
             self.wait(0.5)
 
             # Restaurar colores y tamaños originales
-            self.play(*[
-                neuron.animate.set_fill(current_layer["color"], opacity=0.9).scale(1/1.2)
-                for neuron in current_layer["neurons"]
-            ] + [
-                conn.animate.set_color(self.colors["connection"]).set_stroke(width=1)
-                for conn in current_connections
-            ] + [
-                neuron.animate.set_fill(next_layer["color"], opacity=0.9).scale(1/1.2)
-                for neuron in next_layer["neurons"]
-            ], run_time=0.5)
+            self.play(
+                self.highlight_neurons(current_layer["neurons"], current_layer["color"], 0.9, 1/1.2),
+                current_connections.animar(color=self.colors["connection"], grosor=1),
+                self.highlight_neurons(next_layer["neurons"], next_layer["color"], 0.9, 1/1.2),
+                run_time=0.5
+            )
 
         self.play(FadeOut(propagation_text, shift=DOWN))
         self.wait(1)
@@ -367,150 +425,86 @@ class DetailedNeuralNetwork(Scene):
         self.play(FadeIn(backprop_text, shift=DOWN))
         self.wait(1)
 
+        training = self.training_pass
+
         for i in reversed(range(len(layers) - 1)):
             current_layer = layers[i + 1]
             previous_layer = layers[i]
             current_connections = connections[i]
 
-            # Resaltar neuronas de la capa actual
-            self.play(*[
-                neuron.animate.set_fill(self.colors["active"], opacity=1).scale(1.2)
-                for neuron in current_layer["neurons"]
-            ], run_time=0.5)
+            # Resaltar neuronas de la capa actual, con opacidad según la magnitud de su delta
+            self.play(
+                self.highlight_neurons(
+                    current_layer["neurons"], self.colors["active"],
+                    escalar(training.delta_medio(i + 1), 0.2, 1), 1.2
+                ),
+                run_time=0.5
+            )
 
-            # Resaltar conexiones (invertidas)
-            self.play(*[
-                conn.animate.set_color(self.colors["active"]).set_stroke(width=2)
-                for conn in current_connections
-            ], run_time=1)
+            # Resaltar conexiones (invertidas), con grosor según el gradiente de su peso
+            self.play(
+                current_connections.animar(
+                    color=self.colors["active"],
+                    grosor=escalar(self.edge_values(current_connections, training.gradientes_pesos[i]), 0.5, 4)
+                ),
+                run_time=1
+            )
 
             # Resaltar neuronas de la capa previa
-            self.play(*[
-                neuron.animate.set_fill(self.colors["active"], opacity=1).scale(1.2)
-                for neuron in previous_layer["neurons"]
-            ], run_time=0.5)
+            self.play(
+                self.highlight_neurons(
+                    previous_layer["neurons"], self.colors["active"],
+                    escalar(training.delta_medio(i), 0.2, 1), 1.2
+                ),
+                run_time=0.5
+            )
 
             self.wait(0.5)
 
             # Restaurar colores y tamaños originales
-            self.play(*[
-                neuron.animate.set_fill(current_layer["color"], opacity=0.9).scale(1/1.2)
-                for neuron in current_layer["neurons"]
-            ] + [
-                conn.animate.set_color(self.colors["connection"]).set_stroke(width=1)
-                for conn in current_connections
-            ] + [
-                neuron.animate.set_fill(previous_layer["color"], opacity=0.9).scale(1/1.2)
-                for neuron in previous_layer["neurons"]
-            ], run_time=0.5)
+            self.play(
+                self.highlight_neurons(current_layer["neurons"], current_layer["color"], 0.9, 1/1.2),
+                current_connections.animar(color=self.colors["connection"], grosor=1),
+                self.highlight_neurons(previous_layer["neurons"], previous_layer["color"], 0.9, 1/1.2),
+                run_time=0.5
+            )
 
         self.play(FadeOut(backprop_text, shift=DOWN))
         self.wait(1)
 
     def show_equations(self):
         """
-        Muestra las ecuaciones de propagación hacia adelante y retropropagación usando SymPy con Text y Unicode.
+        Muestra las ecuaciones de propagación hacia adelante y retropropagación,
+        definidas con SymPy (comun/ecuaciones.py) y compuestas con MathTex.
         """
-        # Definir símbolos y ecuaciones con SymPy
         l = 0  # índice de la capa actual
 
         # Verificar que hay al menos dos capas para definir W(l)
         if len(self.layer_sizes) < 2:
             raise ValueError("Se requieren al menos dos capas para definir las ecuaciones.")
 
-        # Definir W_l con dimensiones correctas
-        W_l = MatrixSymbol(f'W_{l}', self.layer_sizes[l+1], self.layer_sizes[l])
-
-        # Definir vectores de activación y bias como MatrixSymbols
-        a_l = MatrixSymbol(f'a_{l}', self.layer_sizes[l], 1)
-        b_l = MatrixSymbol(f'b_{l}', self.layer_sizes[l+1], 1)
-
-        # Definir z_l y la función de activación
-        z_l = W_l * a_l + b_l
-        f_z_l = Function('f')(z_l)  # [7,1]
-
-        # Ecuación de propagación hacia adelante
-        a_next = MatrixSymbol(f'a_{l+1}', self.layer_sizes[l+1], 1)
-        forward_eq = Eq(a_next, f_z_l, evaluate=False)  # 'a₁ = f(z₀)'
-
-        # Definir delta para retropropagación
-        delta_prev = MatrixSymbol(f'delta_{l+1}', self.layer_sizes[l+1], 1)
-        delta_l = MatrixSymbol(f'delta_{l}', self.layer_sizes[l], 1)
-
-        # Ecuación de retropropagación
-        f_prime_z_l = Function('f_prime')(z_l)  # [7,1]
-        Hadamard = HadamardProduct(delta_prev, f_prime_z_l)  # Multiplicación elemento a elemento [7,1]
-        backward_eq = Eq(delta_l, W_l.transpose() * Hadamard, evaluate=False)  # 'delta₀ = W₀ᵀ ⋅ (HadamardProduct(delta₁, f_prime(z₀)))'
-
-        # Convertir ecuaciones a cadenas con formato legible usando SymPy's pretty
-        forward_eq_str = pretty(forward_eq, use_unicode=True)
-        backward_eq_str = pretty(backward_eq, use_unicode=True)
-
-        # **Depuración: Imprimir las ecuaciones para verificar su formato**
-        print(f"forward_eq_str: '{forward_eq_str}'")
-        print(f"backward_eq_str: '{backward_eq_str}'")
-
-        # Crear objetos Text en Manim para cada ecuación
-        # Usar una fuente monoespaciada para mejorar la alineación
-        forward_eq_text = Text(forward_eq_str, font_size=24, font="Consolas", color=self.colors["text"], line_spacing=0.8).to_edge(UP)
-        backward_eq_text = Text(backward_eq_str, font_size=24, font="Consolas", color=self.colors["text"], line_spacing=0.8).next_to(forward_eq_text, DOWN, buff=0.8)
-
-        # Ajustar el tamaño y posición para evitar recortes
-        forward_eq_text.scale(0.8).to_edge(UP + LEFT * 0.5)
-        backward_eq_text.scale(0.8).next_to(forward_eq_text, DOWN, buff=0.8)
+        # Las ecuaciones se guardan en caché: SymPy solo se usa la primera vez
+        sizes = tuple(self.layer_sizes)
+        forward_eq = EcuacionTex(propagacion(sizes, l), font_size=36, color=self.colors["text"]).to_edge(UP)
+        backward_eq = EcuacionTex(retropropagacion(sizes, l), font_size=36, color=self.colors["text"]).next_to(forward_eq, DOWN, buff=0.8)
 
         # Mostrar ecuaciones
-        self.play(FadeIn(forward_eq_text, shift=UP))
+        self.play(FadeIn(forward_eq, shift=UP))
         self.wait(2)
-        self.play(FadeIn(backward_eq_text, shift=UP))
+        self.play(FadeIn(backward_eq, shift=UP))
         self.wait(2)
 
-        # Resaltar 'a₁' en la ecuación de propagación hacia adelante
-        highlight_forward = 'a₁'
-        if highlight_forward in forward_eq_str:
-            # Encontrar la posición de 'a₁' en la cadena
-            index = forward_eq_str.find(highlight_forward)
-            # Calcular el desplazamiento basado en el índice
-            total_length = len(forward_eq_str)
-            text_width = forward_eq_text.width
-            char_width = text_width / total_length
-            highlight_position = forward_eq_text.get_left() + RIGHT * (index * char_width + char_width / 2)
-
-            # Crear un objeto Text para resaltar
-            highlighted_forward = Text(highlight_forward, font_size=24, font="Consolas", color=self.colors["highlight"]).move_to(highlight_position)
-
-            # Animar el resaltado
-            self.play(FadeIn(highlighted_forward))
-            self.wait(1)
-            self.play(FadeOut(highlighted_forward))
-        else:
-            print(f"No se encontró '{highlight_forward}' en la ecuación de propagación hacia adelante.")
-
-        # Resaltar 'delta₀' en la ecuación de retropropagación
-        highlight_backward = 'delta₀'
-        if highlight_backward in backward_eq_str:
-            # Encontrar la posición de 'delta₀' en la cadena
-            index = backward_eq_str.find(highlight_backward)
-            # Calcular el desplazamiento basado en el índice
-            total_length = len(backward_eq_str)
-            text_width = backward_eq_text.width
-            char_width = text_width / total_length
-            highlight_position = backward_eq_text.get_left() + RIGHT * (index * char_width + char_width / 2)
-
-            # Crear un objeto Text para resaltar
-            highlighted_backward = Text(highlight_backward, font_size=24, font="Consolas", color=self.colors["highlight"]).move_to(highlight_position)
-
-            # Animar el resaltado
-            self.play(FadeIn(highlighted_backward))
+        # Resaltar a_{l+1} en la propagación y delta_l en la retropropagación
+        for equation, term in ((forward_eq, f"a_{l + 1}"), (backward_eq, f"delta_{l}")):
+            highlighted = equation.parte(term).copy().set_color(self.colors["highlight"])
+            self.play(FadeIn(highlighted))
             self.wait(1)
-            self.play(FadeOut(highlighted_backward))
-        else:
-            print(f"No se encontró '{highlight_backward}' en la ecuación de retropropagación.")
+            self.play(FadeOut(highlighted))
 
         self.wait(2)
 
         # Finalizar mostrando las ecuaciones
-        self.play(FadeOut(VGroup(forward_eq_text, backward_eq_text)))
+        self.play(FadeOut(VGroup(forward_eq, backward_eq)))
 
     def conclusion(self):
         """
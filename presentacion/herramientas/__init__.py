@@ -0,0 +1,8 @@
+"""
+Herramientas de construcción del taller: render de escenas de Manim y
+utilidades para la presentación de Quarto.
+
+Los módulos se ejecutan desde la carpeta ``presentacion``, por ejemplo:
+
+    python -m herramientas.render
+"""
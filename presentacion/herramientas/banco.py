@@ -0,0 +1,340 @@
+"""
+Banco de pruebas del render: tiempos por fase y memoria de cada escena.
+
+Cada escena se renderiza en su propio proceso con una configuración fija
+(calidad baja, sin la caché de animaciones de manim, una carpeta de medios
+temporal y, salvo --cache-tex, una caché de LaTeX vacía) y se mide cuánto
+tiempo pasa en cada fase:
+
+- tex: compilación de Tex y MathTex (lote_tex y tex_to_svg_file);
+- texto: composición de Text y MarkupText con Pango;
+- animacion: Scene.play y Scene.wait, sin contar los cuadros;
+- rasterizado: dibujo de cada cuadro con cairo (update_frame);
+- codificacion: envío de cuadros a ffmpeg, cierre y unión de los parciales;
+- construccion: el resto, sobre todo la construcción de mobjects en construct.
+
+Los tiempos son exclusivos: si una fase ocurre dentro de otra (un MathTex
+creado durante un play), se descuenta de la de afuera. También se anotan el
+pico de memoria residente del proceso y de sus hijos (latex, ffmpeg), los
+cuadros y las animaciones.
+
+El resultado se escribe en animations/media/banco/ultimo.json y se compara
+con la base (animations/media/banco/base.json, o la que se pase con
+--base): una fase que crece más que el umbral, y en más de
+--minimo segundos, cuenta como regresión y el comando termina con código 1.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.banco                      # todas las escenas
+    python -m herramientas.banco DetailedNeuralNetwork -n 3
+    python -m herramientas.banco --guardar-base       # fijar la base
+    python -m herramientas.banco --base ruta/base.json --umbral 0.1
+"""
+import argparse
+import functools
+import json
+import multiprocessing
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from . import cache_tex, esperas, lote_tex, parches
+from .escenas import DIRECTORIO_MEDIA, descubrir_escenas, filtrar_escenas
+from .render import CALIDADES, renderizar_en, ruta_relativa
+
+DIRECTORIO_BANCO = DIRECTORIO_MEDIA / "banco"
+RESULTADO = DIRECTORIO_BANCO / "ultimo.json"
+BASE = DIRECTORIO_BANCO / "base.json"
+
+FASES = ("tex", "texto", "construccion", "animacion", "rasterizado", "codificacion")
+
+# Crecimiento relativo y absoluto (segundos) a partir del cual una fase es regresión
+UMBRAL = 0.2
+MINIMO_SEGUNDOS = 0.5
+
+_tiempos = dict.fromkeys(FASES, 0.0)
+_cuadros = [0]
+
+# Tiempo de las fases anidadas dentro de cada fase en curso
+_pila = []
+
+
+def reiniciar():
+    _tiempos.update(dict.fromkeys(FASES, 0.0))
+    _cuadros[0] = 0
+
+
+def _medida(fase, funcion):
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        _pila.append(0.0)
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            total = time.perf_counter() - inicio
+            _tiempos[fase] += total - _pila.pop()
+            if _pila:
+                _pila[-1] += total
+    return envoltura
+
+
+def _envolver(objeto, nombre, fase):
+    parches.reemplazar("banco", objeto, nombre, functools.partial(_medida, fase))
+
+
+def _contar_cuadros(write_frame):
+    @functools.wraps(write_frame)
+    def envoltura(*args, **kwargs):
+        _cuadros[0] += 1
+        return write_frame(*args, **kwargs)
+    return envoltura
+
+
+def activar():
+    """
+    Envuelve las funciones de manim de cada fase. Se llama después de
+    cache_tex.activar y esperas.activar para medir sus reemplazos; solo se
+    aplica una vez por proceso.
+    """
+    if parches.activo("banco"):
+        return
+    from manim import MarkupText, Scene, Text
+    from manim.mobject.text import tex_mobject
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+    from manim.utils import tex_file_writing
+
+    _envolver(tex_file_writing, "tex_to_svg_file", "tex")
+    # tex_mobject importa la función por nombre
+    tex_mobject.tex_to_svg_file = tex_file_writing.tex_to_svg_file
+    _envolver(lote_tex, "precompilar", "tex")
+    _envolver(Text, "_text2svg", "texto")
+    _envolver(MarkupText, "_text2svg", "texto")
+    _envolver(Scene, "play", "animacion")
+    _envolver(CairoRenderer, "update_frame", "rasterizado")
+    _envolver(SceneFileWriter, "end_animation", "codificacion")
+    _envolver(SceneFileWriter, "combine_to_movie", "codificacion")
+    parches.reemplazar(
+        "banco", SceneFileWriter, "write_frame",
+        lambda write_frame: _contar_cuadros(_medida("codificacion", write_frame)),
+    )
+
+
+def _pico_mb(quien):
+    # ru_maxrss está en KiB en Linux y en bytes en macOS
+    pico = resource.getrusage(quien).ru_maxrss
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def medir_escena(escena, calidad="l", tex_en_cache=False, esperas_estaticas=False):
+    """
+    Renderiza una escena en el proceso actual con la configuración fija del
+    banco y devuelve sus tiempos por fase.
+    """
+    entrada = {"escena": escena.nombre, "archivo": ruta_relativa(escena.archivo)}
+    carpeta = Path(tempfile.mkdtemp(prefix="banco_"))
+    try:
+        cache = None if tex_en_cache else cache_tex.CacheTex(carpeta / "tex")
+        cache_tex.activar(cache, escena=escena.nombre)
+        if esperas_estaticas:
+            esperas.activar()
+        activar()
+        reiniciar()
+
+        inicio = time.perf_counter()
+        instancia, _ = renderizar_en(carpeta / "media", escena, calidad)
+        total = time.perf_counter() - inicio
+
+        fases = dict(_tiempos)
+        fases["construccion"] = max(0.0, total - sum(fases.values()))
+        entrada.update(
+            estado="ok",
+            segundos=round(total, 3),
+            fases={fase: round(fases[fase], 3) for fase in FASES},
+            animaciones=instancia.renderer.num_plays,
+            cuadros=_cuadros[0],
+        )
+    except Exception:
+        entrada.update(estado="error", error=traceback.format_exc())
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    entrada["rss_mb"] = _pico_mb(resource.RUSAGE_SELF)
+    entrada["rss_hijos_mb"] = _pico_mb(resource.RUSAGE_CHILDREN)
+    return entrada
+
+
+def _mediana(mediciones):
+    """
+    Una sola entrada con la mediana de cada valor de varias repeticiones.
+    """
+    correctas = [m for m in mediciones if m["estado"] == "ok"]
+    if not correctas:
+        return mediciones[-1]
+    resultado = dict(correctas[0])
+    for clave in ("segundos", "rss_mb", "rss_hijos_mb"):
+        resultado[clave] = round(statistics.median(m[clave] for m in correctas), 3)
+    resultado["fases"] = {
+        fase: round(statistics.median(m["fases"][fase] for m in correctas), 3) for fase in FASES
+    }
+    resultado["repeticiones"] = len(correctas)
+    return resultado
+
+
+def _en_proceso_nuevo(funcion, *args):
+    """
+    Ejecuta ``funcion`` en un proceso propio, recién creado (spawn), y
+    devuelve su resultado. Así el pico de memoria y los parches de manim no
+    pasan de una medición a otra.
+    """
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+        return pool.submit(funcion, *args).result()
+
+
+def correr_banco(escenas, calidad="l", repeticiones=1, trabajos=1, tex_en_cache=False, esperas_estaticas=False):
+    """
+    Mide cada escena ``repeticiones`` veces, cada vez en un proceso nuevo
+    para que el pico de memoria sea solo el de esa escena.
+    """
+    from manim import __version__ as version_manim
+
+    trabajos = max(1, min(trabajos, len(escenas) * repeticiones or 1))
+    # Cada hilo lanza un proceso nuevo por medición
+    with ThreadPoolExecutor(max_workers=trabajos) as pool:
+        futuros = {
+            escena.nombre: [
+                pool.submit(_en_proceso_nuevo, medir_escena, escena, calidad, tex_en_cache, esperas_estaticas)
+                for _ in range(repeticiones)
+            ]
+            for escena in escenas
+        }
+        resultados = []
+        for escena in escenas:
+            entrada = _mediana([futuro.result() for futuro in futuros[escena.nombre]])
+            resultados.append(entrada)
+            if entrada["estado"] == "ok":
+                print(f"[banco] {escena.nombre}: {entrada['segundos']} s, {entrada['rss_mb']} MB")
+            else:
+                print(f"[error] {escena.nombre}", file=sys.stderr)
+
+    return {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "calidad": CALIDADES[calidad],
+        "repeticiones": repeticiones,
+        "trabajos": trabajos,
+        "tex_en_cache": tex_en_cache,
+        "esperas_estaticas": esperas_estaticas,
+        "entorno": {
+            "python": platform.python_version(),
+            "manim": version_manim,
+            "sistema": platform.platform(),
+            "procesador": platform.processor() or platform.machine(),
+        },
+        "escenas": resultados,
+    }
+
+
+def comparar(actual, base, umbral=UMBRAL, minimo=MINIMO_SEGUNDOS):
+    """
+    Fases (y totales) de ``actual`` que crecieron respecto de ``base`` más
+    que el umbral relativo y que ``minimo`` segundos.
+    """
+    anteriores = {e["escena"]: e for e in base.get("escenas", []) if e.get("estado") == "ok"}
+    regresiones = []
+    for entrada in actual["escenas"]:
+        anterior = anteriores.get(entrada["escena"])
+        if entrada["estado"] != "ok" or anterior is None:
+            continue
+        pares = [("total", anterior["segundos"], entrada["segundos"])]
+        pares += [(fase, anterior["fases"].get(fase, 0), entrada["fases"][fase]) for fase in FASES]
+        for fase, antes, ahora in pares:
+            if ahora - antes > minimo and ahora > antes * (1 + umbral):
+                regresiones.append({"escena": entrada["escena"], "fase": fase, "antes": antes, "ahora": ahora})
+    return regresiones
+
+
+def imprimir_tabla(resultado, base=None):
+    anteriores = {e["escena"]: e for e in (base or {}).get("escenas", [])}
+    columnas = ("total",) + FASES + ("MB",)
+    print(f"{'escena':<28}" + "".join(f"{c:>13}" for c in columnas))
+    for entrada in resultado["escenas"]:
+        if entrada["estado"] != "ok":
+            print(f"{entrada['escena']:<28}{'error':>13}")
+            continue
+        anterior = anteriores.get(entrada["escena"], {})
+        valores = [(entrada["segundos"], anterior.get("segundos"))]
+        valores += [(entrada["fases"][f], anterior.get("fases", {}).get(f)) for f in FASES]
+        valores += [(entrada["rss_mb"], anterior.get("rss_mb"))]
+        celdas = []
+        for ahora, antes in valores:
+            cambio = f" {100 * (ahora - antes) / antes:+.0f}%" if antes else ""
+            celdas.append(f"{ahora:.2f}{cambio}".rjust(13))
+        print(f"{entrada['escena']:<28}" + "".join(celdas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los tiempos por fase del render de cada escena.")
+    parser.add_argument("escenas", nargs="*", help="clases o módulos a medir (por defecto todas)")
+    parser.add_argument("-q", "--calidad", choices=sorted(CALIDADES), default="l", help="calidad como en manim -q")
+    parser.add_argument("-n", "--repeticiones", type=int, default=1, help="renders por escena (se toma la mediana)")
+    parser.add_argument("-j", "--trabajos", type=int, default=1, help="escenas en paralelo (los tiempos se contaminan si son más de uno)")
+    parser.add_argument("--cache-tex", action="store_true", help="usar la caché de LaTeX compartida en lugar de una vacía")
+    parser.add_argument("--esperas-estaticas", action="store_true", help="medir con las esperas estáticas activas")
+    parser.add_argument("--base", type=Path, default=BASE, help="resultado con el que comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="guardar el resultado como nueva base")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="crecimiento relativo que cuenta como regresión")
+    parser.add_argument("--minimo", type=float, default=MINIMO_SEGUNDOS, help="segundos mínimos de diferencia para una regresión")
+    args = parser.parse_args(argv)
+
+    try:
+        escenas = filtrar_escenas(descubrir_escenas(), args.escenas)
+    except ValueError as error:
+        parser.error(str(error))
+
+    resultado = correr_banco(
+        escenas,
+        calidad=args.calidad,
+        repeticiones=max(1, args.repeticiones),
+        trabajos=args.trabajos,
+        tex_en_cache=args.cache_tex,
+        esperas_estaticas=args.esperas_estaticas,
+    )
+    DIRECTORIO_BANCO.mkdir(parents=True, exist_ok=True)
+    RESULTADO.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    base = json.loads(args.base.read_text(encoding="utf-8")) if args.base.exists() else None
+    imprimir_tabla(resultado, base)
+    for entrada in resultado["escenas"]:
+        if entrada["estado"] == "error":
+            print(f"\n--- {entrada['escena']} ---\n{entrada['error']}", file=sys.stderr)
+    errores = any(e["estado"] == "error" for e in resultado["escenas"])
+
+    if args.guardar_base:
+        shutil.copyfile(RESULTADO, args.base)
+        print(f"Base guardada en {ruta_relativa(args.base)}")
+        return 1 if errores else 0
+    if base is None:
+        print(f"Sin base en {ruta_relativa(args.base)}; guárdela con --guardar-base")
+        return 1 if errores else 0
+
+    if base.get("calidad") != resultado["calidad"] or base.get("tex_en_cache") != resultado["tex_en_cache"]:
+        print("Aviso: la base se midió con otra configuración", file=sys.stderr)
+    regresiones = comparar(resultado, base, args.umbral, args.minimo)
+    for r in regresiones:
+        print(f"[regresión] {r['escena']} {r['fase']}: {r['antes']:.2f} s -> {r['ahora']:.2f} s")
+    if not regresiones:
+        print("Sin regresiones respecto de la base")
+    return 1 if errores or regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Caché compartida de LaTeX a SVG.
+
+Manim compila cada Tex/MathTex con latex + dvisvgm y guarda el resultado en
+la carpeta Tex del media_dir de cada proyecto. Esta caché guarda los SVG en
+un solo directorio con un índice SQLite, de modo que una misma expresión
+(por ejemplo ``f(x) = x^2``) se compila una sola vez por estación de trabajo
+para todas las escenas y para la presentación de Quarto.
+
+El directorio se puede cambiar con TALLERIA_CACHE_TEX (por ejemplo, a una
+carpeta compartida entre máquinas) y el tamaño máximo con
+TALLERIA_CACHE_TEX_MB. Al pasar el límite se borran las entradas usadas
+hace más tiempo.
+
+Uso:
+
+    python -m herramientas.cache_tex            # estadísticas
+    python -m herramientas.cache_tex --vaciar   # borrar toda la caché
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+DIRECTORIO_CACHE = Path(
+    os.environ.get("TALLERIA_CACHE_TEX", Path.home() / ".cache" / "talleria" / "tex")
+)
+LIMITE_BYTES = int(os.environ.get("TALLERIA_CACHE_TEX_MB", "512")) * 1024 * 1024
+
+# Al recortar se deja la caché un poco por debajo del límite para no
+# recortar de nuevo en cada compilación
+MARGEN_RECORTE = 0.9
+
+
+def codigo_tex(expresion, entorno, plantilla):
+    """
+    Documento LaTeX completo que manim compilaría para una expresión.
+    """
+    if entorno is not None:
+        return plantilla.get_texcode_for_expression_in_env(expresion, entorno)
+    return plantilla.get_texcode_for_expression(expresion)
+
+
+def clave_tex(codigo, plantilla):
+    """
+    Clave de la caché: el documento y la forma en que se compila.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{plantilla.tex_compiler}\0{plantilla.output_format}\0".encode())
+    digest.update(codigo.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CacheTex:
+    """
+    Directorio de SVG indexado por la clave del documento LaTeX, con
+    desalojo LRU cuando el total pasa de ``limite_bytes``.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, limite_bytes=LIMITE_BYTES):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = limite_bytes
+        self._conexion = sqlite3.connect(self.directorio / "indice.sqlite", timeout=60)
+        with self._conexion:
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                " clave TEXT PRIMARY KEY,"
+                " expresion TEXT,"
+                " bytes INTEGER NOT NULL,"
+                " creada REAL NOT NULL,"
+                " usada REAL NOT NULL,"
+                " usos INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Expresiones que pidió cada escena, para precompilarlas en lote
+            self._conexion.execute(
+                "CREATE TABLE IF NOT EXISTS expresiones ("
+                " escena TEXT NOT NULL,"
+                " expresion TEXT NOT NULL,"
+                " entorno TEXT NOT NULL,"
+                " vista REAL NOT NULL,"
+                " PRIMARY KEY (escena, expresion, entorno))"
+            )
+
+    def ruta(self, clave):
+        return self.directorio / f"{clave}.svg"
+
+    def buscar(self, clave):
+        """
+        Devuelve la ruta del SVG o None. Marca la entrada como usada.
+        """
+        ruta = self.ruta(clave)
+        with self._conexion:
+            actualizadas = self._conexion.execute(
+                "UPDATE entradas SET usada = ?, usos = usos + 1 WHERE clave = ?",
+                (time.time(), clave),
+            ).rowcount
+            if actualizadas and ruta.exists():
+                return ruta
+            if actualizadas:
+                # El archivo se borró a mano: la entrada ya no sirve
+                self._conexion.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+        return None
+
+    def guardar(self, clave, svg, expresion=""):
+        """
+        Copia un SVG a la caché y devuelve su nueva ruta.
+        """
+        ruta = self.ruta(clave)
+        # Copia atómica: otro proceso puede estar leyendo la misma clave
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".svg.tmp")
+        os.close(descriptor)
+        shutil.copyfile(svg, temporal)
+        os.replace(temporal, ruta)
+
+        ahora = time.time()
+        with self._conexion:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO entradas (clave, expresion, bytes, creada, usada, usos)"
+                " VALUES (?, ?, ?, ?, ?, 1)",
+                (clave, expresion, ruta.stat().st_size, ahora, ahora),
+            )
+        self.recortar()
+        return ruta
+
+    def registrar_expresion(self, escena, expresion, entorno):
+        with self._conexion:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO expresiones (escena, expresion, entorno, vista) VALUES (?, ?, ?, ?)",
+                (escena, expresion, entorno or "", time.time()),
+            )
+
+    def olvidar_expresiones(self, escena, antes_de):
+        """
+        Después de un render completo, descarta las expresiones que la escena
+        ya no usa (las que no se vieron desde ``antes_de``).
+        """
+        with self._conexion:
+            self._conexion.execute(
+                "DELETE FROM expresiones WHERE escena = ? AND vista < ?", (escena, antes_de)
+            )
+
+    def expresiones_de(self, escena):
+        """
+        Pares (expresión, entorno) que la escena compiló en renders anteriores.
+        """
+        filas = self._conexion.execute(
+            "SELECT expresion, entorno FROM expresiones WHERE escena = ?", (escena,)
+        ).fetchall()
+        return [(expresion, entorno or None) for expresion, entorno in filas]
+
+    def total_bytes(self):
+        return self._conexion.execute("SELECT COALESCE(SUM(bytes), 0) FROM entradas").fetchone()[0]
+
+    def recortar(self):
+        """
+        Borra las entradas menos usadas recientemente hasta quedar bajo el límite.
+        """
+        total = self.total_bytes()
+        if total <= self.limite_bytes:
+            return 0
+        objetivo = self.limite_bytes * MARGEN_RECORTE
+        borradas = 0
+        with self._conexion:
+            filas = self._conexion.execute("SELECT clave, bytes FROM entradas ORDER BY usada").fetchall()
+            for clave, tamano in filas:
+                if total <= objetivo:
+                    break
+                self._conexion.execute("DELETE FROM entradas WHERE clave = ?", (clave,))
+                self.ruta(clave).unlink(missing_ok=True)
+                total -= tamano
+                borradas += 1
+        return borradas
+
+    def vaciar(self):
+        with self._conexion:
+            for (clave,) in self._conexion.execute("SELECT clave FROM entradas").fetchall():
+                self.ruta(clave).unlink(missing_ok=True)
+            self._conexion.execute("DELETE FROM entradas")
+            self._conexion.execute("DELETE FROM expresiones")
+
+    def estadisticas(self):
+        entradas, total, usos = self._conexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0), COALESCE(SUM(usos), 0) FROM entradas"
+        ).fetchone()
+        return {"entradas": entradas, "bytes": total, "usos": usos, "limite_bytes": self.limite_bytes}
+
+
+_cache = None
+_tex_a_svg_original = None
+_escena_actual = None
+
+
+def obtener_cache():
+    global _cache
+    if _cache is None:
+        _cache = CacheTex()
+    return _cache
+
+
+def activar(cache=None, escena=None):
+    """
+    Hace que manim pase por la caché al compilar cualquier Tex o MathTex.
+    Se llama antes de construir cada escena; ``escena`` es el nombre con el
+    que se registran sus expresiones.
+    """
+    global _cache, _tex_a_svg_original, _escena_actual
+    from manim.mobject.text import tex_mobject
+    from manim.utils import tex_file_writing
+
+    if cache is not None:
+        _cache = cache
+    _escena_actual = escena
+    if _tex_a_svg_original is not None:
+        return
+    _tex_a_svg_original = tex_file_writing.tex_to_svg_file
+
+    def tex_to_svg_file(expression, environment=None, tex_template=None):
+        from manim import config
+
+        plantilla = tex_template or config["tex_template"]
+        cache_actual = obtener_cache()
+        clave = clave_tex(codigo_tex(expression, environment, plantilla), plantilla)
+        if _escena_actual is not None:
+            cache_actual.registrar_expresion(_escena_actual, expression, environment)
+        svg = cache_actual.buscar(clave)
+        if svg is None:
+            compilado = _tex_a_svg_original(expression, environment=environment, tex_template=plantilla)
+            svg = cache_actual.guardar(clave, compilado, expression)
+        return svg
+
+    # tex_mobject importa la función por nombre, hay que reemplazarla en ambos
+    tex_file_writing.tex_to_svg_file = tex_to_svg_file
+    tex_mobject.tex_to_svg_file = tex_to_svg_file
+
+
+def svg_de_tex(expresion, entorno="align*"):
+    """
+    Ruta del SVG de una expresión, compilándola solo si no está en la caché.
+    Pensado para las celdas de Python de la presentación de Quarto.
+    """
+    from manim.utils import tex_file_writing
+
+    activar()
+    return tex_file_writing.tex_to_svg_file(expresion, environment=entorno)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Caché compartida de LaTeX a SVG.")
+    parser.add_argument("--vaciar", action="store_true", help="borrar todas las entradas")
+    args = parser.parse_args(argv)
+
+    cache = obtener_cache()
+    if args.vaciar:
+        cache.vaciar()
+    datos = cache.estadisticas()
+    print(f"{cache.directorio}")
+    print(f"{datos['entradas']} SVG, {datos['bytes'] / 2**20:.1f} de {datos['limite_bytes'] / 2**20:.0f} MB, {datos['usos']} usos")
+
+
+if __name__ == "__main__":
+    main()
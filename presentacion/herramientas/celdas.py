@@ -0,0 +1,395 @@
+"""
+Caché por celda de los bloques de Python de presentacion.qmd.
+
+Quarto ejecuta todos los bloques en cada render, así que cambiar el texto de
+una diapositiva vuelve a importar pandas, plotly y scikit-learn. Aquí cada
+bloque tiene una clave calculada con:
+
+- su código,
+- las claves de los bloques anteriores de los que depende: los que definen
+  (asignan, importan o declaran) un nombre que el bloque usa antes de
+  definirlo, según el análisis con ast,
+- el entorno: la versión de Python, la de cada paquete que importa y el
+  contenido de los módulos locales que importa (como herramientas/).
+
+Los bloques cuya clave ya está en la caché reutilizan sus salidas (HTML de
+las figuras, tablas, texto). Los demás se ejecutan en un kernel de Jupyter
+junto con los bloques de los que dependen, y sus salidas se guardan. El
+resultado es un notebook (presentacion.ipynb) con las salidas puestas, que
+Quarto renderiza sin ejecutar nada.
+
+El análisis sigue solo los nombres: un bloque que depende de un efecto
+lateral de otro (una semilla global, la configuración de una librería) debe
+usar algún nombre definido en ese bloque, o se puede forzar con --todo.
+
+Con --congelar no se ejecuta nada: cada bloque usa su última salida guardada,
+aunque su código haya cambiado, como el ``freeze`` de Quarto pero por bloque.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.celdas                # actualiza presentacion.ipynb
+    python -m herramientas.celdas --render       # y lo renderiza con Quarto
+    python -m herramientas.celdas --congelar     # sin ejecutar ningún bloque
+    python -m herramientas.celdas --todo         # ejecutar todos los bloques
+
+Si el kernel persistente de nucleo.py está activo, los bloques se ejecutan
+en él en lugar de en un kernel nuevo. Los recursos que el documento carga
+desde su encabezado (recursos/plotly.min.js) se escriben siempre, aunque
+todos los bloques salgan de la caché.
+"""
+import argparse
+import ast
+import functools
+import hashlib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+from importlib import metadata
+from pathlib import Path
+
+from .escenas import DIRECTORIO_PRESENTACION
+from .huellas import dependencias_locales, resolver_modulo
+
+DOCUMENTO = DIRECTORIO_PRESENTACION / "presentacion.qmd"
+
+DIRECTORIO_CACHE = Path(
+    os.environ.get("TALLERIA_CACHE_CELDAS", Path.home() / ".cache" / "talleria" / "celdas")
+)
+
+# Cambia si cambia el formato de las entradas de la caché
+VERSION = 1
+
+INICIO_BLOQUE = re.compile(r"^```\{python[^}]*\}\s*$")
+FIN_BLOQUE = re.compile(r"^```\s*$")
+
+# Se ejecuta antes de los bloques cuando alguno usa plotly, como hace Quarto
+# con sus documentos HTML
+PREPARACION_PLOTLY = 'import plotly.io as pio\npio.renderers.default = "notebook_connected"'
+
+
+class Celda:
+    """
+    Parte de un documento .qmd: "yaml" (encabezado), "markdown" o "python".
+    """
+
+    def __init__(self, tipo, fuente):
+        self.tipo = tipo
+        self.fuente = fuente
+        self.clave = None
+        self.dependencias = []
+        self.salidas = None
+
+    def __repr__(self):
+        return f"Celda({self.tipo}, {self.fuente[:30]!r})"
+
+
+def leer_documento(ruta=DOCUMENTO):
+    """
+    Separa un .qmd en encabezado, texto y bloques de Python.
+    """
+    lineas = Path(ruta).read_text(encoding="utf-8").splitlines()
+    celdas = []
+    # El encabezado puede tener líneas en blanco antes
+    inicio = next((i for i, linea in enumerate(lineas) if linea.strip()), len(lineas))
+    if inicio < len(lineas) and lineas[inicio].strip() == "---":
+        fin = next(i for i in range(inicio + 1, len(lineas)) if lineas[i].strip() == "---")
+        celdas.append(Celda("yaml", "\n".join(lineas[inicio : fin + 1])))
+        inicio = fin + 1
+
+    texto = []
+    bloque = None
+    for linea in lineas[inicio:]:
+        if bloque is None and INICIO_BLOQUE.match(linea):
+            if "".join(texto).strip():
+                celdas.append(Celda("markdown", "\n".join(texto).strip("\n")))
+            texto, bloque = [], []
+        elif bloque is not None and FIN_BLOQUE.match(linea):
+            celdas.append(Celda("python", "\n".join(bloque)))
+            bloque = None
+        elif bloque is not None:
+            bloque.append(linea)
+        else:
+            texto.append(linea)
+    if "".join(texto).strip():
+        celdas.append(Celda("markdown", "\n".join(texto).strip("\n")))
+    return celdas
+
+
+def _nombres_guardados(nodo):
+    for hijo in ast.walk(nodo):
+        if isinstance(hijo, ast.Name) and isinstance(hijo.ctx, (ast.Store, ast.Del)):
+            yield hijo.id
+        elif isinstance(hijo, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield hijo.name
+        elif isinstance(hijo, (ast.Import, ast.ImportFrom)):
+            for alias in hijo.names:
+                yield alias.asname or alias.name.split(".")[0]
+
+
+def analizar(fuente):
+    """
+    (definidos, libres, paquetes) de un bloque: los nombres que define, los
+    que usa antes de definirlos y los paquetes que importa. Si el bloque no
+    es Python válido (por ejemplo, tiene comandos mágicos), libres es None:
+    depende de todos los bloques anteriores.
+    """
+    try:
+        arbol = ast.parse(fuente)
+    except SyntaxError:
+        return set(), None, set()
+    definidos, libres, paquetes = set(), set(), set()
+    for sentencia in arbol.body:
+        usados = {n.id for n in ast.walk(sentencia) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)}
+        libres |= usados - definidos
+        definidos |= set(_nombres_guardados(sentencia))
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            paquetes |= {alias.name.split(".")[0] for alias in nodo.names}
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+            paquetes.add(nodo.module.split(".")[0])
+    return definidos, libres, paquetes
+
+
+@functools.lru_cache(maxsize=None)
+def _distribuciones():
+    return metadata.packages_distributions()
+
+
+def version_de(paquete):
+    """
+    Versión instalada de un paquete importable, o "" si no se conoce.
+    """
+    for distribucion in _distribuciones().get(paquete, [paquete]):
+        try:
+            return metadata.version(distribucion)
+        except metadata.PackageNotFoundError:
+            continue
+    return ""
+
+
+def archivos_locales(fuente, raiz=DIRECTORIO_PRESENTACION):
+    """
+    Archivos .py de la carpeta del documento que importa un bloque (por
+    ejemplo herramientas/plotly_ligero.py), con sus dependencias locales.
+    """
+    try:
+        arbol = ast.parse(fuente)
+    except SyntaxError:
+        return []
+    nombres = []
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            nombres += [alias.name for alias in nodo.names]
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+            nombres += [nodo.module] + [f"{nodo.module}.{alias.name}" for alias in nodo.names]
+    archivos = set()
+    for nombre in nombres:
+        for archivo in resolver_modulo(nombre, raiz):
+            archivos.update(dependencias_locales(archivo, raiz))
+    return sorted(archivos)
+
+
+def calcular_claves(celdas):
+    """
+    Asigna a cada bloque de Python su clave y los bloques de los que depende.
+    """
+    python = [c for c in celdas if c.tipo == "python"]
+    definidor = {}
+    for numero, celda in enumerate(python):
+        definidos, libres, paquetes = analizar(celda.fuente)
+        if libres is None:
+            celda.dependencias = python[:numero]
+        else:
+            celda.dependencias = sorted({definidor[n] for n in libres if n in definidor}, key=python.index)
+        entorno = {"python": platform.python_version(), **{p: version_de(p) for p in sorted(paquetes)}}
+        # El código local que importa el bloque cuenta como parte de su entorno
+        for archivo in archivos_locales(celda.fuente):
+            entorno[archivo.relative_to(DIRECTORIO_PRESENTACION).as_posix()] = hashlib.sha256(archivo.read_bytes()).hexdigest()
+        datos = json.dumps([VERSION, celda.fuente, entorno, [d.clave for d in celda.dependencias]])
+        celda.clave = hashlib.sha256(datos.encode()).hexdigest()
+        for nombre in definidos:
+            definidor[nombre] = celda
+    return python
+
+
+def _ruta_salidas(clave):
+    return DIRECTORIO_CACHE / f"{clave}.json"
+
+
+def _ruta_indice(documento):
+    return DIRECTORIO_CACHE / f"{Path(documento).stem}.indice.json"
+
+
+def leer_salidas(clave):
+    try:
+        return json.loads(_ruta_salidas(clave).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_salidas(clave, salidas):
+    ruta = _ruta_salidas(clave)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(f".{os.getpid()}.tmp")
+    temporal.write_text(json.dumps(salidas, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+def _sin_contador(salidas):
+    # El número de ejecución cambia entre corridas y no aporta a la presentación
+    for salida in salidas:
+        if "execution_count" in salida:
+            salida["execution_count"] = None
+    return salidas
+
+
+def preparacion(fuentes):
+    """
+    Código que se ejecuta antes de los bloques y cuya salida no se guarda.
+    """
+    if any("plotly" in analizar(fuente)[2] for fuente in fuentes):
+        return [PREPARACION_PLOTLY]
+    return []
+
+
+def ejecutar_bloques(fuentes, kernel="python3"):
+    """
+    Ejecuta los bloques en orden en un kernel nuevo y devuelve las salidas
+    de cada uno (listas de salidas en formato nbformat).
+    """
+    import nbformat
+    from nbclient import NotebookClient
+
+    celdas = [nbformat.v4.new_code_cell(fuente) for fuente in preparacion(fuentes) + list(fuentes)]
+    cuaderno = nbformat.v4.new_notebook(cells=celdas)
+    NotebookClient(cuaderno, kernel_name=kernel, timeout=600).execute(cwd=str(DIRECTORIO_PRESENTACION))
+    ejecutadas = cuaderno.cells[len(cuaderno.cells) - len(fuentes):]
+    return [_sin_contador([dict(s) for s in celda.outputs]) for celda in ejecutadas]
+
+
+def _con_dependencias(celdas):
+    necesarias = set()
+    pendientes = list(celdas)
+    while pendientes:
+        celda = pendientes.pop()
+        if id(celda) not in necesarias:
+            necesarias.add(id(celda))
+            pendientes.extend(celda.dependencias)
+    return necesarias
+
+
+def preparar(documento=DOCUMENTO, congelar=False, todo=False, ejecutar=ejecutar_bloques):
+    """
+    Llena las salidas de cada bloque desde la caché o ejecutándolo. Devuelve
+    las celdas del documento y los bloques que se ejecutaron.
+    """
+    celdas = leer_documento(documento)
+    python = calcular_claves(celdas)
+    ruta_indice = _ruta_indice(documento)
+    try:
+        indice = json.loads(ruta_indice.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        indice = []
+
+    for celda in python:
+        celda.salidas = None if todo else leer_salidas(celda.clave)
+
+    if congelar:
+        for numero, celda in enumerate(python):
+            if celda.salidas is None and numero < len(indice):
+                celda.salidas = leer_salidas(indice[numero])
+            if celda.salidas is None:
+                raise RuntimeError(f"El bloque {numero + 1} no tiene salidas guardadas; ejecute sin --congelar")
+        return celdas, []
+
+    pendientes = [c for c in python if c.salidas is None]
+    necesarias = _con_dependencias(pendientes)
+    ejecutadas = [c for c in python if id(c) in necesarias]
+    if ejecutadas:
+        for celda, salidas in zip(ejecutadas, ejecutar([c.fuente for c in ejecutadas])):
+            celda.salidas = salidas
+            guardar_salidas(celda.clave, salidas)
+
+    ruta_indice.parent.mkdir(parents=True, exist_ok=True)
+    ruta_indice.write_text(json.dumps([c.clave for c in python]), encoding="utf-8")
+    return celdas, ejecutadas
+
+
+def escribir_cuaderno(celdas, ruta):
+    """
+    Notebook con el encabezado como celda cruda, el texto como markdown y
+    los bloques con sus salidas, listo para ``quarto render`` sin ejecutar.
+    """
+    import nbformat
+
+    cuaderno = nbformat.v4.new_notebook()
+    cuaderno.metadata["kernelspec"] = {"name": "python3", "display_name": "Python 3", "language": "python"}
+    cuaderno.metadata["language_info"] = {"name": "python"}
+    for celda in celdas:
+        if celda.tipo == "yaml":
+            cuaderno.cells.append(nbformat.v4.new_raw_cell(celda.fuente))
+        elif celda.tipo == "markdown":
+            cuaderno.cells.append(nbformat.v4.new_markdown_cell(celda.fuente))
+        else:
+            salidas = [nbformat.from_dict(s) for s in celda.salidas or []]
+            cuaderno.cells.append(nbformat.v4.new_code_cell(celda.fuente, outputs=salidas))
+    nbformat.write(cuaderno, str(ruta))
+    return ruta
+
+
+def asegurar_recursos(documento=DOCUMENTO):
+    """
+    Copia los recursos que el documento carga desde su encabezado y que no
+    están en git (plotly.js de plotly_ligero.py). No depende de que se
+    ejecute algún bloque: con la caché o con --congelar también hacen falta.
+    """
+    from .plotly_ligero import PLOTLYJS, asegurar_plotlyjs
+
+    documento = Path(documento)
+    referencia = os.path.relpath(PLOTLYJS, documento.parent).replace(os.sep, "/")
+    if referencia not in documento.read_text(encoding="utf-8"):
+        return []
+    try:
+        return [asegurar_plotlyjs()]
+    except ImportError:
+        print(f"plotly no está instalado: no se pudo escribir {referencia}", file=sys.stderr)
+        return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecuta solo los bloques de Python que cambiaron en un .qmd.")
+    parser.add_argument("documento", nargs="?", default=str(DOCUMENTO), help="documento .qmd")
+    parser.add_argument("--congelar", action="store_true", help="no ejecutar: usar las últimas salidas guardadas")
+    parser.add_argument("--todo", action="store_true", help="ejecutar todos los bloques")
+    parser.add_argument("--render", action="store_true", help="renderizar el notebook con Quarto al terminar")
+    parser.add_argument("--sin-nucleo", action="store_true", help="no usar el kernel persistente aunque esté activo")
+    args = parser.parse_args(argv)
+    if args.congelar and args.todo:
+        parser.error("--congelar y --todo no se pueden usar juntos")
+
+    documento = Path(args.documento)
+    ejecutar = ejecutar_bloques
+    if not args.sin_nucleo and not args.congelar:
+        from .nucleo import ejecutor
+
+        ejecutar = ejecutor() or ejecutar_bloques
+    try:
+        celdas, ejecutadas = preparar(documento, args.congelar, args.todo, ejecutar)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    asegurar_recursos(documento)
+    cuaderno = escribir_cuaderno(celdas, documento.with_suffix(".ipynb"))
+    bloques = sum(c.tipo == "python" for c in celdas)
+    print(f"{bloques - len(ejecutadas)} bloques desde la caché, {len(ejecutadas)} ejecutados -> {cuaderno.name}")
+
+    if args.render:
+        return subprocess.run(["quarto", "render", str(cuaderno)]).returncode
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
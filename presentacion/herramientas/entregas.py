@@ -0,0 +1,232 @@
+"""
+Entregas de video en dos perfiles: un borrador rápido y el maestro.
+
+- borrador: 854x480 a 15 fps (manim -ql), para revisar mientras se trabaja.
+- maestro: 1920x1080 a 60 fps (manim -qh), para la presentación.
+
+Los dos se renderizan con render.py (en paralelo, incremental y con la caché
+de LaTeX) y se copian a una ruta fija:
+
+    animations/media/entregas/<perfil>/<Escena>.mp4
+
+Al terminar se escribe animations/media/entregas/reporte.json con, para cada
+escena, lo que tardó cada perfil, la razón borrador/maestro y la duración de
+ambos videos. Las duraciones deben coincidir salvo el redondeo de cada
+animación a cuadros enteros (a lo sumo un cuadro del borrador por animación).
+
+Para las escenas con guion de narración, el reporte anota también los
+segundos de narración (Guion.linea_de_tiempo: cambios de mensaje y esperas)
+y cuánto del video queda para las animaciones propias de la escena. Un video
+más corto que su narración indica que la escena se saltó líneas del guion.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.entregas                       # ambos perfiles
+    python -m herramientas.entregas --perfil borrador     # solo el borrador
+    python -m herramientas.entregas derivada1 integral1
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+
+from .escenas import DIRECTORIO_MEDIA, DIRECTORIO_PRESENTACION, descubrir_escenas, filtrar_escenas
+from .render import CALIDADES, renderizar_todo
+
+# Perfil de entrega -> calidad de render.py
+PERFILES = {"borrador": "l", "maestro": "h"}
+
+DIRECTORIO_ENTREGAS = DIRECTORIO_MEDIA / "entregas"
+REPORTE = DIRECTORIO_ENTREGAS / "reporte.json"
+
+# Fracción del tiempo del maestro que puede tomar el borrador sin aviso
+RAZON_MAXIMA = 0.25
+
+
+def fps_de(perfil):
+    from manim.constants import QUALITIES
+
+    return QUALITIES[CALIDADES[PERFILES[perfil]]]["frame_rate"]
+
+
+def duracion_video(ruta):
+    """
+    Duración en segundos según ffprobe, o None si no se puede medir.
+    """
+    try:
+        salida = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(ruta)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return float(salida.strip())
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def publicar(entrada, perfil):
+    """
+    Copia el video de una escena a entregas/<perfil>/<Escena>.mp4. Usa un
+    enlace duro cuando se puede para no duplicar el archivo.
+    """
+    origen = DIRECTORIO_PRESENTACION / entrada["salida"]
+    destino = DIRECTORIO_ENTREGAS / perfil / f"{entrada['escena']}{origen.suffix}"
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.unlink(missing_ok=True)
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copy2(origen, destino)
+    return destino
+
+
+def duracion_narracion(escena):
+    """
+    Segundos de narración del guion de la escena, o None si no tiene guion
+    o no se puede leer.
+    """
+    from animations.comun.guion import ErrorDeGuion, Guion
+
+    ruta = escena.guion
+    if ruta is None:
+        return None
+    try:
+        segmentos = Guion.cargar(escena.modulo, ruta.parent).linea_de_tiempo()
+    except ErrorDeGuion:
+        return None
+    if not segmentos:
+        return 0.0
+    _, inicio, duracion = segmentos[-1]
+    return round(inicio + duracion, 3)
+
+
+def comparar(entrega, narraciones=None):
+    """
+    Tiempos y duraciones de cada escena en los perfiles entregados, con los
+    segundos de narración de ``narraciones`` ({escena: segundos}).
+    """
+    narraciones = narraciones or {}
+    escenas = sorted({nombre for por_escena in entrega.values() for nombre in por_escena})
+    filas = []
+    for nombre in escenas:
+        fila = {"escena": nombre}
+        for perfil, por_escena in entrega.items():
+            datos = por_escena.get(nombre)
+            if datos is not None:
+                fila[perfil] = datos
+        narracion = narraciones.get(nombre)
+        if narracion is not None:
+            fila["narracion"] = narracion
+            duraciones = [d["duracion"] for d in (fila.get(p) for p in entrega) if d and d.get("duracion") is not None]
+            if duraciones:
+                fila["animacion_propia"] = round(min(duraciones) - narracion, 3)
+                fila["cubre_narracion"] = min(duraciones) >= narracion
+        borrador, maestro = fila.get("borrador"), fila.get("maestro")
+        if borrador and maestro:
+            if maestro["segundos"]:
+                fila["razon"] = round(borrador["segundos"] / maestro["segundos"], 3)
+            if borrador["duracion"] is not None and maestro["duracion"] is not None:
+                diferencia = abs(borrador["duracion"] - maestro["duracion"])
+                tolerancia = (borrador.get("animaciones") or 1) / fps_de("borrador")
+                fila["diferencia_duracion"] = round(diferencia, 3)
+                fila["duracion_coincide"] = diferencia <= tolerancia
+        filas.append(fila)
+    return filas
+
+
+def entregar(escenas, perfiles=tuple(PERFILES), trabajos=None, forzar=False, esperas_estaticas=False):
+    """
+    Renderiza cada perfil, publica los videos y escribe el reporte.
+    """
+    entrega = {}
+    for perfil in perfiles:
+        print(f"== {perfil} ==")
+        manifiesto = renderizar_todo(
+            escenas,
+            calidad=PERFILES[perfil],
+            trabajos=trabajos,
+            forzar=forzar,
+            esperas_estaticas=esperas_estaticas,
+        )
+        nombres = {e.nombre for e in escenas}
+        entrega[perfil] = {}
+        for entrada in manifiesto["escenas"]:
+            if entrada["calidad"] != manifiesto["calidad"] or entrada["escena"] not in nombres:
+                continue
+            if entrada["estado"] != "ok":
+                entrega[perfil][entrada["escena"]] = {"estado": entrada["estado"], "segundos": entrada["segundos"]}
+                continue
+            destino = publicar(entrada, perfil)
+            entrega[perfil][entrada["escena"]] = {
+                "estado": "ok",
+                "video": destino.relative_to(DIRECTORIO_ENTREGAS).as_posix(),
+                "segundos": entrada["segundos"],
+                "animaciones": entrada.get("animaciones"),
+                "duracion": duracion_video(destino),
+            }
+
+    totales = {perfil: round(sum(d["segundos"] for d in por_escena.values()), 2) for perfil, por_escena in entrega.items()}
+    reporte = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        "perfiles": {perfil: CALIDADES[PERFILES[perfil]] for perfil in perfiles},
+        "segundos_total": totales,
+        "escenas": comparar(entrega, {e.nombre: duracion_narracion(e) for e in escenas}),
+    }
+    if totales.get("maestro"):
+        reporte["razon_total"] = round(totales.get("borrador", 0) / totales["maestro"], 3)
+    REPORTE.parent.mkdir(parents=True, exist_ok=True)
+    REPORTE.write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding="utf-8")
+    return reporte
+
+
+def imprimir_reporte(reporte):
+    print(f"\n{'escena':<24}{'borrador':>10}{'maestro':>10}{'razón':>8}  duración")
+    for fila in reporte["escenas"]:
+        borrador, maestro = fila.get("borrador", {}), fila.get("maestro", {})
+        razon = f"{fila['razon']:.0%}" if "razon" in fila else "-"
+        if "duracion_coincide" in fila:
+            duracion = "coincide" if fila["duracion_coincide"] else f"difiere {fila['diferencia_duracion']} s"
+        else:
+            duracion = "-"
+        print(
+            f"{fila['escena']:<24}{borrador.get('segundos', '-'):>10}{maestro.get('segundos', '-'):>10}"
+            f"{razon:>8}  {duracion}"
+        )
+        if fila.get("cubre_narracion") is False:
+            print(f"  aviso: el video dura menos que sus {fila['narracion']} s de narración")
+    if "razon_total" in reporte:
+        aviso = "" if reporte["razon_total"] <= RAZON_MAXIMA else f"  (más de {RAZON_MAXIMA:.0%})"
+        print(f"\nEl borrador tomó {reporte['razon_total']:.0%} del tiempo del maestro{aviso}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderiza y publica el borrador y el maestro de las escenas.")
+    parser.add_argument("escenas", nargs="*", help="clases o módulos (por defecto todas)")
+    parser.add_argument("--perfil", choices=sorted(PERFILES), action="append", help="perfil a entregar (por defecto ambos)")
+    parser.add_argument("-j", "--trabajos", type=int, default=None, help="procesos en paralelo")
+    parser.add_argument("--forzar", action="store_true", help="renderizar aunque la huella no haya cambiado")
+    parser.add_argument("--esperas-estaticas", action="store_true", help="escribir las esperas sin movimiento como un solo cuadro")
+    args = parser.parse_args(argv)
+
+    try:
+        escenas = filtrar_escenas(descubrir_escenas(), args.escenas)
+    except ValueError as error:
+        parser.error(str(error))
+
+    perfiles = [p for p in PERFILES if p in (args.perfil or PERFILES)]
+    reporte = entregar(escenas, perfiles, args.trabajos, args.forzar, args.esperas_estaticas)
+    imprimir_reporte(reporte)
+
+    fallidas = [
+        f["escena"] for f in reporte["escenas"]
+        if any(f.get(p, {}).get("estado") == "error" for p in perfiles) or f.get("duracion_coincide") is False
+    ]
+    return 1 if fallidas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Descubrimiento de las escenas de Manim definidas en presentacion/animations.
+"""
+import ast
+from pathlib import Path
+
+DIRECTORIO_PRESENTACION = Path(__file__).resolve().parent.parent
+DIRECTORIO_ANIMACIONES = DIRECTORIO_PRESENTACION / "animations"
+DIRECTORIO_MEDIA = DIRECTORIO_ANIMACIONES / "media"
+
+
+class Escena:
+    """
+    Referencia a una subclase de Scene dentro de un archivo de animaciones.
+    """
+
+    def __init__(self, archivo, nombre):
+        self.archivo = Path(archivo)
+        self.nombre = nombre
+
+    @property
+    def modulo(self):
+        return self.archivo.stem
+
+    @property
+    def guion(self):
+        """
+        Archivo con el guion de narración del módulo (guiones/<modulo>.json), o None.
+        """
+        from animations.comun.guion import ruta_guion
+
+        return ruta_guion(self.modulo, self.archivo.parent / "guiones")
+
+    def __repr__(self):
+        return f"Escena({self.modulo}.{self.nombre})"
+
+
+def _es_base_de_escena(base):
+    """
+    Acepta Scene y sus variantes de Manim (MovingCameraScene, ThreeDScene, ...).
+    """
+    if isinstance(base, ast.Attribute):
+        return base.attr.endswith("Scene")
+    return isinstance(base, ast.Name) and base.id.endswith("Scene")
+
+
+def descubrir_escenas(directorio=DIRECTORIO_ANIMACIONES):
+    """
+    Busca las subclases de Scene analizando el código con ast, sin importar
+    los módulos (importar manim en el proceso principal no hace falta).
+    """
+    escenas = []
+    for archivo in sorted(Path(directorio).glob("*.py")):
+        arbol = ast.parse(archivo.read_text(encoding="utf-8"), filename=str(archivo))
+        for nodo in arbol.body:
+            if isinstance(nodo, ast.ClassDef) and any(_es_base_de_escena(b) for b in nodo.bases):
+                escenas.append(Escena(archivo, nodo.name))
+    return escenas
+
+
+def filtrar_escenas(escenas, nombres):
+    """
+    Filtra por nombre de clase o de módulo; sin nombres devuelve todas.
+    """
+    if not nombres:
+        return list(escenas)
+    seleccion = [e for e in escenas if e.nombre in nombres or e.modulo in nombres]
+    conocidos = {e.nombre for e in escenas} | {e.modulo for e in escenas}
+    desconocidos = [n for n in nombres if n not in conocidos]
+    if desconocidos:
+        raise ValueError(f"Escenas desconocidas: {', '.join(desconocidos)}")
+    return seleccion
@@ -0,0 +1,106 @@
+"""
+Esperas estáticas escritas como un solo cuadro.
+
+Un ``self.wait(8)`` sin updaters no cambia nada en pantalla, pero manim
+igual escribe 8 × fps cuadros iguales al encoder. Con este modo activo, cada
+espera estática guarda su único cuadro como PNG y ffmpeg genera el video
+parcial repitiéndolo (``-loop 1``) con los mismos ajustes con que manim
+escribe los demás parciales por PyAV: libx264 con crf 23, yuv420p y los
+mismos fps, sin ``-tune``. manim une los parciales copiando los paquetes,
+con los parámetros del codificador del primero, así que todos deben salir
+del mismo codificador configurado igual. El tiempo de render pasa a depender de lo que se
+mueve y no de la duración de la escena.
+
+Solo aplica a las esperas que manim ya reconoce como estáticas (un Wait
+solo, sin updaters) y a salidas .mp4 sin transparencia; todo lo demás se
+renderiza igual que antes.
+
+Uso:
+
+    python -m herramientas.render --esperas-estaticas
+"""
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+_originales = {}
+
+# Esperas reemplazadas y cuadros que no pasaron por el encoder en el proceso actual
+_estadisticas = {"esperas": 0, "cuadros": 0}
+
+
+def reiniciar_estadisticas():
+    _estadisticas.update(esperas=0, cuadros=0)
+
+
+def estadisticas():
+    return dict(_estadisticas)
+
+
+def _se_puede_aplicar():
+    from manim import config
+
+    return config.write_to_movie and config.movie_file_extension == ".mp4" and not config.transparent
+
+
+def escribir_espera(ruta, cuadro, cuadros, fps):
+    """
+    Escribe en ``ruta`` un video de ``cuadros`` cuadros iguales a ``cuadro``
+    (arreglo RGBA de la cámara).
+    """
+    from PIL import Image
+
+    ruta = Path(ruta)
+    with tempfile.TemporaryDirectory(prefix="espera_") as carpeta:
+        imagen = Path(carpeta) / "cuadro.png"
+        Image.fromarray(cuadro).convert("RGB").save(imagen)
+        temporal = ruta.with_name(f".{ruta.stem}.espera{ruta.suffix}")
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-loop", "1", "-framerate", str(fps), "-i", str(imagen),
+                "-frames:v", str(cuadros),
+                "-c:v", "libx264", "-crf", "23", "-pix_fmt", "yuv420p",
+                "-r", str(fps), "-movflags", "+faststart",
+                str(temporal),
+            ],
+            check=True,
+        )
+        os.replace(temporal, ruta)
+
+
+def activar():
+    """
+    Reemplaza el congelado de cuadros del renderer de Cairo. Se puede llamar
+    varias veces; solo se aplica una vez por proceso.
+    """
+    if _originales:
+        return
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    _originales["freeze_current_frame"] = CairoRenderer.freeze_current_frame
+    _originales["end_animation"] = SceneFileWriter.end_animation
+
+    def freeze_current_frame(self, duration):
+        dt = 1 / self.camera.frame_rate
+        cuadros = int(duration / dt)
+        if self.skip_animations or cuadros < 2 or not _se_puede_aplicar():
+            return _originales["freeze_current_frame"](self, duration)
+        # Lo mismo que haría add_frame con el reloj, sin escribir los cuadros
+        self.time += cuadros * dt
+        self.file_writer.espera_estatica = (self.get_frame(), cuadros, self.camera.frame_rate)
+
+    def end_animation(self, allow_write=False):
+        espera = getattr(self, "espera_estatica", None)
+        self.espera_estatica = None
+        _originales["end_animation"](self, allow_write)
+        if espera is not None and allow_write:
+            cuadro, cuadros, fps = espera
+            escribir_espera(self.partial_movie_file_path, cuadro, cuadros, fps)
+            _estadisticas["esperas"] += 1
+            _estadisticas["cuadros"] += cuadros
+
+    CairoRenderer.freeze_current_frame = freeze_current_frame
+    SceneFileWriter.end_animation = end_animation
@@ -0,0 +1,88 @@
+"""
+Huellas de contenido de las escenas para el render incremental.
+
+La huella de una escena combina su archivo fuente, los módulos locales que
+importa (por ejemplo, ayudantes compartidos dentro de animations/), su guion
+de narración y la configuración de render. Si la huella coincide con la del último video
+generado, la escena no se vuelve a renderizar.
+"""
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+from .escenas import DIRECTORIO_ANIMACIONES
+
+# Archivos de configuración que manim lee junto a las escenas
+ARCHIVOS_DE_CONFIGURACION = [DIRECTORIO_ANIMACIONES / "manim.cfg"]
+
+
+def resolver_modulo(nombre, raiz):
+    """
+    Devuelve los archivos locales que corresponden a un import (el módulo y
+    los __init__.py de sus paquetes), o una lista vacía si no es local.
+    """
+    partes = nombre.split(".")
+    archivos = []
+    ruta = Path(raiz)
+    for i, parte in enumerate(partes):
+        ruta = ruta / parte
+        inicial = ruta / "__init__.py"
+        if inicial.exists():
+            archivos.append(inicial)
+        elif i == len(partes) - 1 and ruta.with_suffix(".py").exists():
+            archivos.append(ruta.with_suffix(".py"))
+        else:
+            break
+    return archivos
+
+
+def _imports(archivo):
+    arbol = ast.parse(Path(archivo).read_text(encoding="utf-8"), filename=str(archivo))
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Import):
+            for alias in nodo.names:
+                yield alias.name
+        elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+            yield nodo.module
+            for alias in nodo.names:
+                yield f"{nodo.module}.{alias.name}"
+
+
+def dependencias_locales(archivo, raiz=DIRECTORIO_ANIMACIONES):
+    """
+    Archivos .py de animations/ de los que depende una escena, incluyendo
+    los imports transitivos. El propio archivo va primero.
+    """
+    archivo = Path(archivo).resolve()
+    visitados = [archivo]
+    pendientes = [archivo]
+    while pendientes:
+        actual = pendientes.pop()
+        for nombre in _imports(actual):
+            for dependencia in resolver_modulo(nombre, raiz):
+                dependencia = dependencia.resolve()
+                if dependencia not in visitados:
+                    visitados.append(dependencia)
+                    pendientes.append(dependencia)
+    return [visitados[0]] + sorted(visitados[1:])
+
+
+def huella_escena(escena, configuracion):
+    """
+    SHA-256 del código de la escena, sus dependencias locales, su guion y
+    la configuración de render (cualquier dict serializable en JSON).
+    """
+    digest = hashlib.sha256()
+    archivos = dependencias_locales(escena.archivo)
+    if escena.guion is not None:
+        archivos.append(escena.guion)
+    archivos += [a for a in ARCHIVOS_DE_CONFIGURACION if a.exists()]
+    for archivo in archivos:
+        digest.update(archivo.relative_to(DIRECTORIO_ANIMACIONES).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(archivo.read_bytes())
+        digest.update(b"\0")
+    digest.update(escena.nombre.encode())
+    digest.update(json.dumps(configuracion, sort_keys=True).encode())
+    return digest.hexdigest()
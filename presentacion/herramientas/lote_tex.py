@@ -0,0 +1,229 @@
+"""
+Compilación en lote de las fórmulas de una escena.
+
+Cada Tex/MathTex lanza su propio latex y su propio dvisvgm, y el arranque de
+esos procesos es la mayor parte del costo. Antes de renderizar una escena se
+reúnen todas las expresiones que va a necesitar, se compilan en un único
+documento de varias páginas (una página por expresión, con el paquete
+preview) y un solo dvisvgm separa las páginas en SVG que se guardan en la
+caché compartida de cache_tex.py. Durante el render, manim las encuentra
+ahí y ya no compila nada.
+
+Las expresiones salen de dos fuentes:
+
+- las cadenas literales del código de la escena (MathTex("..."), Tex("...")
+  y los mensajes de Dialogo(...) y dialog.decir(...), palabra por palabra),
+- los mensajes del guion de narración de la escena (guiones/<modulo>.json),
+- las que la escena pidió en renders anteriores, registradas en la caché.
+"""
+import ast
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+
+from .cache_tex import clave_tex, codigo_tex, obtener_cache
+
+# Entorno LaTeX por defecto de cada clase de manim y su separador de argumentos
+CLASES_TEX = {
+    "MathTex": ("align*", " "),
+    "SingleStringMathTex": ("align*", " "),
+    "Tex": ("center", ""),
+}
+
+# Llamadas de narración de las escenas (comun/dialogo.py): posición del
+# mensaje. El diálogo compone cada palabra por separado junto a una letra de
+# referencia, como Tex(ANCLA, palabra, arg_separator=" ").
+METODOS_DE_DIALOGO = {"Dialogo": 0, "decir": 0}
+
+DOCUMENTCLASS_MANIM = r"\documentclass[preview]{standalone}"
+
+# standalone con la opción preview equivale a article + preview activo; así
+# cada entorno preview del lote sale en su propia página, recortada
+CABECERA_LOTE = "\\documentclass{article}\n\\usepackage[active,tightpage]{preview}\n"
+
+
+class ErrorDeLote(Exception):
+    pass
+
+
+def _cadena(nodo):
+    if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str):
+        return nodo.value
+    return None
+
+
+def _expresiones_de_llamada(llamada):
+    """
+    Expresiones que manim compilará para una llamada a MathTex/Tex con
+    argumentos literales: la cadena unida y, si hay varias, cada parte.
+    """
+    nombre = getattr(llamada.func, "id", getattr(llamada.func, "attr", None))
+    entorno, separador = CLASES_TEX[nombre]
+    partes = [_cadena(a) for a in llamada.args]
+    opciones = {k.arg: _cadena(k.value) for k in llamada.keywords if k.arg}
+    if not partes or None in partes or any(isinstance(a, ast.Starred) for a in llamada.args):
+        return []
+    if "tex_environment" in opciones:
+        entorno = opciones["tex_environment"]
+    if "arg_separator" in opciones:
+        separador = opciones["arg_separator"]
+    if entorno is None or separador is None:
+        return []
+
+    expresiones = [(separador.join(partes).strip(), entorno)]
+    if len(partes) > 1:
+        expresiones += [(p.strip(), entorno) for p in partes if p.strip()]
+    return expresiones
+
+
+def expresiones_de_dialogo(mensaje):
+    """
+    Expresiones que comun/dialogo.py compila para mostrar un mensaje.
+    """
+    # dialogo.py importa manim; solo se carga en el proceso que renderiza
+    from animations.comun.dialogo import ANCLA, palabras
+
+    expresiones = [(ANCLA, "center"), (f"{ANCLA} {ANCLA}", "center")]
+    for palabra in palabras(mensaje):
+        expresiones += [(f"{ANCLA} {palabra}", "center"), (palabra, "center")]
+    return expresiones
+
+
+def expresiones_literales(archivo):
+    """
+    Expresiones LaTeX que aparecen como literales en el archivo de una escena.
+    """
+    arbol = ast.parse(Path(archivo).read_text(encoding="utf-8"), filename=str(archivo))
+    expresiones = []
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, ast.Call):
+            continue
+        nombre = getattr(nodo.func, "id", getattr(nodo.func, "attr", None))
+        if nombre in CLASES_TEX:
+            expresiones += _expresiones_de_llamada(nodo)
+        elif nombre in METODOS_DE_DIALOGO:
+            posicion = METODOS_DE_DIALOGO[nombre]
+            if len(nodo.args) > posicion and _cadena(nodo.args[posicion]):
+                expresiones += expresiones_de_dialogo(_cadena(nodo.args[posicion]))
+    return expresiones
+
+
+def expresiones_de_guion(escena):
+    """
+    Expresiones de todos los mensajes del guion de la escena, si tiene.
+    """
+    from animations.comun.guion import Guion
+
+    if escena.guion is None:
+        return []
+    guion = Guion.cargar(escena.modulo, escena.guion.parent)
+    return [expresion for texto in guion.textos() for expresion in expresiones_de_dialogo(texto)]
+
+
+def _cuerpo(codigo):
+    """
+    Contenido entre \\begin{document} y \\end{document}.
+    """
+    inicio = codigo.index("\\begin{document}") + len("\\begin{document}")
+    return codigo[inicio:codigo.rindex("\\end{document}")]
+
+
+def _se_puede_agrupar(plantilla):
+    return (
+        plantilla.tex_compiler == "latex"
+        and plantilla.output_format == ".dvi"
+        and plantilla.documentclass.strip() == DOCUMENTCLASS_MANIM
+    )
+
+
+def documento_de_lote(codigos, plantilla):
+    paginas = "".join(f"\\begin{{preview}}{_cuerpo(c)}\\end{{preview}}\n" for c in codigos)
+    return f"{CABECERA_LOTE}{plantilla.preamble}\n\\begin{{document}}\n{paginas}\\end{{document}}\n"
+
+
+def _compilar_paginas(documento, cantidad, carpeta):
+    """
+    Compila el documento con un solo latex y un solo dvisvgm dentro de
+    ``carpeta``. Devuelve los SVG en orden de página.
+    """
+    (carpeta / "lote.tex").write_text(documento, encoding="utf-8")
+    latex = subprocess.run(
+        ["latex", "-interaction=batchmode", "-halt-on-error", "lote.tex"],
+        cwd=carpeta,
+        capture_output=True,
+    )
+    if latex.returncode != 0 or not (carpeta / "lote.dvi").exists():
+        raise ErrorDeLote("latex falló")
+    # Mismas opciones que manim (-n: sin fuentes, solo trazos)
+    subprocess.run(
+        ["dvisvgm", "lote.dvi", "--page=1-", "-n", "-v", "0", "-o", "%f-%p.svg"],
+        cwd=carpeta,
+        capture_output=True,
+        check=True,
+    )
+    svgs = sorted(
+        carpeta.glob("lote-*.svg"),
+        key=lambda ruta: int(re.search(r"-(\d+)\.svg$", ruta.name).group(1)),
+    )
+    if len(svgs) != cantidad:
+        raise ErrorDeLote(f"se esperaban {cantidad} páginas y salieron {len(svgs)}")
+    return svgs
+
+
+def compilar_lote(pendientes, plantilla, cache):
+    """
+    Compila en un solo documento una lista de (expresión, entorno, código,
+    clave). Si el lote falla, se parte en dos para aislar la expresión con
+    error, que queda para que manim la compile y reporte por su cuenta.
+    Devuelve cuántas expresiones se guardaron en la caché.
+    """
+    if not pendientes:
+        return 0
+    documento = documento_de_lote([p[2] for p in pendientes], plantilla)
+    with tempfile.TemporaryDirectory(prefix="lote_tex_") as carpeta:
+        try:
+            svgs = _compilar_paginas(documento, len(pendientes), Path(carpeta))
+        except (ErrorDeLote, subprocess.CalledProcessError):
+            svgs = None
+        else:
+            for (expresion, _, _, clave), svg in zip(pendientes, svgs):
+                cache.guardar(clave, svg, expresion)
+    if svgs is not None:
+        return len(pendientes)
+    if len(pendientes) == 1:
+        return 0
+    mitad = len(pendientes) // 2
+    return compilar_lote(pendientes[:mitad], plantilla, cache) + compilar_lote(
+        pendientes[mitad:], plantilla, cache
+    )
+
+
+def precompilar(escena, plantilla=None, cache=None):
+    """
+    Compila en lote las expresiones de una escena que aún no están en la
+    caché. Se llama dentro del tempconfig del render para usar su plantilla.
+    """
+    from manim import config
+
+    plantilla = plantilla or config["tex_template"]
+    cache = cache or obtener_cache()
+    if not _se_puede_agrupar(plantilla):
+        return 0
+
+    vistas = set()
+    pendientes = []
+    candidatas = (
+        expresiones_literales(escena.archivo)
+        + expresiones_de_guion(escena)
+        + cache.expresiones_de(escena.nombre)
+    )
+    for expresion, entorno in candidatas:
+        codigo = codigo_tex(expresion, entorno, plantilla)
+        clave = clave_tex(codigo, plantilla)
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        if not cache.ruta(clave).exists():
+            pendientes.append((expresion, entorno, codigo, clave))
+    return compilar_lote(pendientes, plantilla, cache)
@@ -0,0 +1,285 @@
+"""
+Kernel de Python persistente para reconstruir la presentación.
+
+celdas.py ejecuta los bloques que cambiaron en un kernel nuevo, que paga de
+nuevo la importación de numpy, pandas, plotly y scikit-learn antes del primer
+bloque. Este módulo deja un kernel de Jupyter corriendo en segundo plano:
+
+- al iniciarlo importa los módulos que usan los bloques de presentacion.qmd
+  y memoriza los conjuntos de datos de ``plotly.express.data`` (cada llamada
+  devuelve una copia, así que un bloque no altera los datos del siguiente);
+- en cada reconstrucción se vacía el espacio de nombres (``%reset -f``) y se
+  vuelve a la carpeta de la presentación, para que un bloque no vea variables
+  de la reconstrucción anterior. Los paquetes instalados siguen en
+  ``sys.modules``, así que volver a importarlos no cuesta nada; los módulos
+  locales (herramientas, animations/comun) se descartan y se vuelven a leer,
+  porque celdas.py incluye su código en la clave de cada bloque y un bloque
+  que se ejecuta por un cambio en ellos no puede usar la versión anterior.
+
+Mientras el kernel está activo, ``python -m herramientas.celdas`` lo usa en
+lugar de arrancar uno nuevo. Una reconstrucción toma el kernel con un bloqueo
+de archivo, así que dos reconstrucciones a la vez se turnan.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.nucleo iniciar
+    python -m herramientas.nucleo estado
+    python -m herramientas.nucleo detener
+"""
+import argparse
+import ast
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .celdas import DOCUMENTO, leer_documento, preparacion
+from .escenas import DIRECTORIO_PRESENTACION
+
+DIRECTORIO_NUCLEO = Path(
+    os.environ.get("TALLERIA_NUCLEO", Path.home() / ".cache" / "talleria" / "nucleo")
+)
+CONEXION = DIRECTORIO_NUCLEO / "conexion.json"
+PROCESO = DIRECTORIO_NUCLEO / "proceso.json"
+BLOQUEO = DIRECTORIO_NUCLEO / "uso.lock"
+REGISTRO = DIRECTORIO_NUCLEO / "kernel.log"
+
+ESPERA_INICIO = 60
+ESPERA_BLOQUE = 600
+
+MEMORIZAR_DATOS = '''
+def _memorizar_datos():
+    import functools
+    try:
+        import plotly.express.data as datos
+    except ImportError:
+        return
+    for nombre in dir(datos):
+        funcion = getattr(datos, nombre)
+        if nombre.startswith("_") or not callable(funcion) or hasattr(funcion, "__wrapped__"):
+            continue
+        memo = functools.lru_cache(maxsize=None)(funcion)
+
+        @functools.wraps(funcion)
+        def copia(*args, _memo=memo, **kwargs):
+            resultado = _memo(*args, **kwargs)
+            return resultado.copy() if hasattr(resultado, "copy") else resultado
+
+        setattr(datos, nombre, copia)
+
+_memorizar_datos()
+del _memorizar_datos
+'''
+
+REINICIO = '''
+get_ipython().run_line_magic("reset", "-f")
+import os, sys
+for _nombre, _modulo in list(sys.modules.items()):
+    _archivo = os.path.abspath(getattr(_modulo, "__file__", None) or os.devnull)
+    if _archivo.startswith({raiz!r}) and "site-packages" not in _archivo:
+        del sys.modules[_nombre]
+os.chdir({carpeta!r})
+del os, sys, _nombre, _modulo, _archivo
+'''
+
+
+def reinicio(carpeta=DIRECTORIO_PRESENTACION):
+    """
+    Código que vacía el espacio de nombres y descarta los módulos locales
+    (los de ``carpeta``), para que el siguiente import lea su código actual.
+    """
+    carpeta = str(carpeta)
+    return REINICIO.format(carpeta=carpeta, raiz=carpeta + os.sep)
+
+
+def modulos_del_documento(documento=DOCUMENTO):
+    """
+    Módulos que importan los bloques de Python del documento, en orden.
+    """
+    modulos = []
+    for celda in leer_documento(documento):
+        if celda.tipo != "python":
+            continue
+        try:
+            arbol = ast.parse(celda.fuente)
+        except SyntaxError:
+            continue
+        for nodo in ast.walk(arbol):
+            if isinstance(nodo, ast.Import):
+                nombres = [alias.name for alias in nodo.names]
+            elif isinstance(nodo, ast.ImportFrom) and nodo.module and nodo.level == 0:
+                nombres = [nodo.module]
+            else:
+                continue
+            modulos.extend(n for n in nombres if n not in modulos)
+    return modulos
+
+
+def _cliente(espera):
+    """
+    Cliente conectado al kernel en marcha, o None si no hay uno que responda.
+    """
+    if not CONEXION.exists():
+        return None
+    from jupyter_client import BlockingKernelClient
+
+    cliente = BlockingKernelClient(connection_file=str(CONEXION))
+    cliente.load_connection_file()
+    cliente.start_channels()
+    try:
+        cliente.wait_for_ready(timeout=espera)
+    except RuntimeError:
+        cliente.stop_channels()
+        return None
+    return cliente
+
+
+def _ejecutar(cliente, codigo, espera=ESPERA_BLOQUE):
+    """
+    Ejecuta código en el kernel y devuelve sus salidas en formato nbformat.
+    Si el código lanza una excepción se lanza RuntimeError con el traceback.
+    """
+    import nbformat
+
+    salidas = []
+
+    def recibir(mensaje):
+        if mensaje["msg_type"] in ("stream", "display_data", "execute_result", "error"):
+            salida = nbformat.v4.output_from_msg(mensaje)
+            if "execution_count" in salida:
+                salida["execution_count"] = None
+            salidas.append(dict(salida))
+
+    respuesta = cliente.execute_interactive(codigo, output_hook=recibir, timeout=espera, allow_stdin=False)
+    if respuesta["content"]["status"] == "error":
+        contenido = respuesta["content"]
+        raise RuntimeError("\n".join(contenido.get("traceback", [])) or f"{contenido['ename']}: {contenido['evalue']}")
+    return salidas
+
+
+def activo():
+    cliente = _cliente(espera=2)
+    if cliente is None:
+        return False
+    cliente.stop_channels()
+    return True
+
+
+def iniciar(documento=DOCUMENTO):
+    """
+    Arranca el kernel en segundo plano y precarga los módulos del documento.
+    """
+    if activo():
+        return False
+    DIRECTORIO_NUCLEO.mkdir(parents=True, exist_ok=True)
+    CONEXION.unlink(missing_ok=True)
+    with open(REGISTRO, "ab") as registro:
+        proceso = subprocess.Popen(
+            [sys.executable, "-m", "ipykernel_launcher", "-f", str(CONEXION)],
+            cwd=str(DIRECTORIO_PRESENTACION),
+            stdin=subprocess.DEVNULL,
+            stdout=registro,
+            stderr=registro,
+            start_new_session=True,
+        )
+    PROCESO.write_text(json.dumps({"pid": proceso.pid}), encoding="utf-8")
+
+    limite = time.monotonic() + ESPERA_INICIO
+    while not CONEXION.exists():
+        if proceso.poll() is not None or time.monotonic() > limite:
+            raise RuntimeError(f"El kernel no arrancó; ver {REGISTRO}")
+        time.sleep(0.1)
+    cliente = _cliente(espera=ESPERA_INICIO)
+    if cliente is None:
+        raise RuntimeError(f"El kernel no responde; ver {REGISTRO}")
+
+    try:
+        for modulo in modulos_del_documento(documento):
+            try:
+                _ejecutar(cliente, f"import {modulo}")
+            except RuntimeError:
+                print(f"No se pudo precargar {modulo}", file=sys.stderr)
+        _ejecutar(cliente, MEMORIZAR_DATOS)
+    finally:
+        cliente.stop_channels()
+    return True
+
+
+def detener():
+    cliente = _cliente(espera=2)
+    if cliente is not None:
+        cliente.shutdown()
+        cliente.stop_channels()
+    elif PROCESO.exists():
+        with contextlib.suppress(OSError, ValueError, KeyError):
+            os.kill(json.loads(PROCESO.read_text(encoding="utf-8"))["pid"], signal.SIGTERM)
+    for archivo in (CONEXION, PROCESO):
+        archivo.unlink(missing_ok=True)
+
+
+@contextlib.contextmanager
+def _turno():
+    import fcntl
+
+    DIRECTORIO_NUCLEO.mkdir(parents=True, exist_ok=True)
+    with open(BLOQUEO, "w") as bloqueo:
+        fcntl.flock(bloqueo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(bloqueo, fcntl.LOCK_UN)
+
+
+def ejecutar_en_nucleo(fuentes):
+    """
+    Mismo contrato que celdas.ejecutar_bloques, usando el kernel persistente.
+    """
+    with _turno():
+        cliente = _cliente(espera=5)
+        if cliente is None:
+            raise RuntimeError("El kernel persistente no está activo (python -m herramientas.nucleo iniciar)")
+        try:
+            _ejecutar(cliente, reinicio())
+            for codigo in preparacion(fuentes):
+                _ejecutar(cliente, codigo)
+            return [_ejecutar(cliente, fuente) for fuente in fuentes]
+        finally:
+            cliente.stop_channels()
+
+
+def ejecutor():
+    """
+    ejecutar_en_nucleo si hay un kernel persistente activo, o None.
+    """
+    try:
+        return ejecutar_en_nucleo if activo() else None
+    except ImportError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kernel de Python persistente para la presentación.")
+    parser.add_argument("accion", choices=["iniciar", "estado", "detener"])
+    args = parser.parse_args(argv)
+
+    if args.accion == "iniciar":
+        try:
+            iniciado = iniciar()
+        except RuntimeError as error:
+            print(error, file=sys.stderr)
+            return 1
+        print("Kernel iniciado" if iniciado else "El kernel ya estaba activo")
+    elif args.accion == "estado":
+        print("activo" if activo() else "detenido")
+    else:
+        detener()
+        print("Kernel detenido")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
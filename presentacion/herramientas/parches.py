@@ -0,0 +1,29 @@
+"""
+Reemplazos de funciones de manim que hacen las herramientas de medición.
+
+banco.py y perfil.py envuelven métodos de manim (Scene.play, el dibujo de
+cuadros, ...) para medirlos. Cada herramienta registra sus reemplazos con su
+nombre; el original queda guardado y ``activo`` dice si la herramienta ya
+se aplicó en el proceso, para no envolver dos veces.
+"""
+_originales = {}
+
+
+def activo(herramienta):
+    return any(clave[0] == herramienta for clave in _originales)
+
+
+def reemplazar(herramienta, objeto, nombre, envolver):
+    """
+    Cambia ``objeto.nombre`` por ``envolver(original)`` y guarda el original.
+    Si el atributo no existe no hace nada.
+    """
+    original = getattr(objeto, nombre, None)
+    if original is None:
+        return
+    _originales[(herramienta, objeto, nombre)] = original
+    setattr(objeto, nombre, envolver(original))
+
+
+def original(herramienta, objeto, nombre):
+    return _originales[(herramienta, objeto, nombre)]
@@ -0,0 +1,234 @@
+"""
+Perfil de las llamadas a play y wait de una escena.
+
+Con el perfil activo, cada ``self.play`` y ``self.wait`` anota su tiempo de
+reloj, cuántos mobjects toca (las familias de los mobjects de sus
+animaciones; en una espera, los que tienen updaters), cuántos cuadros
+dibujó, los segundos de video que agregó y la línea de la escena desde la
+que se llamó, con la cadena de métodos de la escena que llevó hasta ella
+(construct → show_equations → ...).
+
+Se escriben dos archivos en animations/media/perfiles/:
+
+- <Escena>.folded: pilas plegadas ("marco;marco;... microsegundos"), que
+  entienden flamegraph.pl, speedscope e inferno;
+- <Escena>.json: cada llamada con sus datos, en orden.
+
+La escena se renderiza en una carpeta temporal y sin la caché de manim, para
+que ninguna animación se salte por estar en la caché.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.perfil DetailedNeuralNetwork
+    python -m herramientas.perfil kmeans_explained --lineas 30
+    flamegraph.pl animations/media/perfiles/DetailedNeuralNetwork.folded > red.svg
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from collections import defaultdict
+from pathlib import Path
+
+from . import cache_tex, esperas, parches
+from .escenas import DIRECTORIO_ANIMACIONES, DIRECTORIO_MEDIA, descubrir_escenas, filtrar_escenas
+from .render import CALIDADES, renderizar_en, ruta_relativa
+
+DIRECTORIO_PERFILES = DIRECTORIO_MEDIA / "perfiles"
+
+_registros = []
+_cuadros = [0]
+
+# Profundidad de play/wait en curso: wait llama a play y solo se anota la de afuera
+_profundidad = [0]
+
+
+def reiniciar():
+    _registros.clear()
+    _cuadros[0] = 0
+
+
+def registros():
+    return list(_registros)
+
+
+def _pila_de_escena(marco):
+    """
+    Marcos de los archivos de animations/ desde el más externo, como
+    (archivo relativo, función, línea).
+    """
+    raiz = str(DIRECTORIO_ANIMACIONES) + os.sep
+    pila = []
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.startswith(raiz):
+            pila.append((os.path.relpath(archivo, DIRECTORIO_ANIMACIONES), marco.f_code.co_name, marco.f_lineno))
+        marco = marco.f_back
+    return pila[::-1]
+
+
+def _mobjects_de(animaciones):
+    """
+    Mobjects distintos en las familias de los mobjects de las animaciones
+    (sirve para Animation y para ``mobject.animate``).
+    """
+    vistos = set()
+    for animacion in animaciones:
+        mobject = getattr(animacion, "mobject", None)
+        if mobject is not None:
+            vistos.update(id(m) for m in mobject.get_family())
+    return len(vistos)
+
+
+def _con_updaters(escena):
+    return sum(1 for m in escena.get_mobject_family_members() if m.updaters)
+
+
+def _medida(tipo, metodo):
+    @functools.wraps(metodo)
+    def envoltura(escena, *args, **kwargs):
+        if _profundidad[0]:
+            return metodo(escena, *args, **kwargs)
+        pila = _pila_de_escena(sys._getframe(1))
+        mobjects = _mobjects_de(args) if tipo == "play" else _con_updaters(escena)
+        cuadros = _cuadros[0]
+        tiempo_video = escena.renderer.time
+        _profundidad[0] += 1
+        inicio = time.perf_counter()
+        try:
+            return metodo(escena, *args, **kwargs)
+        finally:
+            segundos = time.perf_counter() - inicio
+            _profundidad[0] -= 1
+            archivo, _, linea = pila[-1] if pila else ("?", "?", 0)
+            _registros.append({
+                "indice": len(_registros),
+                "tipo": tipo,
+                "archivo": archivo,
+                "linea": linea,
+                "pila": [f"{funcion} ({ruta}:{numero})" for ruta, funcion, numero in pila],
+                "segundos": round(segundos, 6),
+                "mobjects": mobjects,
+                "cuadros": _cuadros[0] - cuadros,
+                "video": round(escena.renderer.time - tiempo_video, 3),
+            })
+    return envoltura
+
+
+def _contar_cuadros(update_frame):
+    @functools.wraps(update_frame)
+    def envoltura(*args, **kwargs):
+        _cuadros[0] += 1
+        return update_frame(*args, **kwargs)
+    return envoltura
+
+
+def activar():
+    """
+    Envuelve Scene.play, Scene.wait y el dibujo de cuadros. Solo se aplica
+    una vez por proceso.
+    """
+    if parches.activo("perfil"):
+        return
+    from manim import Scene
+    from manim.renderer.cairo_renderer import CairoRenderer
+
+    parches.reemplazar("perfil", Scene, "play", functools.partial(_medida, "play"))
+    parches.reemplazar("perfil", Scene, "wait", functools.partial(_medida, "wait"))
+    parches.reemplazar("perfil", CairoRenderer, "update_frame", _contar_cuadros)
+
+
+def pilas_plegadas(nombre, registros):
+    """
+    Líneas "Escena;marco;...;play microsegundos", sumando las pilas iguales.
+    """
+    totales = defaultdict(int)
+    for registro in registros:
+        pila = ";".join([nombre, *registro["pila"], registro["tipo"]])
+        totales[pila] += round(registro["segundos"] * 1_000_000)
+    return [f"{pila} {micros}" for pila, micros in totales.items() if micros > 0]
+
+
+def lineas_mas_costosas(registros, cantidad=20):
+    """
+    Líneas de la escena ordenadas por tiempo total, con sus llamadas y cuadros.
+    """
+    por_linea = defaultdict(lambda: {"segundos": 0.0, "llamadas": 0, "cuadros": 0, "mobjects": 0})
+    for registro in registros:
+        datos = por_linea[(registro["archivo"], registro["linea"])]
+        datos["segundos"] += registro["segundos"]
+        datos["llamadas"] += 1
+        datos["cuadros"] += registro["cuadros"]
+        datos["mobjects"] = max(datos["mobjects"], registro["mobjects"])
+    orden = sorted(por_linea.items(), key=lambda par: par[1]["segundos"], reverse=True)
+    return [{"archivo": a, "linea": l, **d} for (a, l), d in orden[:cantidad]]
+
+
+def perfilar_escena(escena, calidad="l", esperas_estaticas=False):
+    """
+    Renderiza la escena con el perfil activo y escribe sus archivos. Devuelve
+    {"estado", "segundos", "registros"} o el error.
+    """
+    cache_tex.activar(escena=escena.nombre)
+    if esperas_estaticas:
+        esperas.activar()
+    activar()
+    reiniciar()
+    carpeta = Path(tempfile.mkdtemp(prefix="perfil_"))
+    resultado = {"escena": escena.nombre, "calidad": CALIDADES[calidad]}
+    inicio = time.perf_counter()
+    try:
+        renderizar_en(carpeta, escena, calidad)
+        resultado["estado"] = "ok"
+    except Exception:
+        resultado.update(estado="error", error=traceback.format_exc())
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+    resultado["segundos"] = round(time.perf_counter() - inicio, 2)
+    resultado["registros"] = registros()
+
+    DIRECTORIO_PERFILES.mkdir(parents=True, exist_ok=True)
+    plegado = DIRECTORIO_PERFILES / f"{escena.nombre}.folded"
+    plegado.write_text("\n".join(pilas_plegadas(escena.nombre, resultado["registros"])) + "\n", encoding="utf-8")
+    detalle = DIRECTORIO_PERFILES / f"{escena.nombre}.json"
+    detalle.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    resultado["archivos"] = [ruta_relativa(plegado), ruta_relativa(detalle)]
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfila las llamadas a play y wait de las escenas.")
+    parser.add_argument("escenas", nargs="+", help="clases o módulos a perfilar")
+    parser.add_argument("-q", "--calidad", choices=sorted(CALIDADES), default="l", help="calidad como en manim -q")
+    parser.add_argument("--lineas", type=int, default=15, help="líneas más costosas a mostrar")
+    parser.add_argument("--esperas-estaticas", action="store_true", help="perfilar con las esperas estáticas activas")
+    args = parser.parse_args(argv)
+
+    try:
+        escenas = filtrar_escenas(descubrir_escenas(), args.escenas)
+    except ValueError as error:
+        parser.error(str(error))
+
+    errores = 0
+    for escena in escenas:
+        resultado = perfilar_escena(escena, args.calidad, args.esperas_estaticas)
+        medido = sum(r["segundos"] for r in resultado["registros"])
+        print(f"[{resultado['estado']:>5}] {escena.nombre}: {len(resultado['registros'])} llamadas, "
+              f"{medido:.1f} s de {resultado['segundos']} s en play/wait")
+        for fila in lineas_mas_costosas(resultado["registros"], args.lineas):
+            print(f"  {fila['segundos']:8.2f} s  {fila['llamadas']:4d}x  {fila['cuadros']:6d} cuadros  "
+                  f"{fila['mobjects']:5d} mobjects  {fila['archivo']}:{fila['linea']}")
+        print(f"  -> {', '.join(resultado['archivos'])}")
+        if resultado["estado"] == "error":
+            print(f"\n--- {escena.nombre} ---\n{resultado['error']}", file=sys.stderr)
+            errores += 1
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Figuras de Plotly livianas para la presentación.
+
+``fig.show()`` deja en presentacion.html, por cada figura, el cargador de
+plotly.js y los datos como JSON con todos los decimales, y dibuja todas las
+figuras al abrir el archivo. ``mostrar(fig)`` genera en cambio:
+
+- una sola copia de plotly.js para todas las figuras: recursos/plotly.min.js,
+  copiada del paquete plotly instalado y cargada con ``defer`` desde el
+  encabezado de presentacion.qmd (Quarto la incrusta una vez si el documento
+  es autocontenido);
+- solo lo que la figura usa: las columnas de ``customdata`` que no aparecen
+  en ningún ``hovertemplate`` se quitan, y del tema solo quedan los estilos
+  de los tipos de traza presentes;
+- los arreglos numéricos como arreglos binarios tipados (``{"dtype", "bdata"}``,
+  plotly.js 2.28 o posterior), con el tipo más chico que conserva los valores;
+- carga diferida: los datos quedan en un ``<script type="application/json">``
+  y la figura se dibuja recién cuando su diapositiva se muestra.
+
+Uso en un bloque de presentacion.qmd:
+
+    from herramientas.plotly_ligero import mostrar
+    mostrar(fig)
+"""
+import base64
+import hashlib
+import json
+import re
+
+import numpy as np
+
+from .escenas import DIRECTORIO_PRESENTACION
+
+PLOTLYJS = DIRECTORIO_PRESENTACION / "recursos" / "plotly.min.js"
+
+# Primera versión de plotly.js que entiende {"dtype", "bdata"}
+VERSION_BINARIA = (2, 28)
+
+# Tipos que plotly.js acepta en arreglos binarios, de menor a mayor
+TIPOS_ENTEROS = ["i1", "u1", "i2", "u2", "i4", "u4"]
+
+CUSTOMDATA = re.compile(r"%\{customdata\[(\d+)\]")
+
+INICIO = """
+(function () {
+  var div = document.getElementById("%(id)s");
+  var dibujada = false;
+  function dibujar() {
+    if (dibujada || !window.Plotly) return;
+    dibujada = true;
+    var figura = JSON.parse(document.getElementById("%(id)s-datos").textContent);
+    Plotly.newPlot(div, figura.data, figura.layout, {responsive: true, displaylogo: false});
+  }
+  function enDiapositivaActual() {
+    return Reveal.isReady() && Reveal.getCurrentSlide().contains(div);
+  }
+  function intentar() {
+    if (enDiapositivaActual()) dibujar();
+  }
+  if (window.Reveal && Reveal.on) {
+    // plotly.js se carga con defer: puede llegar después de Reveal
+    Reveal.on("ready", intentar);
+    Reveal.on("slidechanged", intentar);
+    document.addEventListener("DOMContentLoaded", intentar);
+  } else if ("IntersectionObserver" in window) {
+    new IntersectionObserver(function (entradas, observador) {
+      if (entradas.some(function (e) { return e.isIntersecting; })) {
+        observador.disconnect();
+        if (window.Plotly) dibujar(); else window.addEventListener("load", dibujar);
+      }
+    }).observe(div);
+  } else {
+    window.addEventListener("load", dibujar);
+  }
+})();
+"""
+
+
+def _version_plotlyjs():
+    from plotly.offline import get_plotlyjs_version
+
+    return tuple(int(parte) for parte in get_plotlyjs_version().split(".")[:2])
+
+
+def asegurar_plotlyjs():
+    """
+    Copia plotly.js del paquete instalado a recursos/ si falta o cambió.
+    """
+    from plotly.offline import get_plotlyjs
+
+    contenido = get_plotlyjs().encode("utf-8")
+    if not PLOTLYJS.exists() or PLOTLYJS.read_bytes() != contenido:
+        PLOTLYJS.parent.mkdir(parents=True, exist_ok=True)
+        PLOTLYJS.write_bytes(contenido)
+    return PLOTLYJS
+
+
+def arreglo_binario(valores):
+    """
+    Arreglo numérico en el formato binario de plotly.js, con el tipo más
+    chico que representa los valores, o None si no es numérico.
+    """
+    arreglo = np.asarray(valores)
+    if arreglo.dtype.kind == "b" or arreglo.size == 0:
+        return None
+    if arreglo.dtype.kind in "iu":
+        for tipo in TIPOS_ENTEROS:
+            limites = np.iinfo(np.dtype(tipo))
+            if arreglo.min() >= limites.min and arreglo.max() <= limites.max:
+                break
+        else:
+            tipo = "f8"
+    elif arreglo.dtype.kind == "f":
+        # float32 solo si representa exactamente cada valor (NaN e infinitos incluidos)
+        reducido = arreglo.astype(np.float32).astype(arreglo.dtype)
+        tipo = "f4" if np.array_equal(reducido, arreglo, equal_nan=True) else "f8"
+    else:
+        return None
+    datos = np.ascontiguousarray(arreglo.astype(np.dtype(tipo).newbyteorder("<")))
+    resultado = {"dtype": tipo, "bdata": base64.b64encode(datos.tobytes()).decode("ascii")}
+    if arreglo.ndim > 1:
+        resultado["shape"] = ",".join(str(n) for n in arreglo.shape)
+    return resultado
+
+
+def _binarios(valor):
+    if isinstance(valor, dict):
+        return {clave: _binarios(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_binarios(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return arreglo_binario(valor) or valor
+    return valor
+
+
+def _podar_customdata(traza):
+    """
+    Deja en customdata solo las columnas citadas en el hovertemplate.
+    """
+    customdata = traza.get("customdata")
+    plantilla = traza.get("hovertemplate")
+    if customdata is None or not isinstance(plantilla, str):
+        return traza
+    customdata = np.asarray(customdata)
+    usadas = sorted({int(i) for i in CUSTOMDATA.findall(plantilla)})
+    if customdata.ndim != 2 or len(usadas) == customdata.shape[1]:
+        return traza
+    if not usadas:
+        traza.pop("customdata")
+        return traza
+    nuevo = {anterior: nuevo for nuevo, anterior in enumerate(usadas)}
+    traza["customdata"] = customdata[:, usadas]
+    traza["hovertemplate"] = CUSTOMDATA.sub(lambda m: f"%{{customdata[{nuevo[int(m.group(1))]}]", plantilla)
+    return traza
+
+
+def figura_ligera(fig, binario=None):
+    """
+    Diccionario con data y layout de la figura, reducido para incrustarlo.
+    """
+    figura = fig.to_plotly_json()
+    datos = [_podar_customdata(dict(traza)) for traza in figura["data"]]
+    layout = dict(figura["layout"])
+    tema = layout.get("template")
+    if tema and "data" in tema:
+        tipos = {traza.get("type", "scatter") for traza in datos}
+        tema = dict(tema)
+        tema["data"] = {tipo: estilos for tipo, estilos in tema["data"].items() if tipo in tipos}
+        layout["template"] = tema
+    if binario is None:
+        binario = _version_plotlyjs() >= VERSION_BINARIA
+    if binario:
+        datos = _binarios(datos)
+    return {"data": datos, "layout": layout}
+
+
+def html_de(fig, altura=525):
+    """
+    HTML de la figura: el div, sus datos como JSON y el código que la dibuja
+    al mostrarse su diapositiva.
+    """
+    from plotly.io.json import to_json_plotly
+
+    datos = to_json_plotly(figura_ligera(fig)).replace("</", "<\\/")
+    # El identificador sale de los datos para que la salida sea la misma en cada ejecución
+    identificador = f"plotly-{hashlib.sha1(datos.encode('utf-8')).hexdigest()[:12]}"
+    return (
+        f'<div id="{identificador}" class="plotly-ligero" style="height:{altura}px; width:100%;"></div>\n'
+        f'<script type="application/json" id="{identificador}-datos">{datos}</script>\n'
+        f"<script>{INICIO % {'id': identificador}}</script>"
+    )
+
+
+def mostrar(fig, altura=525):
+    """
+    Muestra la figura en la salida del bloque, en lugar de ``fig.show()``.
+    """
+    from IPython.display import HTML, display
+
+    asegurar_plotlyjs()
+    display(HTML(html_de(fig, altura)))
+
+
+def tamano_json(fig):
+    """
+    Bytes de la figura como JSON, completa y reducida, para comparar.
+    """
+    from plotly.io.json import to_json_plotly
+
+    return {
+        "completa": len(fig.to_json().encode("utf-8")),
+        "ligera": len(to_json_plotly(figura_ligera(fig)).encode("utf-8")),
+    }
+
+
+if __name__ == "__main__":
+    import plotly.express as px
+
+    df = px.data.gapminder()
+    ejemplo = px.scatter(df.query("year==2007"), x="gdpPercap", y="lifeExp", color="continent",
+                         size="pop", hover_name="country", log_x=True, size_max=60)
+    print(json.dumps(tamano_json(ejemplo)))
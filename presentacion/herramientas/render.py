@@ -0,0 +1,280 @@
+"""
+Renderiza en paralelo todas las escenas de presentacion/animations.
+
+Cada escena se renderiza dentro de un proceso del pool (manim se importa una
+sola vez por proceso) y al final se escribe un manifiesto con las salidas y
+los tiempos en animations/media/manifiesto.json.
+
+Los Tex y MathTex pasan por la caché compartida de cache_tex.py y, antes de
+cada escena, las fórmulas que faltan se compilan en lote (lote_tex.py).
+
+El render es incremental: el manifiesto guarda la huella de cada escena
+(ver huellas.py) y las escenas cuyo video ya corresponde a esa huella se
+omiten. Con --forzar se renderiza todo de nuevo.
+
+Con --esperas-estaticas, las esperas en las que nada se mueve se escriben
+como un solo cuadro repetido por ffmpeg en lugar de cuadro por cuadro (ver
+esperas.py).
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.render                    # todas, calidad baja
+    python -m herramientas.render -q h derivada1     # una escena en 1080p60
+    python -m herramientas.render -j 2               # limitar a dos procesos
+    python -m herramientas.render --forzar           # ignorar las huellas
+    python -m herramientas.render --esperas-estaticas
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from . import cache_tex, esperas, lote_tex
+from .escenas import (
+    DIRECTORIO_MEDIA,
+    DIRECTORIO_PRESENTACION,
+    descubrir_escenas,
+    filtrar_escenas,
+)
+from .huellas import huella_escena
+
+# Mismas letras que la opción -q del CLI de manim
+CALIDADES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+MANIFIESTO = DIRECTORIO_MEDIA / "manifiesto.json"
+
+
+def cargar_modulo(archivo):
+    """
+    Importa el archivo de la escena como lo hace el CLI de manim: su carpeta
+    se agrega a sys.path para que funcionen los imports locales.
+    """
+    carpeta = str(archivo.parent)
+    if carpeta not in sys.path:
+        sys.path.insert(0, carpeta)
+    spec = importlib.util.spec_from_file_location(f"_escena_{archivo.stem}", archivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def ruta_relativa(ruta):
+    try:
+        return str(ruta.resolve().relative_to(DIRECTORIO_PRESENTACION))
+    except ValueError:
+        return str(ruta)
+
+
+def configuracion_manim(escena, calidad):
+    """
+    Configuración de manim con la que se renderiza una escena. La calidad se
+    traduce a resolución y fps porque tempconfig solo acepta opciones base.
+    """
+    from manim.constants import QUALITIES
+
+    perfil = QUALITIES[CALIDADES[calidad]]
+    return {
+        "media_dir": str(DIRECTORIO_MEDIA),
+        "input_file": str(escena.archivo),
+        "scene_names": [escena.nombre],
+        "pixel_height": perfil["pixel_height"],
+        "pixel_width": perfil["pixel_width"],
+        "frame_rate": perfil["frame_rate"],
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+    }
+
+
+def configuracion_de_huella(calidad):
+    """
+    Parte de la configuración que entra en la huella de cada escena.
+    """
+    return {"calidad": CALIDADES[calidad]}
+
+
+def renderizar_en(carpeta, escena, calidad, **configuracion):
+    """
+    Compila en lote las fórmulas de la escena y la renderiza en el proceso
+    actual con sus medios en ``carpeta``, sin la caché de animaciones de
+    manim salvo que ``configuracion`` diga otra cosa. Devuelve la instancia
+    renderizada y las fórmulas compiladas en lote.
+    """
+    from manim import tempconfig
+
+    configuracion = {
+        **configuracion_manim(escena, calidad),
+        "media_dir": str(carpeta),
+        "disable_caching": True,
+        **configuracion,
+    }
+    with tempconfig(configuracion):
+        tex_en_lote = lote_tex.precompilar(escena)
+        instancia = getattr(cargar_modulo(escena.archivo), escena.nombre)()
+        instancia.render()
+    return instancia, tex_en_lote
+
+
+def renderizar_escena(escena, calidad, huella=None, esperas_estaticas=False):
+    """
+    Renderiza una escena en el proceso actual y devuelve su entrada del manifiesto.
+    """
+    cache_tex.activar(escena=escena.nombre)
+    if esperas_estaticas:
+        esperas.activar()
+        esperas.reiniciar_estadisticas()
+    entrada = {
+        "escena": escena.nombre,
+        "archivo": ruta_relativa(escena.archivo),
+        "calidad": CALIDADES[calidad],
+        "huella": huella,
+        "pid": os.getpid(),
+    }
+    inicio = time.perf_counter()
+    inicio_reloj = time.time()
+    try:
+        instancia, entrada["tex_en_lote"] = renderizar_en(DIRECTORIO_MEDIA, escena, calidad, disable_caching=False)
+        entrada["estado"] = "ok"
+        entrada["salida"] = ruta_relativa(instancia.renderer.file_writer.movie_file_path)
+        entrada["animaciones"] = instancia.renderer.num_plays
+        if esperas_estaticas:
+            entrada["esperas_estaticas"] = esperas.estadisticas()
+        cache_tex.obtener_cache().olvidar_expresiones(escena.nombre, inicio_reloj)
+    except Exception:
+        entrada["estado"] = "error"
+        entrada["error"] = traceback.format_exc()
+    entrada["segundos"] = round(time.perf_counter() - inicio, 2)
+    return entrada
+
+
+def leer_manifiesto():
+    if not MANIFIESTO.exists():
+        return {"escenas": []}
+    return json.loads(MANIFIESTO.read_text(encoding="utf-8"))
+
+
+def escribir_manifiesto(entradas, **resumen):
+    """
+    Escribe el manifiesto con las entradas por (escena, calidad) y los datos
+    del último render.
+    """
+    manifiesto = {
+        "generado": datetime.now().isoformat(timespec="seconds"),
+        **resumen,
+        "escenas": sorted(entradas.values(), key=lambda e: (e["escena"], e["calidad"])),
+    }
+    MANIFIESTO.parent.mkdir(parents=True, exist_ok=True)
+    MANIFIESTO.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False), encoding="utf-8")
+    return manifiesto
+
+
+def _ordenar_por_duracion(escenas, anterior):
+    """
+    Las escenas más largas del render anterior se envían primero para que la
+    última en terminar no deje al resto de los procesos sin trabajo.
+    """
+    tiempos = {e["escena"]: e.get("segundos", 0) for e in anterior.get("escenas", [])}
+    return sorted(escenas, key=lambda e: tiempos.get(e.nombre, float("inf")), reverse=True)
+
+
+def _sigue_vigente(entrada, huella):
+    """
+    Un video sigue vigente si se generó bien con la misma huella y aún existe.
+    """
+    return (
+        entrada is not None
+        and entrada.get("estado") == "ok"
+        and entrada.get("huella") == huella
+        and (DIRECTORIO_PRESENTACION / entrada["salida"]).exists()
+    )
+
+
+def renderizar_todo(escenas, calidad="l", trabajos=None, forzar=False, esperas_estaticas=False):
+    """
+    Renderiza en un pool de procesos las escenas que cambiaron y actualiza el
+    manifiesto. Las entradas de otras escenas o calidades se conservan.
+    """
+    anterior = leer_manifiesto()
+    entradas = {(e["escena"], e["calidad"]): e for e in anterior.get("escenas", [])}
+
+    pendientes = []
+    for escena in escenas:
+        huella = huella_escena(escena, configuracion_de_huella(calidad))
+        if not forzar and _sigue_vigente(entradas.get((escena.nombre, CALIDADES[calidad])), huella):
+            print(f"[al día] {escena.nombre}")
+        else:
+            pendientes.append((escena, huella))
+
+    trabajos = max(1, min(trabajos or os.cpu_count() or 1, len(pendientes)))
+    orden = _ordenar_por_duracion([e for e, _ in pendientes], anterior)
+    huellas = {e.nombre: h for e, h in pendientes}
+
+    inicio = time.perf_counter()
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=trabajos) as pool:
+            futuros = [
+                pool.submit(renderizar_escena, e, calidad, huellas[e.nombre], esperas_estaticas)
+                for e in orden
+            ]
+            for futuro in as_completed(futuros):
+                entrada = futuro.result()
+                entradas[(entrada["escena"], entrada["calidad"])] = entrada
+                print(f"[{entrada['estado']:>5}] {entrada['escena']} ({entrada['segundos']} s)")
+
+    return escribir_manifiesto(
+        entradas,
+        calidad=CALIDADES[calidad],
+        trabajos=trabajos,
+        renderizadas=[e.nombre for e in orden],
+        segundos_total=round(time.perf_counter() - inicio, 2),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderiza en paralelo las escenas de Manim del taller.")
+    parser.add_argument("escenas", nargs="*", help="clases o módulos a renderizar (por defecto todas)")
+    parser.add_argument("-q", "--calidad", choices=sorted(CALIDADES), default="l", help="calidad como en manim -q")
+    parser.add_argument("-j", "--trabajos", type=int, default=None, help="procesos en paralelo (por defecto, núcleos disponibles)")
+    parser.add_argument("--forzar", action="store_true", help="renderizar aunque la huella no haya cambiado")
+    parser.add_argument(
+        "--esperas-estaticas",
+        action="store_true",
+        help="escribir las esperas sin movimiento como un solo cuadro repetido",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        escenas = filtrar_escenas(descubrir_escenas(), args.escenas)
+    except ValueError as error:
+        parser.error(str(error))
+
+    manifiesto = renderizar_todo(
+        escenas,
+        calidad=args.calidad,
+        trabajos=args.trabajos,
+        forzar=args.forzar,
+        esperas_estaticas=args.esperas_estaticas,
+    )
+    renderizadas = set(manifiesto["renderizadas"])
+    errores = [
+        e for e in manifiesto["escenas"]
+        if e["estado"] == "error" and e["escena"] in renderizadas and e["calidad"] == manifiesto["calidad"]
+    ]
+    for entrada in errores:
+        print(f"\n--- {entrada['escena']} ---\n{entrada['error']}", file=sys.stderr)
+    print(f"{len(renderizadas)} escenas renderizadas en {manifiesto['segundos_total']} s -> {ruta_relativa(MANIFIESTO)}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
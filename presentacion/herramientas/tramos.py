@@ -0,0 +1,303 @@
+"""
+Render de una escena larga por tramos en paralelo.
+
+render.py reparte escenas entre procesos, pero una escena larga como
+DetailedNeuralNetwork sigue siendo un solo construct secuencial. Este módulo
+la corta en sus puntos de control y renderiza cada tramo en otro proceso:
+
+1. Exploración: se ejecuta la escena con las animaciones saltadas (cada
+   play salta a su estado final sin dibujar cuadros ni escribir video) y se
+   anota en qué animación empieza cada punto de control y cuánto dura cada
+   animación. El resultado se guarda con la huella de la escena y se reusa
+   mientras no cambie.
+2. Tramos: los puntos de control se agrupan en tantos tramos como procesos,
+   equilibrando los segundos de video de cada uno. Cada proceso ejecuta la
+   escena completa con ``from_animation_number``/``upto_animation_number``:
+   las animaciones anteriores al tramo se aplican sin renderizar (así se
+   reconstruye el estado de los mobjects) y al terminar el tramo se detiene.
+3. Unión: los videos parciales de cada tramo se mueven a la carpeta de
+   parciales de la escena y un último render, que encuentra cada animación
+   en la caché de manim, solo los concatena (sin recodificar).
+
+Los puntos de control son los métodos que construct llama directamente
+(``self.paso(...)``), o los que liste la clase en ``puntos_de_control``.
+La escena debe ser determinista (semillas fijas) para que cada tramo
+reconstruya el mismo estado; si alguna animación no coincide, el último
+render la genera de nuevo, así que el resultado es correcto igual.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.tramos DetailedNeuralNetwork
+    python -m herramientas.tramos DetailedNeuralNetwork -q h -j 4
+"""
+import argparse
+import ast
+import json
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from . import cache_tex, esperas, lote_tex
+from .escenas import DIRECTORIO_MEDIA, descubrir_escenas, filtrar_escenas
+from .huellas import huella_escena
+from .render import (
+    CALIDADES,
+    _sigue_vigente,
+    cargar_modulo,
+    configuracion_de_huella,
+    configuracion_manim,
+    escribir_manifiesto,
+    leer_manifiesto,
+    renderizar_en,
+    renderizar_escena,
+)
+
+DIRECTORIO_TRAMOS = DIRECTORIO_MEDIA / "tramos"
+
+
+def puntos_de_control(escena):
+    """
+    Nombres de los métodos en los que se puede cortar la escena, en orden.
+    """
+    arbol = ast.parse(escena.archivo.read_text(encoding="utf-8"))
+    clase = next(n for n in arbol.body if isinstance(n, ast.ClassDef) and n.name == escena.nombre)
+    for nodo in clase.body:
+        if isinstance(nodo, ast.Assign) and any(getattr(t, "id", None) == "puntos_de_control" for t in nodo.targets):
+            return list(ast.literal_eval(nodo.value))
+
+    construct = next((n for n in clase.body if isinstance(n, ast.FunctionDef) and n.name == "construct"), None)
+    nombres = []
+    for sentencia in construct.body if construct else []:
+        llamada = sentencia.value if isinstance(sentencia, (ast.Expr, ast.Assign)) else None
+        if (
+            isinstance(llamada, ast.Call)
+            and isinstance(llamada.func, ast.Attribute)
+            and isinstance(llamada.func.value, ast.Name)
+            and llamada.func.value.id == "self"
+        ):
+            nombres.append(llamada.func.attr)
+    return nombres
+
+
+def explorar_escena(escena, calidad):
+    """
+    Ejecuta la escena sin dibujar cuadros ni escribir video. Devuelve en qué
+    animación empieza cada punto de control y la duración de cada animación.
+    """
+    from manim import tempconfig
+
+    cache_tex.activar(escena=escena.nombre)
+    with tempconfig({**configuracion_manim(escena, calidad), "dry_run": True}):
+        lote_tex.precompilar(escena)
+        # Con skip_animations cada play salta al estado final de sus
+        # animaciones: se actualizan los mobjects y el tiempo, sin rasterizar
+        instancia = getattr(cargar_modulo(escena.archivo), escena.nombre)(skip_animations=True)
+        inicios = []
+        duraciones = []
+
+        def marcar(nombre, metodo):
+            def envoltura(*args, **kwargs):
+                inicios.append((nombre, instancia.renderer.num_plays))
+                return metodo(*args, **kwargs)
+            return envoltura
+
+        for nombre in puntos_de_control(escena):
+            setattr(instancia, nombre, marcar(nombre, getattr(instancia, nombre)))
+
+        play = instancia.play
+
+        def play_medido(*args, **kwargs):
+            resultado = play(*args, **kwargs)
+            duraciones.append(float(instancia.duration))
+            return resultado
+
+        # Scene.wait también pasa por self.play
+        instancia.play = play_medido
+        instancia.render()
+    return {"puntos": inicios, "duraciones": duraciones}
+
+
+def exploracion_guardada(escena, huella):
+    """
+    Exploración guardada de la escena si se hizo con la misma huella.
+    """
+    ruta = DIRECTORIO_TRAMOS / f"{escena.nombre}.json"
+    try:
+        guardada = json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return guardada if guardada.get("huella") == huella else None
+
+
+def guardar_exploracion(escena, huella, exploracion):
+    DIRECTORIO_TRAMOS.mkdir(parents=True, exist_ok=True)
+    ruta = DIRECTORIO_TRAMOS / f"{escena.nombre}.json"
+    ruta.write_text(json.dumps({"huella": huella, **exploracion}, indent=2), encoding="utf-8")
+
+
+def agrupar(costos, grupos):
+    """
+    Divide ``costos`` (en orden) en a lo sumo ``grupos`` partes contiguas
+    minimizando la más costosa. Devuelve los límites, empezando en 0.
+    """
+    n = len(costos)
+    grupos = max(1, min(grupos, n))
+    acumulado = [0.0]
+    for costo in costos:
+        acumulado.append(acumulado[-1] + costo)
+
+    # mejor[k][i]: costo de la parte más cara al dividir los primeros i en k partes
+    mejor = [[float("inf")] * (n + 1) for _ in range(grupos + 1)]
+    corte = [[0] * (n + 1) for _ in range(grupos + 1)]
+    mejor[0][0] = 0.0
+    for k in range(1, grupos + 1):
+        for i in range(k, n + 1):
+            for j in range(k - 1, i):
+                costo = max(mejor[k - 1][j], acumulado[i] - acumulado[j])
+                if costo < mejor[k][i]:
+                    mejor[k][i] = costo
+                    corte[k][i] = j
+
+    limites = [n]
+    for k in range(grupos, 0, -1):
+        limites.append(corte[k][limites[-1]])
+    return limites[::-1]
+
+
+def tramos_de(exploracion, trabajos):
+    """
+    Lista de (desde, hasta) en números de animación, con ``hasta`` excluido.
+    """
+    duraciones = exploracion["duraciones"]
+    total = len(duraciones)
+    cortes = sorted({0, total} | {inicio for _, inicio in exploracion["puntos"] if 0 < inicio < total})
+    costos = [sum(duraciones[a:b]) for a, b in zip(cortes[:-1], cortes[1:])]
+    limites = agrupar(costos, trabajos)
+    return [(cortes[a], cortes[b]) for a, b in zip(limites[:-1], limites[1:])]
+
+
+def renderizar_tramo(escena, calidad, desde, hasta, carpeta, esperas_estaticas=False):
+    """
+    Renderiza las animaciones [desde, hasta) de la escena en su propia
+    carpeta de medios y devuelve los videos parciales que escribió.
+    """
+    cache_tex.activar(escena=escena.nombre)
+    if esperas_estaticas:
+        esperas.activar()
+    inicio = time.perf_counter()
+    instancia, _ = renderizar_en(
+        carpeta,
+        escena,
+        calidad,
+        from_animation_number=desde,
+        upto_animation_number=hasta - 1,
+        # Los parciales se nombran por el hash de cada animación; el render
+        # final los encuentra en la caché con ese mismo nombre
+        disable_caching=False,
+    )
+    parciales = [p for p in instancia.renderer.file_writer.partial_movie_files if p]
+    return {"desde": desde, "hasta": hasta, "parciales": parciales, "segundos": round(time.perf_counter() - inicio, 2)}
+
+
+def _mover_parciales(parciales, carpeta):
+    """
+    Mueve los parciales de un tramo a la misma ruta relativa dentro de la
+    carpeta de medios compartida.
+    """
+    for parcial in parciales:
+        destino = DIRECTORIO_MEDIA / os.path.relpath(parcial, carpeta)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(parcial, destino)
+
+
+def renderizar_por_tramos(escena, calidad="l", trabajos=None, forzar=False, esperas_estaticas=False):
+    """
+    Renderiza una escena por tramos y registra el resultado en el manifiesto.
+    """
+    anterior = leer_manifiesto()
+    entradas = {(e["escena"], e["calidad"]): e for e in anterior.get("escenas", [])}
+    huella = huella_escena(escena, configuracion_de_huella(calidad))
+    if not forzar and _sigue_vigente(entradas.get((escena.nombre, CALIDADES[calidad])), huella):
+        print(f"[al día] {escena.nombre}")
+        return entradas[(escena.nombre, CALIDADES[calidad])]
+
+    trabajos = max(1, trabajos or os.cpu_count() or 1)
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=trabajos) as pool:
+        try:
+            exploracion = exploracion_guardada(escena, huella)
+            if exploracion is None:
+                exploracion = pool.submit(explorar_escena, escena, calidad).result()
+                guardar_exploracion(escena, huella, exploracion)
+        except Exception:
+            entrada = {"escena": escena.nombre, "calidad": CALIDADES[calidad], "estado": "error", "error": traceback.format_exc()}
+            tramos = []
+        else:
+            tramos = tramos_de(exploracion, trabajos)
+            print(f"{escena.nombre}: {len(exploracion['duraciones'])} animaciones en {len(tramos)} tramos")
+
+        resultados = []
+        if tramos:
+            raiz = DIRECTORIO_TRAMOS / escena.nombre
+            shutil.rmtree(raiz, ignore_errors=True)
+            carpetas = [raiz / str(numero) for numero in range(len(tramos))]
+            futuros = [
+                pool.submit(renderizar_tramo, escena, calidad, desde, hasta, carpeta, esperas_estaticas)
+                for (desde, hasta), carpeta in zip(tramos, carpetas)
+            ]
+            try:
+                for futuro, carpeta in zip(futuros, carpetas):
+                    resultado = futuro.result()
+                    _mover_parciales(resultado.pop("parciales"), carpeta)
+                    resultados.append(resultado)
+                    print(f"[tramo] {resultado['desde']}-{resultado['hasta'] - 1} ({resultado['segundos']} s)")
+            except Exception:
+                entrada = {"escena": escena.nombre, "calidad": CALIDADES[calidad], "estado": "error", "error": traceback.format_exc()}
+            else:
+                # Todas las animaciones están en la caché: solo se concatenan
+                entrada = pool.submit(renderizar_escena, escena, calidad, huella, esperas_estaticas).result()
+            finally:
+                shutil.rmtree(raiz, ignore_errors=True)
+
+    entrada["tramos"] = resultados
+    entrada["segundos"] = round(time.perf_counter() - inicio, 2)
+    entradas[(escena.nombre, entrada["calidad"])] = entrada
+    escribir_manifiesto(
+        entradas,
+        calidad=CALIDADES[calidad],
+        trabajos=trabajos,
+        renderizadas=[escena.nombre],
+        segundos_total=entrada["segundos"],
+    )
+    print(f"[{entrada['estado']:>5}] {escena.nombre} ({entrada['segundos']} s)")
+    return entrada
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderiza una escena larga por tramos en paralelo.")
+    parser.add_argument("escenas", nargs="+", help="clases o módulos a renderizar")
+    parser.add_argument("-q", "--calidad", choices=sorted(CALIDADES), default="l", help="calidad como en manim -q")
+    parser.add_argument("-j", "--trabajos", type=int, default=None, help="tramos en paralelo (por defecto, núcleos disponibles)")
+    parser.add_argument("--forzar", action="store_true", help="renderizar aunque la huella no haya cambiado")
+    parser.add_argument("--esperas-estaticas", action="store_true", help="escribir las esperas sin movimiento como un solo cuadro")
+    args = parser.parse_args(argv)
+
+    try:
+        escenas = filtrar_escenas(descubrir_escenas(), args.escenas)
+    except ValueError as error:
+        parser.error(str(error))
+
+    errores = 0
+    for escena in escenas:
+        entrada = renderizar_por_tramos(escena, args.calidad, args.trabajos, args.forzar, args.esperas_estaticas)
+        if entrada["estado"] == "error":
+            print(f"\n--- {escena.nombre} ---\n{entrada['error']}", file=sys.stderr)
+            errores += 1
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
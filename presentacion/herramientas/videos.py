@@ -0,0 +1,189 @@
+"""
+Pósters y HTML con carga diferida para los videos de las escenas.
+
+Para cada video entregado (ver entregas.py) se genera:
+
+- un póster JPEG con el primer o el último cuadro, junto al video
+  (animations/media/entregas/<perfil>/<Escena>.jpg);
+- un fragmento HTML para las diapositivas, con rutas relativas a
+  presentacion/ (htmlframes/fragmentos/<Escena>.html), que se incluye en
+  presentacion.qmd con ``{{< include htmlframes/fragmentos/<Escena>.html >}}``;
+- una página independiente en htmlframes/, con rutas relativas a esa carpeta.
+
+El ``<video>`` lleva ``preload="none"``, el póster y la ruta del video en
+``data-src``: reveal.js asigna el ``src`` al acercarse a la diapositiva, y
+fuera de reveal.js lo hace un IntersectionObserver cuando el video entra en
+pantalla. Así abrir la presentación no descarga todas las animaciones.
+
+Uso (desde la carpeta presentacion):
+
+    python -m herramientas.videos                          # videos del maestro
+    python -m herramientas.videos --perfil borrador --cuadro primero
+"""
+import argparse
+import html
+import os
+import subprocess
+import sys
+
+from .entregas import DIRECTORIO_ENTREGAS, PERFILES
+from .escenas import DIRECTORIO_PRESENTACION
+
+DIRECTORIO_HTMLFRAMES = DIRECTORIO_PRESENTACION / "htmlframes"
+DIRECTORIO_FRAGMENTOS = DIRECTORIO_HTMLFRAMES / "fragmentos"
+
+# Páginas de htmlframes/ que ya existían con otro nombre que el de su escena
+PAGINAS = {"MiPrimeraEscena": "video_man1.html"}
+
+# Ancho máximo con que se muestra el video en su página independiente
+ANCHO_PAGINA = 960
+
+VIDEO = (
+    '<video class="video-diferido" controls playsinline preload="none"{tamano}\n'
+    '       poster="{poster}" data-src="{video}"\n'
+    '       style="max-width: 100%; height: auto;">\n'
+    "    Tu navegador no soporta el video.\n"
+    "</video>"
+)
+
+CARGADOR = """<script>
+(function () {
+  var videos = document.querySelectorAll("video.video-diferido:not([data-observado])");
+  function cargar(video) {
+    if (!video.getAttribute("src")) video.src = video.dataset.src;
+  }
+  if (!("IntersectionObserver" in window)) {
+    videos.forEach(cargar);
+    return;
+  }
+  // Un solo observador para todos los videos de la página
+  var observador = window.observadorDeVideos || (window.observadorDeVideos = new IntersectionObserver(function (entradas, propio) {
+    entradas.forEach(function (entrada) {
+      if (entrada.isIntersecting) {
+        cargar(entrada.target);
+        propio.unobserve(entrada.target);
+      }
+    });
+  }, {rootMargin: "200px"}));
+  videos.forEach(function (video) {
+    video.dataset.observado = "";
+    observador.observe(video);
+  });
+})();
+</script>"""
+
+PAGINA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo}</title>
+</head>
+<body>
+    <div style="max-width: {ancho}px;">
+{contenido}
+    </div>
+</body>
+</html>
+"""
+
+
+def dimensiones(video):
+    """
+    (ancho, alto) del video según ffprobe, o None si no se puede medir.
+    """
+    try:
+        salida = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height",
+             "-of", "csv=p=0:s=x", str(video)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        ancho, alto = salida.strip().split("x")
+        return int(ancho), int(alto)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None
+
+
+def generar_poster(video, cuadro="ultimo"):
+    """
+    Extrae el primer o el último cuadro del video como JPEG. Si el póster
+    es más nuevo que el video no se vuelve a generar.
+    """
+    poster = video.with_suffix(".jpg")
+    if poster.exists() and poster.stat().st_mtime >= video.stat().st_mtime:
+        return poster
+    if cuadro == "ultimo":
+        # Se decodifica solo el último segundo y cada cuadro reemplaza al anterior
+        posicion = ["-sseof", "-1", "-i", str(video), "-update", "1"]
+    else:
+        posicion = ["-i", str(video), "-frames:v", "1"]
+    temporal = poster.with_name(f".{poster.name}")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", *posicion, "-q:v", "3", "-f", "image2", str(temporal)],
+        check=True,
+    )
+    os.replace(temporal, poster)
+    return poster
+
+
+def html_video(video, poster, base, tamano=None):
+    """
+    ``<video>`` diferido con rutas relativas a la carpeta ``base``.
+    """
+    def relativa(ruta):
+        return html.escape(os.path.relpath(ruta, base).replace(os.sep, "/"))
+
+    atributos = f' width="{tamano[0]}" height="{tamano[1]}"' if tamano else ""
+    return VIDEO.format(tamano=atributos, poster=relativa(poster), video=relativa(video))
+
+
+def generar(perfil="maestro", cuadro="ultimo", escenas=None):
+    """
+    Pósters, fragmentos y páginas de los videos entregados de un perfil.
+    Devuelve las escenas procesadas.
+    """
+    carpeta = DIRECTORIO_ENTREGAS / perfil
+    videos = sorted(carpeta.glob("*.mp4")) if carpeta.exists() else []
+    if escenas:
+        videos = [v for v in videos if v.stem in escenas]
+    DIRECTORIO_FRAGMENTOS.mkdir(parents=True, exist_ok=True)
+    for video in videos:
+        poster = generar_poster(video, cuadro)
+        tamano = dimensiones(video)
+        fragmento = html_video(video, poster, DIRECTORIO_PRESENTACION, tamano)
+        (DIRECTORIO_FRAGMENTOS / f"{video.stem}.html").write_text(f"{fragmento}\n{CARGADOR}\n", encoding="utf-8")
+
+        contenido = f"{html_video(video, poster, DIRECTORIO_HTMLFRAMES, tamano)}\n{CARGADOR}"
+        pagina = PAGINA.format(
+            titulo=html.escape(video.stem),
+            ancho=ANCHO_PAGINA,
+            contenido="\n".join(f"        {linea}" if linea else "" for linea in contenido.splitlines()),
+        )
+        (DIRECTORIO_HTMLFRAMES / PAGINAS.get(video.stem, f"{video.stem}.html")).write_text(pagina, encoding="utf-8")
+        print(f"{video.stem}: {os.path.relpath(poster, DIRECTORIO_PRESENTACION)}")
+    return [v.stem for v in videos]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera pósters y HTML con carga diferida para los videos.")
+    parser.add_argument("escenas", nargs="*", help="escenas a procesar (por defecto todas las entregadas)")
+    parser.add_argument("--perfil", choices=sorted(PERFILES), default="maestro", help="perfil de entrega")
+    parser.add_argument("--cuadro", choices=["primero", "ultimo"], default="ultimo", help="cuadro del póster")
+    args = parser.parse_args(argv)
+
+    try:
+        procesadas = generar(args.perfil, args.cuadro, args.escenas)
+    except subprocess.CalledProcessError as error:
+        print(f"ffmpeg falló: {error}", file=sys.stderr)
+        return 1
+    if not procesadas:
+        print(f"No hay videos en {os.path.relpath(DIRECTORIO_ENTREGAS / args.perfil, DIRECTORIO_PRESENTACION)}; "
+              f"ejecute primero python -m herramientas.entregas", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Diagramas de cajas declarativos, dibujados con cairo.
+
+Un diagrama es una lista de cajas (posición, tamaño, título y subtítulo) y
+un estilo. Se dibuja una sola vez sobre una RecordingSurface y esa grabación
+se reproduce en PNG, SVG y PDF, sin ventanas ni visores, así que sirve en
+builds sin pantalla.
+
+El texto se mide con cairo: el subtítulo se parte en líneas que caben en el
+ancho de la caja (respetando los saltos de línea explícitos) y, si no cabe en
+el alto, se reduce el tamaño de letra. El lienzo se ajusta a las cajas.
+
+Cada diagrama se identifica por la huella de su especificación. Las
+huellas de la última salida se guardan en diagramas.json dentro de la
+carpeta de salida; si un diagrama no cambió y sus archivos existen, no se
+vuelve a dibujar.
+
+Uso:
+
+    from diagramas import Caja, Diagrama, renderizar
+
+    diagrama = Diagrama("ejemplo", [Caja(100, 50, 300, 150, "Título", "Subtítulo")])
+    renderizar([diagrama])
+"""
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+import cairo
+
+DIRECTORIO_SALIDA = Path(__file__).resolve().parent / "media" / "diagramas"
+FORMATOS = ("png", "svg", "pdf")
+
+# Cambia si cambia la forma de dibujar, para invalidar las salidas anteriores
+VERSION = 1
+
+ESTILO = {
+    "fondo": (1, 1, 1),
+    "color": (0, 0, 0),
+    "grosor": 2,
+    "radio": 20,
+    "fuente": "Sans",
+    "titulo": 24,
+    "subtitulo": 18,
+    "subtitulo_minimo": 10,
+    "relleno": 15,
+    "interlineado": 1.35,
+    "borde": 50,
+}
+
+
+class Caja:
+    """
+    Caja con esquinas redondeadas, título y subtítulo. El subtítulo puede
+    tener saltos de línea; además se parte en las palabras que no caben.
+    """
+
+    def __init__(self, x, y, ancho, alto, titulo, subtitulo=""):
+        self.x = x
+        self.y = y
+        self.ancho = ancho
+        self.alto = alto
+        self.titulo = titulo
+        self.subtitulo = subtitulo
+
+    def datos(self):
+        return {
+            "x": self.x,
+            "y": self.y,
+            "ancho": self.ancho,
+            "alto": self.alto,
+            "titulo": self.titulo,
+            "subtitulo": self.subtitulo,
+        }
+
+
+class Diagrama:
+    def __init__(self, nombre, cajas, **estilo):
+        self.nombre = nombre
+        self.cajas = list(cajas)
+        self.estilo = {**ESTILO, **estilo}
+
+    def huella(self, escala=1):
+        datos = [VERSION, [c.datos() for c in self.cajas], self.estilo, escala]
+        return hashlib.sha256(json.dumps(datos, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def tamano(self):
+        """
+        Ancho y alto del lienzo: las cajas más el borde del estilo.
+        """
+        borde = self.estilo["borde"]
+        ancho = max((c.x + c.ancho for c in self.cajas), default=0) + borde
+        alto = max((c.y + c.alto for c in self.cajas), default=0) + borde
+        return math.ceil(ancho), math.ceil(alto)
+
+    def grabar(self):
+        """
+        Dibuja el diagrama en una RecordingSurface, que luego se reproduce en
+        cada formato.
+        """
+        ancho, alto = self.tamano
+        superficie = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, cairo.Rectangle(0, 0, ancho, alto))
+        contexto = cairo.Context(superficie)
+        contexto.set_source_rgb(*self.estilo["fondo"])
+        contexto.paint()
+        contexto.set_source_rgb(*self.estilo["color"])
+        contexto.set_line_width(self.estilo["grosor"])
+        for caja in self.cajas:
+            _rectangulo_redondeado(contexto, caja, self.estilo["radio"])
+            contexto.stroke()
+            self._textos(contexto, caja)
+        return superficie
+
+    def _fuente(self, contexto, tamano, negrita=False):
+        peso = cairo.FONT_WEIGHT_BOLD if negrita else cairo.FONT_WEIGHT_NORMAL
+        contexto.select_font_face(self.estilo["fuente"], cairo.FONT_SLANT_NORMAL, peso)
+        contexto.set_font_size(tamano)
+
+    def _textos(self, contexto, caja):
+        relleno = self.estilo["relleno"]
+        ancho_util = caja.ancho - 2 * relleno
+
+        # El título se achica si no entra en una línea
+        tamano = self.estilo["titulo"]
+        self._fuente(contexto, tamano, negrita=True)
+        medida = contexto.text_extents(caja.titulo).x_advance
+        if medida > ancho_util:
+            tamano *= ancho_util / medida
+            self._fuente(contexto, tamano, negrita=True)
+        ascenso, descenso = contexto.font_extents()[:2]
+        y = caja.y + relleno + ascenso
+        contexto.move_to(caja.x + relleno, y)
+        contexto.show_text(caja.titulo)
+
+        if not caja.subtitulo:
+            return
+        superior = y + descenso + relleno
+        alto_util = caja.y + caja.alto - relleno - superior
+        tamano = self.estilo["subtitulo"]
+        while True:
+            self._fuente(contexto, tamano)
+            lineas = _partir(contexto, caja.subtitulo, ancho_util)
+            ascenso, _, alto_linea = contexto.font_extents()[:3]
+            alto_linea *= self.estilo["interlineado"]
+            if len(lineas) * alto_linea <= alto_util or tamano <= self.estilo["subtitulo_minimo"]:
+                break
+            tamano -= 1
+        for numero, linea in enumerate(lineas):
+            contexto.move_to(caja.x + relleno, superior + ascenso + numero * alto_linea)
+            contexto.show_text(linea)
+
+
+def _rectangulo_redondeado(contexto, caja, radio):
+    x, y, ancho, alto = caja.x, caja.y, caja.ancho, caja.alto
+    radio = min(radio, ancho / 2, alto / 2)
+    contexto.new_sub_path()
+    contexto.arc(x + ancho - radio, y + radio, radio, -math.pi / 2, 0)
+    contexto.arc(x + ancho - radio, y + alto - radio, radio, 0, math.pi / 2)
+    contexto.arc(x + radio, y + alto - radio, radio, math.pi / 2, math.pi)
+    contexto.arc(x + radio, y + radio, radio, math.pi, 3 * math.pi / 2)
+    contexto.close_path()
+
+
+def _partir(contexto, texto, ancho):
+    """
+    Líneas del texto que caben en ``ancho`` con la fuente actual. Una
+    palabra más ancha que la caja queda sola en su línea.
+    """
+    lineas = []
+    for parrafo in texto.split("\n"):
+        actual = ""
+        for palabra in parrafo.split():
+            propuesta = f"{actual} {palabra}" if actual else palabra
+            if actual and contexto.text_extents(propuesta).x_advance > ancho:
+                lineas.append(actual)
+                actual = palabra
+            else:
+                actual = propuesta
+        lineas.append(actual)
+    return lineas
+
+
+def _escribir(grabacion, tamano, ruta, formato, escala):
+    ancho, alto = tamano
+    temporal = ruta.with_name(f".{ruta.name}")
+    if formato == "png":
+        superficie = cairo.ImageSurface(cairo.FORMAT_ARGB32, math.ceil(ancho * escala), math.ceil(alto * escala))
+    elif formato == "svg":
+        superficie = cairo.SVGSurface(str(temporal), ancho, alto)
+    elif formato == "pdf":
+        superficie = cairo.PDFSurface(str(temporal), ancho, alto)
+    else:
+        raise ValueError(f"Formato desconocido: {formato}")
+    contexto = cairo.Context(superficie)
+    if formato == "png":
+        contexto.scale(escala, escala)
+    contexto.set_source_surface(grabacion, 0, 0)
+    contexto.paint()
+    if formato == "png":
+        superficie.write_to_png(str(temporal))
+    superficie.finish()
+    os.replace(temporal, ruta)
+
+
+def renderizar(diagramas, directorio=DIRECTORIO_SALIDA, formatos=FORMATOS, escala=1, forzar=False):
+    """
+    Escribe cada diagrama en todos los formatos pedidos. Los diagramas cuya
+    huella no cambió y cuyos archivos existen se omiten. Devuelve
+    {nombre: [rutas]}.
+    """
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+    registro = directorio / "diagramas.json"
+    try:
+        huellas = json.loads(registro.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        huellas = {}
+
+    salidas = {}
+    for diagrama in diagramas:
+        rutas = [directorio / f"{diagrama.nombre}.{formato}" for formato in formatos]
+        huella = diagrama.huella(escala)
+        salidas[diagrama.nombre] = rutas
+        if not forzar and huellas.get(diagrama.nombre) == huella and all(r.exists() for r in rutas):
+            continue
+        grabacion = diagrama.grabar()
+        for ruta, formato in zip(rutas, formatos):
+            _escribir(grabacion, diagrama.tamano, ruta, formato, escala)
+        huellas[diagrama.nombre] = huella
+
+    registro.write_text(json.dumps(huellas, indent=2, sort_keys=True), encoding="utf-8")
+    return salidas